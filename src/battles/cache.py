@@ -0,0 +1,199 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Callable
+
+from battles.outcome import is_error
+from battles.teams import Team, compile_team
+
+
+DEFAULT_CACHE_PATH = Path("cache") / "battle_results.sqlite"
+
+_FLIP = {1: 2, 2: 1, 0: 0}
+
+
+def pair_key(team1: Team, team2: Team, format: str, engine: str, seed: int | None = None) -> tuple[str, bool]:
+    """
+    Content-addressed key for a matchup.
+
+    The pair is stored in a canonical order, so (A, B) and (B, A) share one
+    entry. Returns the key and whether the teams were swapped to reach the
+    canonical order, in which case stored results must be flipped. A seeded
+    battle with the sides swapped is a different battle, so seeded pairs
+    keep their order.
+    """
+    h1, h2 = compile_team(team1).hash, compile_team(team2).hash
+    swapped = seed is None and h2 < h1
+    first, second = (h2, h1) if swapped else (h1, h2)
+    payload = json.dumps([first, second, format, engine, seed])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest(), swapped
+
+
+class BattleCache:
+    """
+    Persistent store of battle results keyed by canonical team pair, format,
+    engine and optional seed.
+
+    Results are kept in the order they were simulated, from the point of view
+    of the canonical first team, together with win/loss/draw tallies.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                format TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                seed INTEGER,
+                wins1 INTEGER NOT NULL DEFAULT 0,
+                wins2 INTEGER NOT NULL DEFAULT 0,
+                draws INTEGER NOT NULL DEFAULT 0,
+                results TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        self.conn.commit()
+
+    def _load(self, key: str) -> str:
+        row = self.conn.execute("SELECT results FROM results WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else ""
+
+    def results(self, team1: Team, team2: Team, format: str, engine: str, seed: int | None = None) -> list[int]:
+        """All cached results for the matchup, as seen from team1 (1/2/0)."""
+        key, swapped = pair_key(team1, team2, format, engine, seed)
+        stored = [int(c) for c in self._load(key)]
+        return [_FLIP[r] for r in stored] if swapped else stored
+
+    def tallies(self, team1: Team, team2: Team, format: str, engine: str, seed: int | None = None) -> tuple[int, int, int]:
+        """(team1 wins, team2 wins, draws) over all cached results."""
+        results = self.results(team1, team2, format, engine, seed)
+        return results.count(1), results.count(2), results.count(0)
+
+    def add(self, team1: Team, team2: Team, format: str, engine: str, results: list[int], seed: int | None = None):
+        if not results:
+            return
+        key, swapped = pair_key(team1, team2, format, engine, seed)
+        stored = [_FLIP[int(r)] for r in results] if swapped else [int(r) for r in results]
+        encoded = "".join(str(r) for r in stored)
+
+        self.conn.execute(
+            """
+            INSERT INTO results (key, format, engine, seed, wins1, wins2, draws, results)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                wins1 = wins1 + excluded.wins1,
+                wins2 = wins2 + excluded.wins2,
+                draws = draws + excluded.draws,
+                results = results || excluded.results
+            """,
+            (key, format, engine, seed, stored.count(1), stored.count(2), stored.count(0), encoded),
+        )
+        self.conn.commit()
+
+    def sample(
+        self,
+        team1: Team,
+        team2: Team,
+        format: str,
+        engine: str,
+        n: int,
+        battle_func: Callable,
+        seed: int | None = None,
+    ) -> list[int]:
+        """
+        Return n results for the matchup. Cached results are used first and
+        only the missing ones are simulated with battle_func, then stored.
+        Failed battles are returned but never stored.
+        """
+        cached = self.results(team1, team2, format, engine, seed)[:n]
+        missing = n - len(cached)
+        if missing <= 0:
+            return cached
+
+        args = (team1, team2, format) if seed is None else (team1, team2, format, seed)
+        fresh = [battle_func(*args) for _ in range(missing)]
+        self.add(team1, team2, format, engine, [r for r in fresh if not is_error(r)], seed)
+        return cached + fresh
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedBattleEngine:
+    """
+    Drop-in replacement for a battle_engine_func that reads through a
+    BattleCache.
+
+    Up to `max_samples` results are kept per matchup. Repeated calls for the
+    same matchup cycle through them, simulating a new battle only while fewer
+    than `max_samples` are cached, so e.g. surviving pairs that meet again in
+    later generations cost nothing once their samples exist. A seeded battle
+    always has the same result, so it is simulated once whatever
+    `max_samples` is.
+    """
+
+    def __init__(self, battle_func: Callable, engine: str, cache: BattleCache | None = None, max_samples: int = 1):
+        self.battle_func = battle_func
+        self.engine = engine
+        self.cache = cache if cache is not None else BattleCache()
+        self.max_samples = max_samples
+        self._calls: dict[str, int] = {}
+
+    def _key(self, team1: Team, team2: Team, format: str, seed: int | None = None) -> str:
+        return pair_key(team1, team2, format, self.engine, seed)[0]
+
+    def _next_index(self, key: str, seed: int | None = None) -> int:
+        if seed is not None:
+            return 0
+        index = self._calls.get(key, 0) % self.max_samples
+        self._calls[key] = self._calls.get(key, 0) + 1
+        return index
+
+    def __call__(self, team1: Team, team2: Team, format: str, seed: int | None = None) -> int:
+        index = self._next_index(self._key(team1, team2, format, seed), seed)
+        return self.cache.sample(team1, team2, format, self.engine, index + 1, self.battle_func, seed)[index]
+
+    def map(self, jobs: list) -> list[int]:
+        """
+        Batch version of calling the engine once per (team1, team2, format)
+        or (team1, team2, format, seed) job, in order. The battles still
+        missing from the cache are run together, through battle_func.map
+        when it has one (see battles.executor.BattleExecutor).
+        """
+        jobs = list(jobs)
+        matchups = [(*job, None)[:4] for job in jobs]
+        keys = [self._key(*matchup) for matchup in matchups]
+        indexes = [self._next_index(key, matchup[3]) for key, matchup in zip(keys, matchups)]
+
+        # Fresh battles needed per matchup, played as the first job that asks
+        missing: dict[str, tuple[tuple, int]] = {}
+        for job, matchup, key, index in zip(jobs, matchups, keys, indexes):
+            have = len(self.cache.results(*matchup[:3], self.engine, matchup[3]))
+            first_job, count = missing.get(key, (job, 0))
+            missing[key] = (first_job, max(count, index + 1 - have))
+
+        to_run = [job for job, count in missing.values() for _ in range(count)]
+        run_many = getattr(self.battle_func, "map", None)
+        fresh = run_many(to_run) if run_many is not None else [self.battle_func(*job) for job in to_run]
+
+        errors = {}
+        for job, result in zip(to_run, fresh):
+            team1, team2, format, seed = (*job, None)[:4]
+            if is_error(result):
+                errors.setdefault(self._key(team1, team2, format, seed), result)
+            else:
+                self.cache.add(team1, team2, format, self.engine, [result], seed)
+
+        results = []
+        for matchup, key, index in zip(matchups, keys, indexes):
+            stored = self.cache.results(*matchup[:3], self.engine, matchup[3])
+            if index < len(stored):
+                results.append(stored[index])
+            else:
+                results.append(errors[key])
+        return results
@@ -0,0 +1,119 @@
+import atexit
+import math
+import multiprocessing
+from typing import Callable, Iterable, Iterator
+
+from battles.outcome import BattleError, BattleResult
+
+
+Job = tuple  # (team1, team2, format), or (team1, team2, format, seed)
+
+# Set in each worker process by _init_worker
+_battle_func: Callable | None = None
+_batch_func: Callable | None = None
+
+
+def _init_worker(battle_func, batch_func, initializer, initargs):
+    global _battle_func, _batch_func
+    _battle_func, _batch_func = battle_func, batch_func
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _run_chunk(chunk: list[tuple[int, Job]]) -> list[tuple[int, object]]:
+    # Engines with a batch entry point run the whole chunk concurrently on
+    # the worker's own event loop and player pool.
+    indexes = [i for i, _ in chunk]
+    jobs = [job for _, job in chunk]
+    if _batch_func is not None:
+        results = _batch_func(jobs)
+    else:
+        results = [_battle_func(*job) for job in jobs]
+    return list(zip(indexes, results))
+
+
+class BattleExecutor:
+    """
+    Runs battles for one engine across `workers` processes.
+
+    Each worker imports the engine once and keeps it for its whole life, so
+    the poke-env engine gets one background event loop and one persistent
+    player pool per process. Workers are started with "spawn": poke-env's
+    loop is a thread, which would not survive a fork.
+
+    An executor is a drop-in battle_engine_func: calling it runs a single
+    battle. `map` runs a batch in order and `imap_unordered` streams
+    (index, result) pairs as they complete.
+    """
+
+    def __init__(
+        self,
+        battle_func: Callable,
+        workers: int,
+        batch_func: Callable | None = None,
+        initializer: Callable | None = None,
+        initargs: tuple = (),
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.battle_func = battle_func
+        self.batch_func = batch_func
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.get_context("spawn").Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.battle_func, self.batch_func, self.initializer, self.initargs),
+            )
+            atexit.register(self.close)
+        return self._pool
+
+    def _chunks(self, jobs: list[Job], chunksize: int | None) -> list[list[tuple[int, Job]]]:
+        if chunksize is None:
+            # A few chunks per worker keeps them all busy until the end
+            chunksize = max(1, math.ceil(len(jobs) / (self.workers * 4)))
+        indexed = list(enumerate(jobs))
+        return [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+
+    def imap_unordered(self, jobs: Iterable[Job], chunksize: int | None = None) -> Iterator[tuple[int, object]]:
+        """Yield (job index, result) pairs as battles complete."""
+        jobs = list(jobs)
+        if not jobs:
+            return
+        for chunk_results in self.pool.imap_unordered(_run_chunk, self._chunks(jobs, chunksize)):
+            yield from chunk_results
+
+    def map(self, jobs: Iterable[Job], chunksize: int | None = None) -> list:
+        """Run a batch of (team1, team2, format) jobs; results in input order."""
+        jobs = list(jobs)
+        results: list = [BattleResult.failed(BattleError.ENGINE_ERROR)] * len(jobs)
+        for i, result in self.imap_unordered(jobs, chunksize):
+            results[i] = result
+        return results
+
+    def submit(self, job: Job, callback: Callable | None = None):
+        """
+        Start one battle without waiting for it. Returns a
+        multiprocessing AsyncResult; callback(result) runs in the parent
+        when it completes.
+        """
+        return self.pool.apply_async(
+            _run_chunk,
+            ([(0, job)],),
+            callback=None if callback is None else lambda r: callback(r[0][1]),
+        )
+
+    def __call__(self, team1, team2, format: str, seed: int | None = None):
+        job = (team1, team2, format) if seed is None else (team1, team2, format, seed)
+        return self.map([job])[0]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
@@ -0,0 +1,143 @@
+import random
+from typing import Iterable
+
+import numpy as np
+
+from battles.teams import Team
+
+TEAM_SIZE = 6
+MOVES_PER_POKEMON = 4
+
+
+def gumbel_keys(uniform: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Turn uniform random numbers into sort keys whose smallest k are a
+    sample of k items without replacement in proportion to `weights`
+    (the Gumbel top-k trick).
+    """
+    with np.errstate(divide="ignore"):
+        return np.log(-np.log(uniform)) - np.log(weights)
+
+
+class LearnsetIndex:
+    """
+    A learnsets dict (data/learnsets_by_tier format) as arrays, built once:
+
+    - species: IDs of the species that can be on a team (4+ legal moves),
+      in the file's order
+    - offsets, move_ids: CSR layout of every species' legal moves, in the
+      file's order; species_rows maps a species ID to its row
+    - legal: species x move bitmask, legal[pid, mid] for learnable moves
+
+    Moves whose normalized names are in `banned` are left out.
+    """
+
+    def __init__(self, learnsets: dict, banned: Iterable[str] = ()):
+        banned = set(banned)
+        rows = {
+            int(pid): [
+                move["move_id"] for move in pdata.get("learned", [])
+                if move["move_name"].replace(" ", "").lower() not in banned
+            ]
+            for pid, pdata in learnsets.items()
+        }
+        self.names = {int(pid): pdata["name"] for pid, pdata in learnsets.items()}
+
+        all_species = np.array(list(rows), dtype=np.int64)
+        counts = np.array([len(moves) for moves in rows.values()], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.move_ids = np.array([mid for moves in rows.values() for mid in moves], dtype=np.int64)
+
+        max_species = int(all_species.max(initial=0))
+        self.species_rows = np.full(max_species + 1, -1, dtype=np.int64)
+        self.species_rows[all_species] = np.arange(len(all_species))
+
+        self.legal = np.zeros((max_species + 1, int(self.move_ids.max(initial=0)) + 1), dtype=bool)
+        self.legal[np.repeat(all_species, counts), self.move_ids] = True
+
+        self.species = all_species[counts >= MOVES_PER_POKEMON]
+
+        # Plain sequences for random.Random, which samples them exactly as
+        # it sampled the lists they replace
+        self._species_list = self.species.tolist()
+        self._move_tuples = {pid: tuple(moves) for pid, moves in rows.items()}
+        self._positions = {
+            (pid, mid): int(self.offsets[row]) + k
+            for row, (pid, moves) in enumerate(rows.items())
+            for k, mid in enumerate(moves)
+        }
+
+    # ---------------- lookups ----------------
+
+    def knows(self, pid: int) -> bool:
+        """True for a species in the learnsets."""
+        return 0 <= pid < len(self.species_rows) and self.species_rows[pid] >= 0
+
+    def can_learn(self, pid: int, mid: int) -> bool:
+        return self.knows(pid) and 0 <= mid < self.legal.shape[1] and bool(self.legal[pid, mid])
+
+    def moves(self, pid: int) -> tuple[int, ...]:
+        return self._move_tuples[pid]
+
+    def move_positions(self, species: np.ndarray, moves: np.ndarray) -> np.ndarray:
+        """
+        Position in move_ids of every move in `moves` (shape species.shape
+        + (k,)) for its species, or -1 where the species can't learn it.
+        """
+        flat = [
+            self._positions.get((int(pid), int(mid)), -1)
+            for pid, slot_moves in zip(species.ravel(), moves.reshape(-1, moves.shape[-1]))
+            for mid in slot_moves
+        ]
+        return np.array(flat, dtype=np.int64).reshape(moves.shape)
+
+    # ---------------- sampling with random.Random ----------------
+
+    def sample_team(self, rng: random.Random) -> Team:
+        """
+        Six distinct species with four random moves each. Draws from rng
+        exactly like the original PopulationOptimizer.sample_random_team.
+        """
+        if len(self._species_list) < TEAM_SIZE:
+            raise ValueError("Not enough Pokémon with 4+ moves to build a full team")
+
+        pokemon_ids = rng.sample(self._species_list, TEAM_SIZE)
+        moves_ids_per_pokemon = [self.sample_moves(pid, rng) for pid in pokemon_ids]
+        return (pokemon_ids, moves_ids_per_pokemon)
+
+    def sample_moves(self, pid: int, rng: random.Random) -> list[int]:
+        return rng.sample(self._move_tuples[pid], MOVES_PER_POKEMON)
+
+    def sample_random_slot(self, rng: random.Random) -> tuple[int, list[int]]:
+        """One random species with four random moves."""
+        pid = rng.choice(self._species_list)
+        return pid, self.sample_moves(pid, rng)
+
+    # ---------------- batched sampling with NumPy ----------------
+
+    def random_moves(
+        self,
+        species: np.ndarray,
+        rng: np.random.Generator,
+        weights: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        MOVES_PER_POKEMON distinct random moves for every species ID in
+        `species`; uniform, or in proportion to `weights`, an array aligned
+        with move_ids.
+        """
+        rows = self.species_rows[species]
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+
+        # Random keys with the positions past each species' moves sorted last;
+        # the smallest keys win
+        width = int(counts.max(initial=MOVES_PER_POKEMON))
+        keys = rng.random(rows.shape + (width,))
+        past_end = np.arange(width) >= counts[..., None]
+        if weights is not None:
+            positions = np.minimum(starts[..., None] + np.arange(width), len(self.move_ids) - 1)
+            keys = gumbel_keys(keys, weights[positions])
+        keys[past_end] = np.inf
+        picks = np.argsort(keys, axis=-1)[..., :MOVES_PER_POKEMON]
+        return self.move_ids[starts[..., None] + picks]
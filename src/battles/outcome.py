@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class BattleError(str, Enum):
+    """Why a battle produced no real result."""
+    INVALID_TEAM = "invalid_team"  # illegal team, locally or per the server
+    REJECTED = "rejected"  # challenge refused or cancelled
+    SERVER_ERROR = "server_error"  # server-side error message or popup
+    DISCONNECT = "disconnect"  # connection or simulator process lost
+    TIMEOUT = "timeout"
+    ENGINE_ERROR = "engine_error"  # anything else raised while simulating
+
+
+class BattleResult(int):
+    """
+    A 1/2/0 battle result that also records whether the battle failed.
+
+    Behaves exactly like the plain int engines used to return, so existing
+    callers are unaffected; `error` is None for a battle that was played.
+    Failed battles are always 0.
+    """
+
+    error: BattleError | None
+
+    def __new__(cls, winner: int, error: BattleError | None = None):
+        result = super().__new__(cls, winner)
+        result.error = error
+        return result
+
+    @classmethod
+    def failed(cls, error: BattleError) -> "BattleResult":
+        return cls(0, error)
+
+    def __str__(self) -> str:
+        return int.__repr__(self)
+
+    def __repr__(self) -> str:
+        if self.error is None:
+            return f"BattleResult({int(self)})"
+        return f"BattleResult(0, error={self.error.value})"
+
+
+def is_error(result) -> bool:
+    """True for a result from a battle that failed rather than was drawn."""
+    return getattr(result, "error", None) is not None
+
+
+@dataclass
+class BattleOutcome:
+    """
+    Everything an engine knows about a finished battle.
+
+    hp_fraction is each side's remaining HP as a fraction of its team's
+    total, with fainted Pokémon at 0. int(outcome) and outcome.result give
+    the plain 1/2/0 result.
+    """
+    winner: int = 0  # 1, 2, or 0 for a draw or a failed battle
+    turns: int = 0
+    hp_fraction: tuple[float, float] = (0.0, 0.0)
+    fainted: tuple[int, int] = (0, 0)
+    duration_sec: float = 0.0
+    error: BattleError | None = None
+
+    @classmethod
+    def failed(cls, error: BattleError) -> "BattleOutcome":
+        return cls(error=error)
+
+    @property
+    def result(self) -> BattleResult:
+        return BattleResult(self.winner, self.error)
+
+    @property
+    def margin(self) -> float:
+        """Remaining HP of team1 minus team2's, in [-1, 1]."""
+        return self.hp_fraction[0] - self.hp_fraction[1]
+
+    def __int__(self) -> int:
+        return self.winner
+
+
+def team_status(pokemon) -> tuple[float, int]:
+    """(remaining HP fraction, fainted count) of a side's poke-env Pokémon."""
+    pokemon = list(pokemon)
+    if not pokemon:
+        return 0.0, 0
+    hp = sum(0.0 if mon.fainted else mon.current_hp_fraction for mon in pokemon)
+    return hp / len(pokemon), sum(1 for mon in pokemon if mon.fainted)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+from utils import POKEDEX, MOVELIST
+
+Team = Tuple[List[int], List[List[int]]]  # (pokemon_ids, moves_ids_per_pokemon)
+
+
+def canonical_team(team: Team, keep_lead: bool = True) -> Team:
+    """
+    Canonical form of a team, so the same team always hashes the same.
+
+    Move order within a slot has no effect on a battle, so moves are sorted.
+    Slots are sorted by species, except that with keep_lead the first
+    Pokémon stays first because it leads.
+    """
+    pokemon_ids = [int(pid) for pid in team[0]]
+    moves_ids_per_pokemon = [sorted(int(mid) for mid in moves) for moves in team[1]]
+    if len(pokemon_ids) != len(moves_ids_per_pokemon):
+        # Malformed; keep the slots as they are rather than pairing them up
+        return pokemon_ids, moves_ids_per_pokemon
+
+    slots = list(zip(pokemon_ids, moves_ids_per_pokemon))
+    lead, bench = (slots[:1], slots[1:]) if keep_lead else ([], slots)
+    slots = lead + sorted(bench)
+    return (
+        [pid for pid, _ in slots],
+        [moves for _, moves in slots],
+    )
+
+
+def team_hash(team: Team, keep_lead: bool = True) -> str:
+    """Stable short hash of the canonical form of a team."""
+    payload = json.dumps(canonical_team(team, keep_lead), separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _showdown_id(name: str) -> str:
+    return "".join(c for c in name.lower() if c.isalnum())
+
+
+@dataclass(frozen=True)
+class CompiledTeam:
+    """
+    A team compiled once into everything the battle engines need: the
+    Showdown packed format and a stable hash.
+    """
+    pokemon_ids: Tuple[int, ...]
+    moves_ids_per_pokemon: Tuple[Tuple[int, ...], ...]
+    packed: str
+    hash: str
+
+
+def _pack(pokemon_ids, moves_ids_per_pokemon) -> str:
+    # Packed format: NICKNAME|SPECIES|ITEM|ABILITY|MOVES|NATURE|EVS|GENDER|IVS|SHINY|LEVEL|HAPPINESS
+    # An empty SPECIES means the nickname is the species.
+    mons = []
+    for pid, moves_ids in zip(pokemon_ids, moves_ids_per_pokemon):
+        name = POKEDEX.get(pid, f"Pokemon{pid}")
+        moves = ",".join(_showdown_id(MOVELIST.get(mid, f"Move{mid}")) for mid in moves_ids)
+        mons.append(f"{name}|||none|{moves}|||||||")
+    return "]".join(mons)
+
+
+@lru_cache(maxsize=65536)
+def _compile(pokemon_ids: Tuple[int, ...], moves_ids_per_pokemon: Tuple[Tuple[int, ...], ...]) -> CompiledTeam:
+    return CompiledTeam(
+        pokemon_ids=pokemon_ids,
+        moves_ids_per_pokemon=moves_ids_per_pokemon,
+        packed=_pack(pokemon_ids, moves_ids_per_pokemon),
+        hash=team_hash((list(pokemon_ids), [list(m) for m in moves_ids_per_pokemon])),
+    )
+
+
+def compile_team(team: Team) -> CompiledTeam:
+    """Compile a team, memoized on its exact (pokemon_ids, moves) content."""
+    pokemon_ids, moves_ids_per_pokemon = team
+    return _compile(
+        tuple(int(pid) for pid in pokemon_ids),
+        tuple(tuple(int(mid) for mid in moves) for moves in moves_ids_per_pokemon),
+    )
@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+from battles.learnset_index import LearnsetIndex
+from battles.teams import Team, compile_team
+from data_processing.get_learnsets import (
+    BANNED_MOVES_BY_TIER,
+    INPUT_PATH as ALL_LEARNSETS_PATH,
+    OUTPUT_DIR as LEARNSETS_DIR,
+)
+from utils import MOVELIST
+
+
+# Highest tier whose teams are legal under each format (see config.FORMATS).
+# A tier's learnset file already includes every lower tier.
+FORMAT_TIERS = {
+    "gen1lc": "LC",
+    "gen1uu": "UU",
+    "gen1ou": "OU",
+    "gen1ubers": "Uber",
+}
+
+MAX_TEAM_SIZE = 6
+MAX_MOVES = 4
+
+
+class TierRules:
+    """
+    Legal species and per-species moves for one tier: a LearnsetIndex of
+    the species in data/learnsets_by_tier, with their full learnsets from
+    data/learnsets.json minus the tier's own move bans.
+
+    The tier files also leave out the bans of every higher tier, which keeps
+    the optimizers from using them, but the format itself allows those moves.
+    """
+
+    def __init__(
+        self,
+        tier: str,
+        learnsets_dir: Path = LEARNSETS_DIR,
+        all_learnsets_path: Path = ALL_LEARNSETS_PATH,
+    ):
+        self.tier = tier
+        with open(learnsets_dir / f"learnsets_{tier.lower()}.json", encoding="utf-8") as f:
+            species = json.load(f)
+        with open(all_learnsets_path, encoding="utf-8") as f:
+            learnsets = json.load(f)
+
+        learnsets = {pid: learnsets[pid] for pid in species}
+        self.index = LearnsetIndex(learnsets, banned=BANNED_MOVES_BY_TIER.get(tier, set()))
+
+    def problems(self, team: Team) -> list[str]:
+        pokemon_ids, moves_ids_per_pokemon = team
+        problems = []
+
+        if not 1 <= len(pokemon_ids) <= MAX_TEAM_SIZE:
+            problems.append(f"team has {len(pokemon_ids)} Pokémon")
+        if len(moves_ids_per_pokemon) != len(pokemon_ids):
+            problems.append("number of movesets does not match number of Pokémon")
+        if len(set(pokemon_ids)) != len(pokemon_ids):
+            problems.append("duplicate species (Species Clause)")
+
+        for pid, moves_ids in zip(pokemon_ids, moves_ids_per_pokemon):
+            if not self.index.knows(pid):
+                problems.append(f"species {pid} is not legal in {self.tier}")
+                continue
+            name = self.index.names[pid]
+            if not 1 <= len(moves_ids) <= MAX_MOVES:
+                problems.append(f"{name} has {len(moves_ids)} moves")
+            if len(set(moves_ids)) != len(moves_ids):
+                problems.append(f"{name} has duplicate moves")
+            for mid in moves_ids:
+                if not self.index.can_learn(pid, mid):
+                    problems.append(f"{name} can't learn {MOVELIST.get(mid, mid)} in {self.tier}")
+
+        return problems
+
+
+_RULES: dict[str, TierRules] = {}
+_RESULTS: dict[tuple[str, str], tuple[str, ...]] = {}
+
+
+def _rules_for(format: str) -> TierRules | None:
+    tier = FORMAT_TIERS.get(format)
+    if tier is None:
+        return None
+    if tier not in _RULES:
+        _RULES[tier] = TierRules(tier)
+    return _RULES[tier]
+
+
+def validate_team(team: Team, format: str) -> tuple[str, ...]:
+    """
+    Check a team against the format's species list, learnsets and bans
+    without asking a server.
+
+    Returns the problems found; empty means the team is legal. Formats with
+    no known tier are not checked. Results are cached by team hash.
+    """
+    try:
+        key = (format, compile_team(team).hash)
+    except (TypeError, ValueError) as e:
+        return (f"malformed team: {e}",)
+
+    if key not in _RESULTS:
+        rules = _rules_for(format)
+        _RESULTS[key] = tuple(rules.problems(team)) if rules is not None else ()
+    return _RESULTS[key]
+
+
+def is_legal(team: Team, format: str) -> bool:
+    return not validate_team(team, format)
+
+
+def matchup_problems(team1: Team, team2: Team, format: str) -> list[str]:
+    """Problems with either side of a battle, prefixed with the side."""
+    return [
+        f"team{side}: {problem}"
+        for side, team in ((1, team1), (2, team2))
+        for problem in validate_team(team, format)
+    ]
@@ -1,7 +1,10 @@
 # config.py
 from typing import Callable
 
+from battles.executor import BattleExecutor
+import fast_gen1_engine.battle_simulator
 import poke_env_engine.battle_simulator
+import poke_env_engine.stdio_simulator
 
 
 # Define formats for each tier or category
@@ -22,10 +25,36 @@ DEFAULT_FORMAT = "gen1ou"
 # Define battle functions for each engine
 ENGINES: dict[str, Callable] = {
     "poke-env": poke_env_engine.battle_simulator.battle_once,
+    "showdown-stdio": poke_env_engine.stdio_simulator.battle_once,
+    "fast-gen1": fast_gen1_engine.battle_simulator.battle_once,
 }
 
 DEFAULT_ENGINE: Callable = poke_env_engine.battle_simulator.battle_once
 
+# Optional batched entry points: take a list of (team1, team2, format) jobs
+# and return one result per job, in input order
+BATCH_ENGINES: dict[str, Callable] = {
+    "poke-env": poke_env_engine.battle_simulator.battle_many,
+    "showdown-stdio": poke_env_engine.stdio_simulator.battle_many,
+    "fast-gen1": fast_gen1_engine.battle_simulator.battle_many,
+}
+
+
+# Same calls as ENGINES, but returning a battles.outcome.BattleOutcome with
+# turns, remaining HP, fainted counts, duration and error
+OUTCOME_ENGINES: dict[str, Callable] = {
+    "poke-env": poke_env_engine.battle_simulator.battle_outcome,
+    "showdown-stdio": poke_env_engine.stdio_simulator.battle_outcome,
+    "fast-gen1": fast_gen1_engine.battle_simulator.battle_outcome,
+}
+
+
+BATCH_OUTCOME_ENGINES: dict[str, Callable] = {
+    "poke-env": poke_env_engine.battle_simulator.battle_outcomes,
+    "showdown-stdio": poke_env_engine.stdio_simulator.battle_outcomes,
+    "fast-gen1": fast_gen1_engine.battle_simulator.battle_outcomes,
+}
+
 
 def get_format(tier: str) -> str:
     """
@@ -34,8 +63,48 @@ def get_format(tier: str) -> str:
     return FORMATS.get(tier, DEFAULT_FORMAT)
 
 
-def get_engine(engine: str) -> Callable:
+def _executor(engine: str, workers: int, battle_func: Callable, batch_func: Callable | None) -> BattleExecutor:
+    initializer, initargs = None, ()
+    farm = poke_env_engine.battle_simulator.SERVER_FARM
+    if engine == "poke-env" and farm is not None:
+        # Workers share the farm started in this process
+        initializer = poke_env_engine.battle_simulator.attach_server_farm
+        initargs = (farm.ports,)
+    elif engine == "showdown-stdio":
+        # Each worker keeps warm simulators; share the cores between them
+        initializer = poke_env_engine.stdio_simulator.set_pool_size
+        initargs = (poke_env_engine.stdio_simulator.DEFAULT_POOL_SIZE // workers,)
+    return BattleExecutor(battle_func, workers, batch_func, initializer, initargs)
+
+
+def get_engine(engine: str, workers: int = 1) -> Callable:
     """
     Returns the battle function based on the engine name.
+
+    With workers > 1, returns a BattleExecutor that runs battles across that
+    many processes; it is called like the plain function and adds `map`
+    for batches.
+    """
+    battle_func = ENGINES.get(engine, DEFAULT_ENGINE)
+    if workers <= 1:
+        return battle_func
+    return _executor(engine, workers, battle_func, BATCH_ENGINES.get(engine))
+
+
+def get_batch_engine(engine: str) -> Callable | None:
+    """
+    Returns the batched battle function for the engine, or None if the engine
+    can only run one battle at a time.
+    """
+    return BATCH_ENGINES.get(engine)
+
+
+def get_outcome_engine(engine: str, workers: int = 1) -> Callable:
+    """
+    Returns the battle function that reports a full BattleOutcome instead of
+    a 1/2/0 result, as a BattleExecutor when workers > 1.
     """
-    return ENGINES.get(engine, DEFAULT_ENGINE)
+    battle_func = OUTCOME_ENGINES.get(engine, OUTCOME_ENGINES["poke-env"])
+    if workers <= 1:
+        return battle_func
+    return _executor(engine, workers, battle_func, BATCH_OUTCOME_ENGINES.get(engine))
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from typing import List, Tuple, Dict
 from plotting.loader import load_run_log_file
+from battles.cache import BattleCache
 
 
 from config import get_engine, get_format
@@ -24,7 +25,7 @@ opponents: Dict[str, List[Team]] = {
     # other tiers ...
 }
 
-def evaluate(team: Team, engine: str, tier: str) -> float:
+def evaluate(team: Team, engine: str, tier: str, cache: BattleCache | None = None) -> float:
     if tier not in opponents or not opponents[tier]:
         raise Exception(f"No pool of opponents available for tier {tier}")
 
@@ -41,7 +42,12 @@ def evaluate(team: Team, engine: str, tier: str) -> float:
         count += 1
         # Assuming battle_func returns 1 if team wins, else 0
         print(f"Evaluating against opponent {count} out of {total} opponents...")
-        result = battle_func(team, opp_team, battle_format)
+        if cache is not None:
+            # The same best team often survives several generations; reuse
+            # its results against the meta teams instead of re-battling.
+            result = cache.sample(team, opp_team, battle_format, engine, 1, battle_func)[0]
+        else:
+            result = battle_func(team, opp_team, battle_format)
         if result == 1:
             wins += 1
         if result == 2:
@@ -66,6 +72,8 @@ def evaluate_run(engine: str, tier: str, log: str):
 
     print(f"Evaluating runs in {log_path}")
 
+    cache = BattleCache()
+
     for train_log in log_path.glob("*.json"):
         if train_log.name.startswith("EVALUATION_"):
             continue
@@ -85,6 +93,7 @@ def evaluate_run(engine: str, tier: str, log: str):
                 team=entry.team,
                 engine=engine,
                 tier=tier,
+                cache=cache,
             )
 
             eval_entries.append({
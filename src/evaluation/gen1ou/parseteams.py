@@ -3,11 +3,20 @@ import json
 from pathlib import Path
 from utils import normalize_name, parse_movelist, load_pokedex_from_tiers, build_team_summary, MOVELIST_CSV
 
+def name_key(name: str) -> str:
+    """
+    Lookup key for a species or move name: normalize_name, then lowercase
+    letters and digits only, so spellings such as "Selfdestruct" and
+    "Self-Destruct" find the same ID.
+    """
+    return re.sub(r"[^a-z0-9]", "", normalize_name(name).lower())
+
+
 def parse_teams(text: str):
     # Load pokedex and movelist from utils functions
     pokedex = load_pokedex_from_tiers()
-    movelist = {v: k for k, v in parse_movelist(MOVELIST_CSV).items()}  # reverse move_id->name to name->id
-    poke_name_to_id = {v: k for k, v in pokedex.items()}
+    movelist = {name_key(v): k for k, v in parse_movelist(MOVELIST_CSV).items()}  # reverse move_id->name to name->id
+    poke_name_to_id = {name_key(v): k for k, v in pokedex.items()}
 
     teams = []
     current_team_pokes = []
@@ -32,7 +41,7 @@ def parse_teams(text: str):
 
         if poke_re.match(line) and not line.startswith("-"):
             poke_name = normalize_name(line)
-            poke_id = poke_name_to_id.get(poke_name)
+            poke_id = poke_name_to_id.get(name_key(poke_name))
             if poke_id is None:
                 print(f"Warning: Unknown Pokémon '{poke_name}'")
                 poke_id = -1
@@ -43,7 +52,7 @@ def parse_teams(text: str):
         move_match = move_re.match(line)
         if move_match:
             move_name = normalize_name(move_match.group(1))
-            move_id = movelist.get(move_name)
+            move_id = movelist.get(name_key(move_name))
             if move_id is None:
                 print(f"Warning: Unknown move '{move_name}'")
                 move_id = -1
@@ -1,8 +1,14 @@
 from pathlib import Path
 
-from optimization.elo_ga import EloGeneticAlgorithm
+from optimization.elo_ga import EloGeneticAlgorithm, VectorizedEloGeneticAlgorithm
 from optimization.elo_rs import EloRandomSearch
-from config import get_engine, get_format
+from optimization.elo_eda import EloEstimationOfDistribution
+from optimization.map_elites import EloMapElites
+from optimization.steady_state_ga import SteadyStateEloGeneticAlgorithm
+from optimization.island_ga import IslandEloGeneticAlgorithm
+from optimization.surrogate_ga import SurrogateEloGeneticAlgorithm
+from config import ENGINES, get_engine, get_format
+from battles.cache import CachedBattleEngine
 
 
 def add_args(parser):
@@ -50,12 +56,146 @@ def add_args(parser):
         help="Mutation rate for moves in GA (default: 0.25)",
     )
 
+    parser.add_argument(
+        "--eda",
+        action="store_true",
+        help="Also run the estimation-of-distribution optimizer as a third method "
+             "(default: GA and RS only)",
+    )
+
+    parser.add_argument(
+        "--eda-learning-rate",
+        type=float,
+        default=0.2,
+        help="How far the estimation-of-distribution model moves towards the survivors' "
+             "species and moves each generation with --eda (default: 0.2)",
+    )
+
+    parser.add_argument(
+        "--map-elites-archive",
+        type=Path,
+        default=None,
+        help="Also run MAP-Elites, keeping its archive of elites per archetype in this "
+             "JSON file; an existing archive is resumed (default: MAP-Elites is not run)",
+    )
+
+    parser.add_argument(
+        "--evaluation-mode",
+        default="sequential",
+        choices=["sequential", "rounds", "racing", "active", "paired"],
+        help="How Elo matchups are played each generation: one random pair at a time, "
+             "Swiss-style rounds of disjoint pairs rated per round, successive halving that "
+             "drops the weaker half of the teams after each rung, batches of the pairs "
+             "most informative about the survivor cutoff (needs --rating glicko or "
+             "bradley-terry), or seeded rounds in which every team plays the same opponent "
+             "under the same seed from both sides, at least 2 * (population - 1) battles; "
+             "paired needs an engine that takes seeds, not poke-env (default: sequential)",
+    )
+
+    parser.add_argument(
+        "--rating",
+        default="elo",
+        choices=["elo", "bradley-terry", "glicko"],
+        help="How teams are rated from their battles: incremental Elo, a Bradley-Terry "
+             "fit over the whole generation, or Glicko ratings with per-team uncertainty "
+             "(default: elo)",
+    )
+
+    parser.add_argument(
+        "--screening-engine",
+        default=None,
+        choices=list(ENGINES),
+        help="Screen every team each generation with this cheaper engine first, e.g. "
+             "fast-gen1, and only battle the best --promote-fraction on --engine; "
+             "screening battles are logged apart from total_battles_used; not available "
+             "with --steady-state (default: no screening)",
+    )
+
+    parser.add_argument(
+        "--screening-matchups",
+        type=int,
+        default=None,
+        help="Screening battles per generation with --screening-engine "
+             "(default: --num-matchups)",
+    )
+
+    parser.add_argument(
+        "--promote-fraction",
+        type=float,
+        default=0.5,
+        help="Fraction of the population promoted from screening to --engine battles; "
+             "at least --survivors-count + 1 teams (default: 0.5)",
+    )
+
+    parser.add_argument(
+        "--steady-state",
+        action="store_true",
+        help="Run the GA without a generation barrier: ratings update after every battle "
+             "and the worst team is replaced by a child as it goes, keeping every worker "
+             "busy. Generations become epochs of --num-matchups battles; "
+             "--evaluation-mode is ignored and --rating must be elo or glicko",
+    )
+
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="Keep the GA population in NumPy arrays and breed it with batched array "
+             "operations; same operators, but a different random stream per seed",
+    )
+
+    parser.add_argument(
+        "--surrogate",
+        action="store_true",
+        help="Pre-screen GA children with a win-probability model trained on the run's "
+             "battles; only the most promising candidates are battled. Not available with "
+             "--steady-state or --vectorized",
+    )
+
+    parser.add_argument(
+        "--surrogate-candidates",
+        type=int,
+        default=10,
+        help="Candidates bred per child slot with --surrogate (default: 10)",
+    )
+
+    parser.add_argument(
+        "--islands",
+        type=int,
+        default=1,
+        help="Run the GA as this many islands, each a separate process with its own "
+             "workers; --population-size, --survivors-count, --num-matchups and --workers "
+             "are split between them. Takes precedence over --steady-state (default: 1)",
+    )
+
+    parser.add_argument(
+        "--migration-interval",
+        type=int,
+        default=5,
+        help="Generations between migrations when running islands (default: 5)",
+    )
+
+    parser.add_argument(
+        "--migrants",
+        type=int,
+        default=2,
+        help="Top teams each island sends to the next one at every migration (default: 2)",
+    )
+
     # Team evolution options
     parser.add_argument(
         "--team-evo-method",
         nargs = "+",
         default=None,
-        choices=["EloGeneticAlgorithm", "EloRandomSearch"],
+        choices=[
+            "EloGeneticAlgorithm",
+            "SteadyStateEloGeneticAlgorithm",
+            "VectorizedEloGeneticAlgorithm",
+            "SurrogateEloGeneticAlgorithm",
+            "IslandEloGeneticAlgorithm",
+            "EloRandomSearch",
+            "EloEstimationOfDistribution",
+            "EloMapElites",
+        ],
         help="Method to visualize team evolution for",
     )
 
@@ -94,16 +234,43 @@ def add_args(parser):
         help="Flag for whether or not plots (gifs, etc.) should be saved, (default: no)",
     )
 
-def run_optimizer(tier: str, engine: str, log: str, optimizer_cls, args, extra_kwargs=None):
+def run_optimizer(
+    tier: str,
+    engine: str,
+    log: str,
+    optimizer_cls,
+    args,
+    battle_engine_func,
+    extra_kwargs=None,
+    screening_engine_func=None,
+):
     if extra_kwargs is None:
         extra_kwargs = {}
 
     learnsets_file = Path(
         f"data/learnsets_by_tier/learnsets_{tier.lower()}.json"
     )
-    battle_engine_func = get_engine(engine)
     battle_format = get_format(tier)
 
+    # The engines are built once per experiment by run_ga_vs_rs, so their
+    # workers are shared; each run gets its own cache wrapper
+    if getattr(args, "cache_samples", 0) > 0:
+        battle_engine_func = CachedBattleEngine(
+            battle_engine_func, engine, max_samples=args.cache_samples
+        )
+
+    if screening_engine_func is not None:
+        if getattr(args, "cache_samples", 0) > 0:
+            screening_engine_func = CachedBattleEngine(
+                screening_engine_func, args.screening_engine, max_samples=args.cache_samples
+            )
+        extra_kwargs = dict(
+            extra_kwargs,
+            screening_engine_func=screening_engine_func,
+            screening_matchups=args.screening_matchups,
+            promote_fraction=args.promote_fraction,
+        )
+
     for seed in args.seeds:
         optimizer = optimizer_cls(
             learnsets_path=learnsets_file,
@@ -112,6 +279,8 @@ def run_optimizer(tier: str, engine: str, log: str, optimizer_cls, args, extra_k
             population_size=args.population_size,
             survivors_count=args.survivors_count,
             num_matchups=args.num_matchups,
+            evaluation_mode=args.evaluation_mode,
+            rating=args.rating,
             logging=log,
             seed=seed,
             **extra_kwargs,
@@ -120,19 +289,136 @@ def run_optimizer(tier: str, engine: str, log: str, optimizer_cls, args, extra_k
         optimizer.optimize(args.generations)
 
 
+def ga_class(args):
+    if args.surrogate and (args.steady_state or args.vectorized):
+        raise ValueError("--surrogate cannot be combined with --steady-state or --vectorized")
+    if args.steady_state:
+        return SteadyStateEloGeneticAlgorithm
+    if args.vectorized:
+        return VectorizedEloGeneticAlgorithm
+    if args.surrogate:
+        return SurrogateEloGeneticAlgorithm
+    return EloGeneticAlgorithm
+
+
+def ga_kwargs(args) -> dict:
+    kwargs = {
+        "p_pokemon_mutation_rate": args.pokemon_mutation_rate,
+        "move_mutation_rate": args.move_mutation_rate,
+    }
+    if ga_class(args) is SurrogateEloGeneticAlgorithm:
+        kwargs["candidates_per_child"] = args.surrogate_candidates
+    return kwargs
+
+
+def run_islands(tier: str, engine: str, log: str, args):
+    # Split the population and battle budget so a run with islands is
+    # comparable to a single population with the same arguments
+    islands = args.islands
+    learnsets_file = Path(
+        f"data/learnsets_by_tier/learnsets_{tier.lower()}.json"
+    )
+
+    for seed in args.seeds:
+        optimizer = IslandEloGeneticAlgorithm(
+            learnsets_path=learnsets_file,
+            battle_format=get_format(tier),
+            engine=engine,
+            islands=islands,
+            migration_interval=args.migration_interval,
+            migrants=args.migrants,
+            workers_per_island=max(1, getattr(args, "workers", 1) // islands),
+            cache_samples=getattr(args, "cache_samples", 0),
+            screening_engine=getattr(args, "screening_engine", None),
+            screening_matchups=(
+                args.screening_matchups // islands if args.screening_matchups is not None else None
+            ),
+            promote_fraction=args.promote_fraction,
+            population_size=args.population_size // islands,
+            survivors_count=max(2, args.survivors_count // islands),
+            num_matchups=args.num_matchups // islands,
+            evaluation_mode=args.evaluation_mode,
+            rating=args.rating,
+            p_pokemon_mutation_rate=args.pokemon_mutation_rate,
+            move_mutation_rate=args.move_mutation_rate,
+            logging=log,
+            seed=seed,
+        )
+
+        optimizer.optimize(args.generations)
+
+
 def run_ga_vs_rs(tier: str, engine: str, log: str, args):
+    if args.evaluation_mode == "paired" and engine == "poke-env":
+        raise ValueError(
+            "--evaluation-mode paired needs seeded battles, which --engine poke-env cannot play"
+        )
+    if args.screening_engine is not None and args.steady_state and args.islands <= 1:
+        # The steady-state GA rates battles as they finish, with no generation to screen
+        raise ValueError("--screening-engine cannot be combined with --steady-state")
+
     print(f"\n=== Running GA vs RS | Tier {tier} ===")
 
-    run_optimizer(
-        tier,
-        engine,
-        log,
-        EloGeneticAlgorithm,
-        args=args,
-        extra_kwargs={
-            "p_pokemon_mutation_rate": args.pokemon_mutation_rate,
-            "move_mutation_rate": args.move_mutation_rate,
-        },
-    )
+    battle_engine_func = get_engine(engine, workers=getattr(args, "workers", 1))
+    screening_engine_func = None
+    if args.screening_engine is not None:
+        screening_engine_func = get_engine(args.screening_engine, workers=getattr(args, "workers", 1))
+
+    try:
+        if args.islands > 1:
+            run_islands(tier, engine, log, args)
+        else:
+            run_optimizer(
+                tier,
+                engine,
+                log,
+                ga_class(args),
+                args=args,
+                battle_engine_func=battle_engine_func,
+                extra_kwargs=ga_kwargs(args),
+                screening_engine_func=screening_engine_func,
+            )
+
+        run_optimizer(
+            tier,
+            engine,
+            log,
+            EloRandomSearch,
+            args=args,
+            battle_engine_func=battle_engine_func,
+            screening_engine_func=screening_engine_func,
+        )
+
+        if args.eda:
+            run_optimizer(
+                tier,
+                engine,
+                log,
+                EloEstimationOfDistribution,
+                args=args,
+                battle_engine_func=battle_engine_func,
+                extra_kwargs={"learning_rate": args.eda_learning_rate},
+                screening_engine_func=screening_engine_func,
+            )
 
-    run_optimizer(tier, engine, log, EloRandomSearch, args)
+        if args.map_elites_archive is not None:
+            run_optimizer(
+                tier,
+                engine,
+                log,
+                EloMapElites,
+                args=args,
+                battle_engine_func=battle_engine_func,
+                extra_kwargs=dict(
+                    p_pokemon_mutation_rate=args.pokemon_mutation_rate,
+                    move_mutation_rate=args.move_mutation_rate,
+                    archive_path=args.map_elites_archive,
+                ),
+                screening_engine_func=screening_engine_func,
+            )
+    finally:
+        # BattleExecutors when --workers > 1
+        for func in (battle_engine_func, screening_engine_func):
+            close = getattr(func, "close", None)
+            if close is not None:
+                close()
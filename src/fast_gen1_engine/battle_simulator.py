@@ -0,0 +1,531 @@
+"""
+Approximate in-process Gen 1 singles simulator.
+
+Models base stats, move power, accuracy, type effectiveness and the common
+move effects, with a greedy policy on both sides. Game data comes from the
+static Gen 1 tables shipped with poke-env, so no Node.js is needed.
+"""
+import logging
+import random
+import time
+
+import numpy as np
+from poke_env.data import GenData, to_id_str
+
+from battles.outcome import BattleError, BattleOutcome, BattleResult
+from battles.validation import matchup_problems
+from utils import POKEDEX, MOVELIST
+
+
+LEVEL = 100
+MAX_TURNS = 300  # battles still running after this many turns are a tie
+KO_BONUS = 0.5  # extra greedy value for a move expected to knock out
+
+PHYSICAL_TYPES = {"NORMAL", "FIGHTING", "FLYING", "POISON", "GROUND", "ROCK", "BUG", "GHOST"}
+
+# Status codes
+NONE, SLP, PAR, PSN, TOX, BRN, FRZ = range(7)
+STATUS_CODES = {"slp": SLP, "par": PAR, "psn": PSN, "tox": TOX, "brn": BRN, "frz": FRZ}
+
+# Greedy value of inflicting a status on a healthy target
+STATUS_VALUE = {SLP: 0.7, FRZ: 0.7, PAR: 0.45, TOX: 0.35, PSN: 0.25, BRN: 0.25}
+
+# Stat stage slots on the active Pokémon
+ATK, DEF, SPC, SPE = range(4)
+STAGE_SLOTS = {"atk": ATK, "def": DEF, "spa": SPC, "spe": SPE}  # Gen 1 Special is stored as spa
+STAGE_MULTIPLIER = [2 / (2 - s) if s < 0 else (2 + s) / 2 for s in range(-6, 7)]
+
+HEAL_MOVES = {"recover": 0.5, "softboiled": 0.5}
+
+
+# ============================================================
+# Static tables
+# ============================================================
+
+_GEN1 = GenData.from_gen(1)
+
+TYPES = sorted(_GEN1.type_chart)
+TYPE_INDEX = {t: i for i, t in enumerate(TYPES)}
+
+# TYPE_CHART[attacking, defending]; poke-env stores it defender-first
+TYPE_CHART = np.array(
+    [[_GEN1.type_chart[d][a] for d in TYPES] for a in TYPES], dtype=float
+)
+
+_MAX_SPECIES = max(POKEDEX)
+_MAX_MOVE = max(MOVELIST)
+
+# Level 100 stats with maximum DVs and stat experience: hp, atk, def, spc, spe
+SPECIES_STATS = np.zeros((_MAX_SPECIES + 1, 5))
+SPECIES_TYPES = np.zeros((_MAX_SPECIES + 1, 2), dtype=int)
+BASE_SPEED = np.zeros(_MAX_SPECIES + 1)
+
+for _pid, _name in POKEDEX.items():
+    _entry = _GEN1.pokedex[to_id_str(_name)]
+    _base = _entry["baseStats"]
+    _bases = np.array([_base["hp"], _base["atk"], _base["def"], _base["spa"], _base["spe"]])
+    SPECIES_STATS[_pid] = 2 * _bases + 98
+    SPECIES_STATS[_pid, 0] = 2 * _base["hp"] + 203
+    _types = [TYPE_INDEX[t.upper()] for t in _entry["types"]]
+    SPECIES_TYPES[_pid] = [_types[0], _types[-1]]
+    BASE_SPEED[_pid] = _base["spe"]
+
+
+class MoveData:
+    """Flattened per-move properties used by the simulator."""
+
+    def __init__(self, mid: int, entry: dict):
+        self.id = to_id_str(entry["name"])
+        move_type = entry["type"].upper() if entry["type"].upper() in TYPE_INDEX else "NORMAL"  # Struggle is "???"
+        self.type = TYPE_INDEX[move_type]
+        self.physical = move_type in PHYSICAL_TYPES
+        self.accuracy = 1.0 if entry["accuracy"] is True else entry["accuracy"] / 100
+        self.priority = entry.get("priority", 0)
+        self.high_crit = bool(entry.get("critRatio"))
+
+        multihit = entry.get("multihit")
+        if isinstance(multihit, list):
+            self.hits = 3.0  # expected hits for 2-5 in Gen 1
+        else:
+            self.hits = float(multihit or 1)
+
+        damage = entry.get("damage")
+        self.fixed_damage = LEVEL if damage == "level" else (damage or 0)
+        if self.id == "psywave":
+            self.fixed_damage = 0.75 * LEVEL
+        self.half_hp = self.id == "superfang"
+        self.ohko = bool(entry.get("ohko"))
+
+        power = entry.get("basePower", 0)
+        if power == 1 and not (self.fixed_damage or self.half_hp):
+            power = 0  # scripted moves like Counter or Bide are not modelled
+        self.power = power if not self.fixed_damage and not self.half_hp else 0
+        self.attacking = bool(self.power or self.fixed_damage or self.half_hp or self.ohko)
+
+        recoil, drain = entry.get("recoil"), entry.get("drain")
+        self.recoil = recoil[0] / recoil[1] if recoil else 0.0
+        self.drain = drain[0] / drain[1] if drain else 0.0
+        self.selfdestruct = bool(entry.get("selfdestruct"))
+        self.recharge = bool((entry.get("self") or {}).get("volatileStatus") == "mustrecharge")
+
+        self.status = STATUS_CODES.get(entry.get("status"), NONE)
+        self.rest = self.id == "rest"
+        self.heal = HEAL_MOVES.get(self.id, 0.0)
+
+        boosts = entry.get("boosts") or {}
+        stage_changes = [(STAGE_SLOTS[s], v) for s, v in boosts.items() if s in STAGE_SLOTS]
+        self.self_boosts = stage_changes if entry.get("target") == "self" else []
+        self.target_boosts = stage_changes if entry.get("target") != "self" else []
+
+        secondary = entry.get("secondary") or {}
+        self.secondary_chance = secondary.get("chance", 0) / 100
+        self.secondary_status = STATUS_CODES.get(secondary.get("status"), NONE)
+        self.secondary_boosts = [
+            (STAGE_SLOTS[s], v) for s, v in (secondary.get("boosts") or {}).items()
+            if s in STAGE_SLOTS
+        ]
+
+
+MOVES: dict[int, MoveData] = {
+    mid: MoveData(mid, _GEN1.moves[to_id_str(name)]) for mid, name in MOVELIST.items()
+}
+
+MOVE_POWER = np.zeros(_MAX_MOVE + 1)
+MOVE_TYPE = np.zeros(_MAX_MOVE + 1, dtype=int)
+MOVE_PHYSICAL = np.zeros(_MAX_MOVE + 1, dtype=bool)
+for _mid, _move in MOVES.items():
+    MOVE_POWER[_mid] = _move.power * _move.hits
+    MOVE_TYPE[_mid] = _move.type
+    MOVE_PHYSICAL[_mid] = _move.physical
+
+
+def damage_tables(attackers: np.ndarray, moves: np.ndarray, defenders: np.ndarray):
+    """
+    Vectorized damage terms for every (attacker slot, defender slot, move slot).
+
+    Returns (core, modifier), both shaped (6, 6, 4), such that the damage of a
+    hit is (core * attack_stage / defense_stage + 2) * modifier * random_factor.
+    """
+    physical = MOVE_PHYSICAL[moves]  # (6, 4)
+    attack = np.where(physical, SPECIES_STATS[attackers, 1][:, None], SPECIES_STATS[attackers, 3][:, None])
+    defense = np.where(
+        physical[:, None, :],
+        SPECIES_STATS[defenders, 2][None, :, None],
+        SPECIES_STATS[defenders, 3][None, :, None],
+    )
+    core = (2 * LEVEL / 5 + 2) * MOVE_POWER[moves][:, None, :] * attack[:, None, :] / defense / 50
+
+    move_types = MOVE_TYPE[moves]  # (6, 4)
+    defender_types = SPECIES_TYPES[defenders]  # (6, 2)
+    effectiveness = (
+        TYPE_CHART[move_types[:, None, :], defender_types[None, :, 0, None]]
+        * np.where(
+            defender_types[None, :, 0, None] == defender_types[None, :, 1, None],
+            1.0,
+            TYPE_CHART[move_types[:, None, :], defender_types[None, :, 1, None]],
+        )
+    )
+    attacker_types = SPECIES_TYPES[attackers]  # (6, 2)
+    stab = np.where(
+        (move_types == attacker_types[:, 0, None]) | (move_types == attacker_types[:, 1, None]),
+        1.5,
+        1.0,
+    )
+    return core, stab[:, None, :] * effectiveness
+
+
+# ============================================================
+# Battle state
+# ============================================================
+
+class _Side:
+    def __init__(self, species: np.ndarray, moves: np.ndarray):
+        self.species = species
+        self.moves = moves
+        self.max_hp = SPECIES_STATS[species, 0].copy()
+        self.hp = self.max_hp.copy()
+        self.status = [NONE] * len(species)
+        self.sleep_turns = [0] * len(species)
+        self.toxic_counter = 0
+        self.active = 0
+        self.stages = [0, 0, 0, 0]
+        self.recharging = False
+
+    def alive(self) -> list[int]:
+        return [i for i in range(len(self.hp)) if self.hp[i] > 0]
+
+    def switch_in(self, slot: int):
+        self.active = slot
+        self.stages = [0, 0, 0, 0]
+        self.toxic_counter = 0
+        self.recharging = False
+
+    def speed(self) -> float:
+        speed = SPECIES_STATS[self.species[self.active], 4] * STAGE_MULTIPLIER[self.stages[SPE] + 6]
+        return speed / 4 if self.status[self.active] == PAR else speed
+
+
+class FastGen1Battle:
+    def __init__(self, team1, team2, rng: random.Random):
+        self.rng = rng
+        self.sides = []
+        for pokemon_ids, moves_ids_per_pokemon in (team1, team2):
+            unknown = [pid for pid in pokemon_ids if pid not in POKEDEX]
+            unknown += [mid for ms in moves_ids_per_pokemon for mid in ms if mid not in MOVES]
+            if unknown or not all(moves_ids_per_pokemon):
+                raise ValueError(f"Unknown Pokémon or move IDs {unknown} or empty moveset")
+            # Pad short movesets with their first move so the table is rectangular
+            width = max(len(ms) for ms in moves_ids_per_pokemon)
+            moves = np.array([list(ms) + [ms[0]] * (width - len(ms)) for ms in moves_ids_per_pokemon])
+            self.sides.append(_Side(np.asarray(pokemon_ids, dtype=int), moves))
+
+        self.turns = 0
+        a, b = self.sides
+        # tables[s][i, j, k]: side s, its slot i using move k on opposing slot j
+        self.tables = [
+            damage_tables(a.species, a.moves, b.species),
+            damage_tables(b.species, b.moves, a.species),
+        ]
+
+    # ---------------- damage ----------------
+
+    def _expected_damage(self, s: int, slot: int, target: int, k: int) -> float:
+        attacker, defender = self.sides[s], self.sides[1 - s]
+        move = MOVES[int(attacker.moves[slot, k])]
+        if move.fixed_damage:
+            return move.fixed_damage * (self.tables[s][1][slot, target, k] > 0)
+        if move.half_hp:
+            return defender.hp[target] / 2
+        if move.ohko:
+            return defender.hp[target] * 0.3
+        core, modifier = self.tables[s]
+        if slot == attacker.active and target == defender.active:
+            am, dm = self._stage_ratio(s, move)
+        else:
+            am, dm = 1.0, 1.0
+        return (core[slot, target, k] * am / dm + 2) * modifier[slot, target, k] * 0.92 if move.power else 0.0
+
+    def _stage_ratio(self, s: int, move: MoveData) -> tuple[float, float]:
+        attacker, defender = self.sides[s], self.sides[1 - s]
+        if move.physical:
+            am = STAGE_MULTIPLIER[attacker.stages[ATK] + 6]
+            if attacker.status[attacker.active] == BRN:
+                am /= 2
+            return am, STAGE_MULTIPLIER[defender.stages[DEF] + 6]
+        return STAGE_MULTIPLIER[attacker.stages[SPC] + 6], STAGE_MULTIPLIER[defender.stages[SPC] + 6]
+
+    # ---------------- policy ----------------
+
+    def _move_value(self, s: int, k: int) -> float:
+        attacker, defender = self.sides[s], self.sides[1 - s]
+        move = MOVES[int(attacker.moves[attacker.active, k])]
+        target = defender.active
+        hp_fraction = attacker.hp[attacker.active] / attacker.max_hp[attacker.active]
+
+        value = 0.0
+        if move.attacking:
+            damage = self._expected_damage(s, attacker.active, target, k)
+            value = min(damage, defender.hp[target]) / defender.max_hp[target]
+            if damage >= defender.hp[target]:
+                value += KO_BONUS
+            if move.selfdestruct:
+                value -= hp_fraction
+            value *= move.accuracy
+        elif move.status and defender.status[target] == NONE:
+            if self._status_blocked(move, defender.species[target]):
+                return 0.0
+            value = STATUS_VALUE[move.status] * move.accuracy
+        elif move.heal or move.rest:
+            value = 0.6 * (1 - hp_fraction) if hp_fraction < 0.5 else 0.0
+        elif move.self_boosts and hp_fraction > 0.6:
+            if all(attacker.stages[slot] < 2 for slot, _ in move.self_boosts):
+                value = 0.3
+        return value
+
+    def choose_move(self, s: int) -> int:
+        side = self.sides[s]
+        values = [self._move_value(s, k) for k in range(side.moves.shape[1])]
+        best = max(values)
+        return self.rng.choice([k for k, v in enumerate(values) if v == best])
+
+    def choose_switch(self, s: int) -> int:
+        side, opponent = self.sides[s], self.sides[1 - s]
+
+        def matchup(slot):
+            dealt = max(
+                self._expected_damage(s, slot, opponent.active, k) / opponent.max_hp[opponent.active]
+                for k in range(side.moves.shape[1])
+            )
+            taken = max(
+                self._expected_damage(1 - s, opponent.active, slot, k) / side.max_hp[slot]
+                for k in range(opponent.moves.shape[1])
+            )
+            return dealt - taken
+
+        return max(side.alive(), key=matchup)
+
+    # ---------------- turn resolution ----------------
+
+    @staticmethod
+    def _status_blocked(move: MoveData, species: int) -> bool:
+        types = SPECIES_TYPES[species]
+        if TYPE_CHART[move.type, types[0]] == 0 or TYPE_CHART[move.type, types[1]] == 0:
+            return True
+        return move.status in (PSN, TOX) and TYPE_INDEX["POISON"] in types
+
+    def _inflict(self, side: _Side, status: int):
+        slot = side.active
+        if side.status[slot] != NONE or side.hp[slot] <= 0:
+            return
+        side.status[slot] = status
+        if status == SLP:
+            side.sleep_turns[slot] = self.rng.randint(1, 7)
+
+    def _use_move(self, s: int, k: int):
+        attacker, defender = self.sides[s], self.sides[1 - s]
+        slot, target = attacker.active, defender.active
+
+        if attacker.recharging:
+            attacker.recharging = False
+            return
+        status = attacker.status[slot]
+        if status in (SLP, FRZ):
+            if status == SLP:
+                attacker.sleep_turns[slot] -= 1
+                if attacker.sleep_turns[slot] <= 0:
+                    attacker.status[slot] = NONE
+            return
+        if status == PAR and self.rng.random() < 0.25:
+            return
+
+        move = MOVES[int(attacker.moves[slot, k])]
+
+        if move.rest:
+            attacker.hp[slot] = attacker.max_hp[slot]
+            attacker.status[slot] = SLP
+            attacker.sleep_turns[slot] = 2
+            return
+        if move.heal:
+            attacker.hp[slot] = min(attacker.max_hp[slot], attacker.hp[slot] + move.heal * attacker.max_hp[slot])
+            return
+        for stage, change in move.self_boosts:
+            attacker.stages[stage] = max(-6, min(6, attacker.stages[stage] + change))
+
+        if self.rng.random() >= move.accuracy:
+            if move.selfdestruct:
+                attacker.hp[slot] = 0
+            return
+
+        if move.attacking:
+            damage = self._roll_damage(s, slot, target, k, move)
+            if damage <= 0 and not move.selfdestruct:
+                return
+            damage = min(damage, defender.hp[target])
+            defender.hp[target] -= damage
+            if move.recoil:
+                attacker.hp[slot] = max(0.0, attacker.hp[slot] - damage * move.recoil)
+            if move.drain:
+                attacker.hp[slot] = min(attacker.max_hp[slot], attacker.hp[slot] + damage * move.drain)
+            if move.selfdestruct:
+                attacker.hp[slot] = 0
+            if move.recharge and defender.hp[target] > 0:
+                attacker.recharging = True
+            if defender.hp[target] > 0 and self.rng.random() < move.secondary_chance:
+                if move.secondary_status and not self._status_blocked(move, defender.species[target]):
+                    self._inflict(defender, move.secondary_status)
+                for stage, change in move.secondary_boosts:
+                    defender.stages[stage] = max(-6, min(6, defender.stages[stage] + change))
+        elif move.status:
+            if not self._status_blocked(move, defender.species[target]):
+                self._inflict(defender, move.status)
+        for stage, change in move.target_boosts:
+            defender.stages[stage] = max(-6, min(6, defender.stages[stage] + change))
+
+    def _roll_damage(self, s: int, slot: int, target: int, k: int, move: MoveData) -> float:
+        attacker, defender = self.sides[s], self.sides[1 - s]
+        core, modifier = self.tables[s]
+        if modifier[slot, target, k] == 0:
+            return 0.0
+        if move.fixed_damage:
+            return move.fixed_damage
+        if move.half_hp:
+            return max(1.0, defender.hp[target] // 2)
+        if move.ohko:
+            return defender.hp[target] if attacker.speed() >= defender.speed() else 0.0
+
+        crit_rate = BASE_SPEED[attacker.species[slot]] / 512 * (8 if move.high_crit else 1)
+        if self.rng.random() < min(crit_rate, 255 / 256):
+            # Critical hits ignore stat stages and roughly double damage
+            am, dm, crit = 1.0, 1.0, 1.95
+        else:
+            (am, dm), crit = self._stage_ratio(s, move), 1.0
+        random_factor = self.rng.randint(217, 255) / 255
+        return (core[slot, target, k] * am / dm * crit + 2) * modifier[slot, target, k] * random_factor
+
+    def _end_of_turn(self, side: _Side):
+        slot = side.active
+        if side.hp[slot] <= 0:
+            return
+        status = side.status[slot]
+        if status in (PSN, BRN):
+            side.hp[slot] = max(0.0, side.hp[slot] - side.max_hp[slot] / 16)
+        elif status == TOX:
+            side.toxic_counter += 1
+            side.hp[slot] = max(0.0, side.hp[slot] - side.max_hp[slot] * side.toxic_counter / 16)
+
+    def _order(self, choices: list[int]) -> list[int]:
+        priorities = [
+            MOVES[int(side.moves[side.active, k])].priority
+            for side, k in zip(self.sides, choices)
+        ]
+        if priorities[0] != priorities[1]:
+            return [0, 1] if priorities[0] > priorities[1] else [1, 0]
+        speeds = [side.speed() for side in self.sides]
+        if speeds[0] == speeds[1]:
+            return self.rng.sample([0, 1], 2)
+        return [0, 1] if speeds[0] > speeds[1] else [1, 0]
+
+    def run(self) -> int:
+        for self.turns in range(1, MAX_TURNS + 1):
+            choices = [self.choose_move(0), self.choose_move(1)]
+            for s in self._order(choices):
+                if self.sides[s].hp[self.sides[s].active] <= 0:
+                    continue  # fainted before it could move
+                if self.sides[1 - s].hp[self.sides[1 - s].active] <= 0:
+                    break
+                self._use_move(s, choices[s])
+
+            for side in self.sides:
+                self._end_of_turn(side)
+
+            alive = [side.alive() for side in self.sides]
+            if not alive[0] or not alive[1]:
+                if alive[0]:
+                    return 1
+                if alive[1]:
+                    return 2
+                return 0
+
+            for s, side in enumerate(self.sides):
+                if side.hp[side.active] <= 0:
+                    side.switch_in(self.choose_switch(s))
+
+        return 0
+
+    def outcome(self, winner: int) -> BattleOutcome:
+        hp = [float((side.hp / side.max_hp).mean()) for side in self.sides]
+        fainted = [int((side.hp <= 0).sum()) for side in self.sides]
+        return BattleOutcome(
+            winner=winner,
+            turns=self.turns,
+            hp_fraction=(hp[0], hp[1]),
+            fainted=(fainted[0], fainted[1]),
+        )
+
+
+def battle_outcome(
+    team1: tuple[list[int], list[list[int]]],
+    team2: tuple[list[int], list[list[int]]],
+    format: str,
+    seed: int | None = None,
+) -> BattleOutcome:
+    """Simulate one approximate Gen 1 battle in-process and report winner,
+    turns, remaining HP, fainted counts, duration and error.
+
+    Teams are checked against the format like on the Showdown engines, but
+    the same battle rules are used for every tier. A seed makes the battle
+    reproducible.
+    """
+    problems = matchup_problems(team1, team2, format)
+    if problems:
+        logging.error(f"Illegal team, battle skipped: {problems[0]}")
+        return BattleOutcome.failed(BattleError.INVALID_TEAM)
+
+    start = time.perf_counter()
+    try:
+        battle = FastGen1Battle(team1, team2, random.Random(seed))
+        outcome = battle.outcome(battle.run())
+    except ValueError as e:
+        logging.error(f"battle_once rejected a team: {e}")
+        outcome = BattleOutcome.failed(BattleError.INVALID_TEAM)
+    except Exception as e:
+        logging.error(f"battle_once failed catastrophically: {e}")
+        outcome = BattleOutcome.failed(BattleError.ENGINE_ERROR)
+
+    outcome.duration_sec = time.perf_counter() - start
+    return outcome
+
+
+def battle_once(
+    team1: tuple[list[int], list[list[int]]],
+    team2: tuple[list[int], list[list[int]]],
+    format: str,
+    seed: int | None = None,
+) -> BattleResult:
+    """Simulate one approximate Gen 1 battle in-process.
+
+    Returns:
+        1 if team1 wins
+        2 if team2 wins
+        0 if draw OR ANY ERROR, with the error on the result
+    """
+    return battle_outcome(team1, team2, format, seed).result
+
+
+def battle_outcomes(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int | None = None,
+) -> list[BattleOutcome]:
+    """Run a batch of battles. In-process battles are CPU-bound, so they run
+    one after another; concurrency is accepted for interface compatibility.
+    A job may carry a seed as a fourth element.
+    """
+    return [battle_outcome(*job) for job in jobs]
+
+
+def battle_many(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int | None = None,
+) -> list[BattleResult]:
+    """Like battle_outcomes, but with the same 1/2/0 results as battle_once."""
+    return [outcome.result for outcome in battle_outcomes(jobs, concurrency)]
@@ -1,7 +1,9 @@
 import argparse
 from utils import now_vancouver
 
+from config import ENGINES
 from experiments import EXPERIMENTS
+from poke_env_engine.battle_simulator import start_server_farm
 
 def main():
     parser = argparse.ArgumentParser(add_help=False)
@@ -35,10 +37,34 @@ def main():
     parser.add_argument(
         "--engine",
         default="poke-env",
-        choices=["poke-env"],
+        choices=list(ENGINES),
         help="Battle engine to use (default: poke-env)"
     )
 
+    parser.add_argument(
+        "--servers",
+        type=int,
+        default=0,
+        help="Launch this many local Showdown servers from the submodule and spread "
+             "poke-env battles across them (default: 0, use the server on port 8000)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Run each generation's battles across this many worker processes "
+             "(default: 1, in this process)",
+    )
+
+    parser.add_argument(
+        "--cache-samples",
+        type=int,
+        default=0,
+        help="Serve repeated matchups from the persistent battle cache, keeping up to "
+             "this many results per matchup (default: 0, disabled)",
+    )
+
     # Team evaluation option
     parser.add_argument(
         "--team-evaluation",
@@ -88,7 +114,9 @@ def main():
 
     args = parser.parse_args()
 
-    
+    if args.servers > 0:
+        start_server_farm(args.servers)
+
     experiment_fn(args.tier, args.engine, log=log, args=args)
 
     if args.team_evaluation:
@@ -6,17 +6,23 @@ from typing import List, Tuple, Union, Callable
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Any
+from battles.learnset_index import LearnsetIndex
+from battles.teams import team_hash
+from battles.validation import validate_team
 from utils import now_vancouver
 
 
+Team = Tuple[List[int], List[List[int]]]  # (pokemon_ids, moves_ids_per_pokemon)
+
+MAX_DUPLICATE_RESAMPLES = 20  # tries at a new team before settling for a random one
+MAX_RANDOM_RESAMPLES = 1000  # random teams tried after that before giving up
+
 @dataclass(frozen=True)
 class Evaluation:
     score: float
     team: Team
     meta: Any = None
 
-Team = Tuple[List[int], List[List[int]]]  # (pokemon_ids, moves_ids_per_pokemon)
-
 class PopulationOptimizer:
     def __init__(
         self,
@@ -24,19 +30,23 @@ class PopulationOptimizer:
         battle_engine_func: Callable,
         battle_format: str,
         logging: Union[bool, str] = False,  # False: no logs, True: default path, str: custom filename/folder
-        seed: int | None = None
+        seed: int | None = None,
+        keep_lead: bool = True,  # teams with different leads are different teams
     ):
         with open(learnsets_path, encoding="utf-8") as f:
             self.learnsets = json.load(f)
+        self.learnset_index = LearnsetIndex(self.learnsets)
         self.battle_engine_func = battle_engine_func
         self.format = battle_format
         self.population: List[Team] = []
+        self.keep_lead = keep_lead
 
         # Logging setup
         self.logging = logging
         self.logs = []
         self.start_time = None
         self.total_battles_used = 0
+        self.screening_battles_used = 0  # on a cheaper engine; not in total_battles_used
         self.run_id = str(uuid.uuid4())
 
         # seeding
@@ -45,28 +55,78 @@ class PopulationOptimizer:
 
     
     def sample_random_team(self) -> Team:
-        valid_pokemon = [
-            pid for pid, pdata in self.learnsets.items()
-            if len(pdata.get("learned", [])) >= 4
-        ]
-        if len(valid_pokemon) < 6:
-            raise ValueError("Not enough Pokémon with 4+ moves to build a full team")
-
-        chosen_pokemon = self.rng.sample(valid_pokemon, 6)
+        return self.learnset_index.sample_team(self.rng)
 
-        pokemon_ids = []
-        moves_ids_per_pokemon = []
+    def team_hash(self, team: Team) -> str:
+        return team_hash(team, self.keep_lead)
 
-        for pid in chosen_pokemon:
-            pdata = self.learnsets[pid]
-            pokemon_ids.append(int(pid))  # convert string ID to int
-
-            learned_moves = pdata.get("learned", [])
-            chosen_moves = self.rng.sample(learned_moves, 4)
-            moves_ids = [move["move_id"] for move in chosen_moves]
-            moves_ids_per_pokemon.append(moves_ids)
+    def unique_team(self, make_team: Callable[[], Team], seen: set) -> Team:
+        """
+        A legal team from make_team() whose hash is not in `seen`, resampling
+        duplicates (teams that only differ in move order or bench order are
+        the same team) and teams the format rejects, e.g. children of
+        crossover with the same species twice. After MAX_DUPLICATE_RESAMPLES
+        tries, falls back to up to MAX_RANDOM_RESAMPLES random teams, and
+        raises RuntimeError if none of those is new and legal either, e.g.
+        when a small tier has no unseen teams left. The new team's hash is
+        added to `seen`.
+        """
+        def rejected(team: Team) -> bool:
+            return self.team_hash(team) in seen or bool(validate_team(team, self.format))
+
+        team = make_team()
+        for _ in range(MAX_DUPLICATE_RESAMPLES):
+            if not rejected(team):
+                break
+            team = make_team()
+        for _ in range(MAX_RANDOM_RESAMPLES):
+            if not rejected(team):
+                break
+            team = self.sample_random_team()
+        if rejected(team):
+            raise RuntimeError(
+                f"No new legal team found in {MAX_DUPLICATE_RESAMPLES + MAX_RANDOM_RESAMPLES} "
+                f"tries; {len(seen)} teams are already taken"
+            )
+        seen.add(self.team_hash(team))
+        return team
+
+    def fill_unique(self, population: List[Team], size: int, make_team: Callable[[], Team]) -> List[Team]:
+        """
+        Extend population to `size` teams with unique_team(make_team), so no
+        two teams are the same and none wastes battles on a second rating or
+        on being rejected.
+        """
+        seen = {self.team_hash(team) for team in population}
+        while len(population) < size:
+            population.append(self.unique_team(make_team, seen))
+        return population
 
-        return (pokemon_ids, moves_ids_per_pokemon)
+    def run_battles(
+        self,
+        matchups: List[Tuple[Team, Team]],
+        seeds: List[int] | None = None,
+        battle_func: Callable | None = None,
+    ) -> List[int]:
+        """
+        Battle each (team1, team2) pair in self.format and return the results
+        in order. Engines with a `map` method (a BattleExecutor, or a cache
+        wrapping one) run the whole batch in parallel; others run serially.
+        With `seeds`, one per matchup, each battle is played with that seed.
+        `battle_func` replaces self.battle_engine_func for this batch.
+
+        Callers must count the battles in self.total_battles_used, or in
+        self.screening_battles_used for a cheaper screening engine.
+        """
+        battle_func = battle_func if battle_func is not None else self.battle_engine_func
+        if seeds is None:
+            jobs = [(team1, team2, self.format) for team1, team2 in matchups]
+        else:
+            jobs = [(team1, team2, self.format, seed) for (team1, team2), seed in zip(matchups, seeds)]
+        run_many = getattr(battle_func, "map", None)
+        if run_many is not None:
+            return run_many(jobs)
+        return [battle_func(*job) for job in jobs]
 
     def log_entry(self, iteration: int, team: Team, score: float):
         if not self.logging:
@@ -84,6 +144,7 @@ class PopulationOptimizer:
             "generation": iteration,
             "score": score,
             "total_battles_used": self.total_battles_used,
+            "screening_battles_used": self.screening_battles_used,
             "runtime_sec": runtime_sec,
             "run_seed": self.seed,
             "method": self.__class__.__name__,
@@ -161,6 +222,30 @@ class PopulationOptimizer:
         raise NotImplementedError("Must implement produce_next_generation")
     
 
+    def run_generation(self, iteration: int) -> List[Evaluation]:
+        """
+        Evaluate and log the current population, then replace it with the
+        next generation.
+
+        Returns:
+            The generation's Evaluation objects, sorted by score descending.
+        """
+        scores = self.evaluate_teams(self.population)
+
+        # Optional: sort only for logging / readability
+        scores_sorted = sorted(scores, key=lambda e: e.score, reverse=True)
+
+        # Logging
+        for e in scores:
+            score = e.score
+            team = e.team
+            self.log_entry(iteration, team, score)
+
+        self.population = self.produce_next_generation(scores_sorted)
+
+        return scores_sorted
+
+
     def optimize(self, generations: int):
         self.initialize_population()
         self.start_time = time.time()
@@ -171,34 +256,19 @@ class PopulationOptimizer:
         for iteration in range(1, generations + 1):
             print(f"Generation {iteration}/{generations}")
 
-            scores = self.evaluate_teams(self.population)
+            scores_sorted = self.run_generation(iteration)
 
             # Update global best
-            for e in scores:
+            for e in scores_sorted:
                 if e.score > best_score:
                     best_score = e.score
                     best_team = e.team
 
-            # Optional: sort only for logging / readability
-            scores_sorted = sorted(scores, key=lambda e: e.score, reverse=True)
-
             if scores_sorted:
                 print(f"Best score this generation: {scores_sorted[0].score}")
             else:
                 print("No teams evaluated this generation.")
 
-
-            # Logging
-            for e in scores:
-                score = e.score
-                team = e.team
-                self.log_entry(iteration, team, score)
-
-
-            self.population = self.produce_next_generation(scores_sorted)
-
         self.save_logs()
 
         return best_score, best_team
-
-
@@ -0,0 +1,320 @@
+import math
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from optimization.base import PopulationOptimizer, Evaluation, Team
+from optimization.ratings import RATING_BACKENDS, GLICKO_Q, glicko_g, glicko_expected
+
+# "sequential": num_matchups random pairs, each rated right after its battle
+#               (the original behaviour, kept for reproducing old runs)
+# "rounds":     Swiss-style rounds of disjoint pairs; each round's battles run
+#               together and its ratings are updated at the end of the round
+# "racing":     successive halving; Swiss rounds among fewer and fewer
+#               contenders, dropping the lower-rated half after each rung
+# "active":     rounds of the pairs expected to tell the most about which
+#               teams make the top survivors_count; needs a rating backend
+#               with uncertainties (glicko or bradley-terry)
+# "paired":     common random numbers; rounds in which every team plays the
+#               same opponent under the same battle seed, once on each side
+EVALUATION_MODES = ("sequential", "rounds", "racing", "active", "paired")
+
+
+class EloPopulationOptimizer(PopulationOptimizer):
+    """
+    Population optimizer that ranks teams by rating from random battles
+    within the population. Subclasses only decide how the next population is
+    built (produce_next_generation) and call carry_over_ratings for it.
+
+    `rating` picks the backend from optimization.ratings: incremental "elo"
+    (the original behaviour) or a "bradley-terry" fit over the whole
+    generation. Both report scores on the Elo scale.
+
+    With a `screening_engine_func`, e.g. the fast-gen1 engine, evaluation
+    has two fidelities: see screen_teams.
+    """
+
+    def __init__(
+        self,
+        *,
+        num_matchups: int,
+        population_size: int,
+        survivors_count: int,
+        evaluation_mode: str = "sequential",
+        rating: str = "elo",
+        screening_engine_func: Callable | None = None,
+        screening_matchups: int | None = None,
+        promote_fraction: float = 0.5,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert survivors_count < population_size, "survivors_count must be less than population_size"
+        assert evaluation_mode in EVALUATION_MODES, f"evaluation_mode must be one of {EVALUATION_MODES}"
+        assert rating in RATING_BACKENDS, f"rating must be one of {tuple(RATING_BACKENDS)}"
+        assert evaluation_mode != "active" or hasattr(RATING_BACKENDS[rating], "uncertainties"), \
+            f"evaluation_mode 'active' needs a rating with uncertainties, not '{rating}'"
+        assert 0.0 < promote_fraction <= 1.0, "promote_fraction must be in (0, 1]"
+        self.population_size = population_size
+        self.survivors_count = survivors_count
+        self.num_matchups = num_matchups
+        self.evaluation_mode = evaluation_mode
+        self.rating = rating
+        self.ratings = RATING_BACKENDS[rating]()
+        self.screening_engine_func = screening_engine_func
+        self.screening_matchups = screening_matchups if screening_matchups is not None else num_matchups
+        self.promote_fraction = promote_fraction
+
+    def initialize_population(self):
+        self.population = self.fill_unique([], self.population_size, self.sample_random_team)
+
+    # ---------------- rating ----------------
+
+    def update_ratings(
+        self,
+        pairs: List[Tuple[int, int]],
+        results: List[int],
+        screening: bool = False,
+        reference: int | None = None,
+    ):
+        """
+        Rate the battles of `pairs`; `screening` if they were played on the
+        screening engine. A `reference` team's own rating is left as it is.
+        """
+        self.ratings.update(pairs, results, reference=reference)
+
+    def carry_over_ratings(self, survivors: List[Evaluation]):
+        """Keep the survivors' ratings, first, and reset the rest of the population."""
+        self.ratings.carry_over([e.meta["index"] for e in survivors], self.population_size)
+
+    # ---------------- evaluation ----------------
+
+    def evaluate_teams(self, population):
+        n = len(population)
+        self.ratings.start_generation(n)
+
+        teams = list(range(n))
+        if self.screening_engine_func is not None:
+            teams = self.screen_teams(population)
+
+        if self.evaluation_mode == "rounds":
+            self.evaluate_rounds(population, teams)
+        elif self.evaluation_mode == "racing":
+            self.evaluate_racing(population, teams)
+        elif self.evaluation_mode == "active":
+            self.evaluate_active(population, teams)
+        elif self.evaluation_mode == "paired":
+            self.evaluate_paired(population, teams)
+        else:
+            self.evaluate_sequential(population, teams)
+
+        scores = self.ratings.scores()
+        return [
+            Evaluation(
+                score=scores[i],
+                team=population[i],
+                meta={"index": i}
+            )
+            for i in range(n)
+        ]
+
+    def screen_teams(self, population: List[Team]) -> List[int]:
+        """
+        Low-fidelity first stage: Swiss rounds of screening_matchups battles
+        on the screening engine among the whole population, rated like any
+        other battle. The promote_fraction best-rated teams, and at least
+        survivors_count + 1, are returned to be evaluated on the main engine.
+        The others keep their screening rating, like teams dropped while
+        racing. Screening battles count in screening_battles_used, not in
+        total_battles_used.
+        """
+        n = len(population)
+        teams = list(range(n))
+        self.play_rounds(population, teams, self.screening_matchups, set(), screening=True)
+
+        scores = self.ratings.scores()
+        teams.sort(key=lambda i: scores[i], reverse=True)
+        promoted = max(self.survivors_count + 1, math.ceil(self.promote_fraction * n))
+        return teams[:min(promoted, n)]
+
+    def evaluate_sequential(self, population: List[Team], teams: List[int]):
+        # Pairings don't depend on results, so all battles can run at once;
+        # ratings are then updated in the same order as one by one.
+        pairs = [self.rng.sample(teams, 2) for _ in range(self.num_matchups)]
+        results = self.run_battles([(population[i], population[j]) for i, j in pairs])
+
+        for pair, result in zip(pairs, results):
+            self.total_battles_used += 1
+            self.update_ratings([pair], [result])
+
+    def swiss_pairs(self, teams: List[int], played: set) -> List[Tuple[int, int]]:
+        """
+        Disjoint pairs for one round among `teams`: they are ordered by
+        rating (ties in random order) and each is paired with the
+        closest-rated team it has not met yet this generation, if any. With
+        an odd number of teams one sits out.
+        """
+        scores = self.ratings.scores()
+        order = list(teams)
+        self.rng.shuffle(order)
+        order.sort(key=lambda i: scores[i], reverse=True)
+
+        pairs = []
+        while len(order) >= 2:
+            i = order.pop(0)
+            j = next((j for j in order if (min(i, j), max(i, j)) not in played), order[0])
+            order.remove(j)
+            pairs.append((i, j))
+        return pairs
+
+    def play_rounds(self, population: List[Team], teams: List[int], budget: int, played: set, screening: bool = False):
+        """
+        Play Swiss rounds among `teams` until `budget` battles are used, on
+        the screening engine if `screening`.
+        """
+        battle_func = self.screening_engine_func if screening else None
+        remaining = budget
+
+        while remaining > 0:
+            pairs = self.swiss_pairs(teams, played)[:remaining]
+            if not pairs:
+                break
+            results = self.run_battles([(population[i], population[j]) for i, j in pairs], battle_func=battle_func)
+            self.update_ratings(pairs, results, screening=screening)
+
+            played.update((min(i, j), max(i, j)) for i, j in pairs)
+            if screening:
+                self.screening_battles_used += len(pairs)
+            else:
+                self.total_battles_used += len(pairs)
+            remaining -= len(pairs)
+
+    def evaluate_rounds(self, population: List[Team], teams: List[int]):
+        self.play_rounds(population, teams, self.num_matchups, set())
+
+    def evaluate_racing(self, population: List[Team], teams: List[int]):
+        """
+        Successive halving: the budget is split evenly over rungs. Every rung
+        plays Swiss rounds among the remaining contenders, then drops the
+        lower-rated half, keeping at least survivors_count + 1 so the cutoff
+        stays contested. Weak teams are dropped after a couple of battles and
+        the rest of the budget goes to the contenders. Dropped teams keep
+        the rating they had when they were dropped.
+        """
+        n = len(teams)
+        keep_at_least = min(self.survivors_count + 1, n)
+        rungs = max(1, math.ceil(math.log2(n / keep_at_least)))
+
+        contenders = list(teams)
+        played = set()
+        spent = 0
+        for rung in range(rungs):
+            budget = (self.num_matchups - spent) // (rungs - rung)
+            if rung == rungs - 1:
+                budget = self.num_matchups - spent
+            before = self.total_battles_used
+            self.play_rounds(population, contenders, budget, played)
+            spent += self.total_battles_used - before
+
+            if rung < rungs - 1:
+                scores = self.ratings.scores()
+                contenders.sort(key=lambda i: scores[i], reverse=True)
+                contenders = contenders[:max(keep_at_least, math.ceil(len(contenders) / 2))]
+
+    def informative_pairs(self, teams: List[int], count: int) -> List[Tuple[int, int]]:
+        """
+        Greedily pick `count` pairs among `teams` that most reduce the
+        uncertainty about which of them rank above the survivor cutoff.
+
+        A team's weight is the normal density of its distance to the cutoff
+        (midway between the survivors_count-th and next-best means) in units
+        of its uncertainty, so teams whose side of the cutoff is already
+        certain get almost no battles. A pair is worth its teams' weighted
+        relative variance reductions, as predicted by a Glicko update; after
+        each pick the two teams' predicted variances shrink, so a team is
+        not picked again until it is again worth it. Teams may appear in
+        several pairs of one batch.
+        """
+        teams = np.asarray(teams)
+        mu = np.asarray(self.ratings.scores())[teams]
+        sigma = np.asarray(self.ratings.uncertainties())[teams]
+        k = min(self.survivors_count, len(teams) - 1)
+        top = np.sort(mu)[::-1]
+        cutoff = (top[k - 1] + top[k]) / 2
+        z = (mu - cutoff) / sigma
+        weight = np.exp(-z ** 2 / 2)
+
+        var = sigma ** 2
+        pairs = []
+        for _ in range(count):
+            sd = np.sqrt(var)
+            # info[i, j]: Fisher information i gains from one battle against j
+            e = glicko_expected(mu[:, None], mu[None, :], sd[None, :])
+            info = GLICKO_Q ** 2 * glicko_g(sd[None, :]) ** 2 * e * (1 - e)
+            reduction = 1 - 1 / (1 + var[:, None] * info)  # relative variance reduction
+            gain = weight[:, None] * reduction
+            value = gain + gain.T
+            np.fill_diagonal(value, -np.inf)
+
+            i, j = np.unravel_index(np.argmax(value), value.shape)
+            pairs.append((int(teams[i]), int(teams[j])))
+            var[i] /= 1 + var[i] * info[i, j]
+            var[j] /= 1 + var[j] * info[j, i]
+        return pairs
+
+    def evaluate_active(self, population: List[Team], teams: List[int]):
+        remaining = self.num_matchups
+
+        while remaining > 0:
+            # Batches as large as a round, so they parallelize as well
+            pairs = self.informative_pairs(teams, min(len(teams) // 2, remaining))
+            if not pairs:
+                break
+            results = self.run_battles([(population[i], population[j]) for i, j in pairs])
+            self.update_ratings(pairs, results)
+
+            self.total_battles_used += len(pairs)
+            remaining -= len(pairs)
+
+    def evaluate_paired(self, population: List[Team], teams: List[int]):
+        """
+        Common random numbers: each round, one opponent drawn from `teams`
+        plays each of the others twice under the round's battle seed, once
+        from each side. All teams are then compared on the same
+        battles, so differences between their results come from the teams
+        rather than from luck, and player-1 advantage cancels out.
+
+        A round costs 2 * (n - 1) battles; as many rounds are played as fit
+        in num_matchups, and always at least one. Opponents don't repeat
+        within a generation while there are teams left to draw. Seeds are
+        drawn afresh every generation, so a survivor meeting the same
+        opponent again plays new battles rather than replaying old ones.
+
+        The opponent is only a reference within its round: its battles
+        rate the other teams, and it is rated in the rounds it plays as one
+        of them. Rating it on 2 * (n - 1) battles at once would move it by
+        far more than a single battle can move anyone else.
+        """
+        n = len(teams)
+        rounds = max(1, self.num_matchups // (2 * (n - 1)))
+
+        opponents = []
+        while len(opponents) < rounds:
+            order = list(teams)
+            self.rng.shuffle(order)
+            opponents += order
+        battle_seeds = [self.rng.getrandbits(32) for _ in range(rounds)]
+
+        # Pairings don't depend on results, so every round runs in one batch
+        round_pairs = [
+            [pair for i in teams if i != opponent for pair in ((i, opponent), (opponent, i))]
+            for opponent in opponents[:rounds]
+        ]
+        pairs = [pair for batch in round_pairs for pair in batch]
+        seeds = [seed for batch, seed in zip(round_pairs, battle_seeds) for _ in batch]
+        results = self.run_battles([(population[i], population[j]) for i, j in pairs], seeds)
+
+        start = 0
+        for opponent, batch in zip(opponents, round_pairs):
+            self.update_ratings(batch, results[start:start + len(batch)], reference=opponent)
+            self.total_battles_used += len(batch)
+            start += len(batch)
@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import numpy as np
+
+from optimization import population_array
+from optimization.elo import EloPopulationOptimizer
+from optimization.population_array import PopulationArray
+from config import get_format, get_engine
+from utils import build_team_summary
+
+
+class EloEstimationOfDistribution(EloPopulationOptimizer):
+    """
+    Estimation-of-distribution optimizer in the style of PBIL.
+
+    Keeps a probability for every eligible species (how likely it is to be
+    on a team) and, per species, for each of its legal moves. New teams are
+    sampled from these in batch: six species and then four moves per
+    Pokémon, without replacement in proportion to their probabilities.
+
+    After every generation the model moves `learning_rate` of the way
+    towards the species and move frequencies of the survivors, the
+    survivors_count best-rated teams. Move probabilities only change for
+    species that appear among them. Every probability is kept at least
+    `min_probability` times its uniform value, so nothing is ruled out for
+    good. Survivors stay in the population like in the GA, with their
+    ratings.
+    """
+
+    def __init__(
+        self,
+        *,
+        learning_rate: float = 0.2,
+        min_probability: float = 0.1,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert 0.0 < learning_rate <= 1.0, "learning_rate must be in (0, 1]"
+        assert 0.0 <= min_probability < 1.0, "min_probability must be in [0, 1)"
+        self.learning_rate = learning_rate
+        self.min_probability = min_probability
+        self.np_rng = np.random.default_rng(self.seed)
+        self.arrays: PopulationArray | None = None
+
+        index = self.learnset_index
+        self.species_probs = np.full(len(index.species), 1 / len(index.species))  # aligned with index.species
+        self.species_position = np.full(len(index.species_rows), -1, dtype=np.int64)
+        self.species_position[index.species] = np.arange(len(index.species))
+        counts = np.diff(index.offsets)
+        self.move_probs = 1 / np.repeat(counts, counts).astype(float)  # aligned with index.move_ids
+
+    # ---------------- model ----------------
+
+    def sample_arrays(self, n: int) -> PopulationArray:
+        return population_array.random_population(
+            self.learnset_index, n, self.np_rng,
+            species_weights=self.species_probs,
+            move_weights=self.move_probs,
+        )
+
+    def random_arrays(self, n: int) -> PopulationArray:
+        return population_array.random_population(self.learnset_index, n, self.np_rng)
+
+    def update_model(self, elites: PopulationArray):
+        index = self.learnset_index
+        rate = self.learning_rate
+
+        # Species: share of the elites' slots
+        positions = self.species_position[elites.species.ravel()]
+        frequency = np.bincount(positions, minlength=len(index.species)) / positions.size
+        self.species_probs = (1 - rate) * self.species_probs + rate * frequency
+        self.species_probs = self._floor(self.species_probs)
+
+        # Moves: share of each elite species' move slots, for those species only
+        positions = index.move_positions(elites.species, elites.moves).ravel()
+        move_counts = np.bincount(positions[positions >= 0], minlength=len(index.move_ids)).astype(float)
+
+        for row in np.unique(index.species_rows[elites.species]):
+            segment = slice(index.offsets[row], index.offsets[row + 1])
+            frequency = move_counts[segment] / max(move_counts[segment].sum(), 1.0)
+            probs = (1 - rate) * self.move_probs[segment] + rate * frequency
+            self.move_probs[segment] = self._floor(probs)
+
+    def _floor(self, probs: np.ndarray) -> np.ndarray:
+        """Keep every probability at least min_probability of uniform, summing to 1."""
+        probs = np.maximum(probs, self.min_probability / len(probs))
+        return probs / probs.sum()
+
+    # ---------------- generations ----------------
+
+    def initialize_population(self):
+        self.arrays = population_array.replace_duplicates(
+            PopulationArray.empty(),
+            self.sample_arrays(self.population_size),
+            self.sample_arrays,
+            self.random_arrays,
+            self.keep_lead,
+        )
+        self.population = self.arrays.to_teams()
+
+    def produce_next_generation(self, evaluations):
+        # Sort by fitness
+        evaluations = sorted(evaluations, key=lambda e: e.score, reverse=True)
+
+        # Select survivors; they are also the elites the model learns from
+        survivors = evaluations[:self.survivors_count]
+        survivor_arrays = self.arrays.take([e.meta["index"] for e in survivors])
+        self.update_model(survivor_arrays)
+
+        # Build next population
+        samples = population_array.replace_duplicates(
+            survivor_arrays,
+            self.sample_arrays(self.population_size - len(survivors)),
+            self.sample_arrays,
+            self.random_arrays,
+            self.keep_lead,
+        )
+        self.arrays = PopulationArray.concat([survivor_arrays, samples])
+
+        # Carry over Elo for survivors; sampled teams start from BASE_ELO
+        self.carry_over_ratings(survivors)
+        return self.arrays.to_teams()
+
+
+if __name__ == "__main__":
+    tier = "OU"  # Choose any one of: "Uber", "OU", "UU", "NU", "PU", "ZU", "LC"
+    learnsets_file = Path(f"data/learnsets_by_tier/learnsets_{tier.lower()}.json")
+    battle_engine_func = get_engine("poke-env")
+    battle_format = get_format(tier)
+
+    # choose hyper parameters
+    population_size = 10
+    survivors_count = 2
+    num_matchups = 25
+    generations = 5
+
+    optimizer = EloEstimationOfDistribution(learnsets_path=learnsets_file,
+                               battle_engine_func=battle_engine_func,
+                               battle_format=battle_format,
+                               population_size=population_size,
+                               survivors_count=survivors_count,
+                               num_matchups=num_matchups,
+                               learning_rate=0.2,
+                               logging="test_experiment",
+                               seed=None)
+
+    best_score, best_team = optimizer.optimize(generations)
+
+    print("\nFinal Top Teams:")
+    print(f"Score: {best_score}")
+    print(build_team_summary(*best_team))
@@ -1,77 +1,27 @@
-import random
 from pathlib import Path
-from optimization.base import PopulationOptimizer, Evaluation, Team
+
+import numpy as np
+
+from optimization.base import Team
+from optimization.elo import EloPopulationOptimizer
+from optimization import population_array
+from optimization.population_array import PopulationArray
 from config import get_format, get_engine
 from utils import build_team_summary
 
-BASE_ELO = 1000.0
-K_FACTOR = 32
-ELO_DECAY = 0.2  # 0.0 = full memory, 1.0 = full reset
 
-class EloGeneticAlgorithm(PopulationOptimizer):
+class EloGeneticAlgorithm(EloPopulationOptimizer):
     def __init__(
         self,
         *,
-        num_matchups: int,
-        population_size: int,
-        survivors_count: int,
         p_pokemon_mutation_rate: float,
         move_mutation_rate: float,
         **kwargs,
     ):
         super().__init__(**kwargs)
-        assert survivors_count < population_size, "survivors_count must be less than population_size"
-        self.population_size = population_size
-        self.survivors_count = survivors_count
-        self.num_matchups = num_matchups
         self.p_pokemon = p_pokemon_mutation_rate
         self.p_move = move_mutation_rate
-        self.elo = None  # initialized on first evaluation
-
-    def initialize_population(self):
-        self.population = [self.sample_random_team() for _ in range(self.population_size)]
-
-    def evaluate_teams(self, population):
-        n = len(population)
-
-        if self.elo is None or len(self.elo) != n:
-            self.elo = [BASE_ELO] * n
-        else:
-            self.elo = [
-                (1 - ELO_DECAY) * r + ELO_DECAY * BASE_ELO
-                if r != BASE_ELO else BASE_ELO
-                for r in self.elo
-            ]
 
-        for _ in range(self.num_matchups):
-            i, j = self.rng.sample(range(n), 2)
-
-            ra, rb = self.elo[i], self.elo[j]
-            ea = 1 / (1 + 10 ** ((rb - ra) / 400))
-            eb = 1 - ea
-
-            result = self.battle_engine_func(population[i], population[j], self.format)
-
-            if result == 1:
-                sa, sb = 1.0, 0.0
-            elif result == 2:
-                sa, sb = 0.0, 1.0
-            else:
-                sa, sb = 0.5, 0.5
-
-            self.elo[i] += K_FACTOR * (sa - ea)
-            self.elo[j] += K_FACTOR * (sb - eb)
-            self.total_battles_used += 1
-
-        return [
-            Evaluation(
-                score=self.elo[i],
-                team=population[i],
-                meta={"index": i}
-            )
-            for i in range(n)
-        ]
-    
     def crossover(self, parent_a: Team, parent_b: Team) -> Team:
         pa_ids, pa_moves = parent_a
         pb_ids, pb_moves = parent_b
@@ -97,18 +47,12 @@ class EloGeneticAlgorithm(PopulationOptimizer):
         # Pokémon mutation
         for i in range(6):
             if self.rng.random() < p_pokemon:
-                pid_list, move_list = self.sample_random_team()
-                pokemon_ids[i], moves[i] = pid_list[0], move_list[0]
-                                            
+                pokemon_ids[i], moves[i] = self.learnset_index.sample_random_slot(self.rng)
 
         # Move mutation
         for i in range(6):
             if self.rng.random() < p_move:
-                pid = str(pokemon_ids[i])
-                learned = self.learnsets[pid]["learned"]
-                moves[i] = self.rng.sample(
-                    [m["move_id"] for m in learned], 4
-                )
+                moves[i] = self.learnset_index.sample_moves(pokemon_ids[i], self.rng)
 
         return (pokemon_ids, moves)
 
@@ -121,23 +65,73 @@ class EloGeneticAlgorithm(PopulationOptimizer):
         survivors = evaluations[:self.survivors_count]
 
         # Build next population
-        new_population = [e.team for e in survivors]
-        while len(new_population) < self.population_size:
+        def breed():
             p1, p2 = self.rng.sample(survivors, 2)
             child = self.crossover(p1.team, p2.team)
-            child = self.mutate(child, self.p_pokemon, self.p_move)
-            new_population.append(child)
-
-        # Carry over Elo in the corresponding to survivors in the new generation
-        new_elo = [self.elo[e.meta["index"]] for e in survivors]
+            return self.mutate(child, self.p_pokemon, self.p_move)
 
-        # Reset Elo for newly sampled teams
-        new_elo += [BASE_ELO] * (self.population_size - self.survivors_count)
+        # Children that repeat a team already in the population are bred again
+        new_population = self.fill_unique([e.team for e in survivors], self.population_size, breed)
 
-        self.elo = new_elo
+        # Carry over Elo for survivors; children start from BASE_ELO
+        self.carry_over_ratings(survivors)
         return new_population
 
 
+class VectorizedEloGeneticAlgorithm(EloGeneticAlgorithm):
+    """
+    EloGeneticAlgorithm with the population kept as a PopulationArray, so
+    sampling, crossover and mutation run as a few NumPy operations per
+    generation rather than per team. The operators are the same, but they
+    draw from a NumPy generator, so a seed gives different runs than
+    EloGeneticAlgorithm.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.np_rng = np.random.default_rng(self.seed)
+        self.arrays: PopulationArray | None = None
+
+    def random_arrays(self, n: int) -> PopulationArray:
+        return population_array.random_population(self.learnset_index, n, self.np_rng)
+
+    def breed_arrays(self, survivors: PopulationArray, n: int) -> PopulationArray:
+        # Two distinct survivors per child
+        k = len(survivors)
+        first = self.np_rng.integers(0, k, size=n)
+        second = (first + self.np_rng.integers(1, k, size=n)) % k
+
+        children = population_array.crossover(survivors.take(first), survivors.take(second), self.np_rng)
+        return population_array.mutate(children, self.learnset_index, self.p_pokemon, self.p_move, self.np_rng)
+
+    def initialize_population(self):
+        self.arrays = population_array.replace_duplicates(
+            PopulationArray.empty(),
+            self.random_arrays(self.population_size),
+            self.random_arrays,
+            self.random_arrays,
+            self.keep_lead,
+        )
+        self.population = self.arrays.to_teams()
+
+    def produce_next_generation(self, evaluations):
+        evaluations = sorted(evaluations, key=lambda e: e.score, reverse=True)
+        survivors = evaluations[:self.survivors_count]
+        survivor_arrays = self.arrays.take([e.meta["index"] for e in survivors])
+
+        children = population_array.replace_duplicates(
+            survivor_arrays,
+            self.breed_arrays(survivor_arrays, self.population_size - len(survivors)),
+            lambda n: self.breed_arrays(survivor_arrays, n),
+            self.random_arrays,
+            self.keep_lead,
+        )
+        self.arrays = PopulationArray.concat([survivor_arrays, children])
+
+        # Carry over Elo for survivors; children start from BASE_ELO
+        self.carry_over_ratings(survivors)
+        return self.arrays.to_teams()
+
 if __name__ == "__main__":
     tier = "OU"  # Choose any one of: "Uber", "OU", "UU", "NU", "PU", "ZU", "LC"
     learnsets_file = Path(f"data/learnsets_by_tier/learnsets_{tier.lower()}.json")
@@ -0,0 +1,225 @@
+import multiprocessing
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import poke_env_engine.battle_simulator
+from battles.cache import CachedBattleEngine
+from config import get_engine
+from optimization.base import PopulationOptimizer, Team
+from optimization.elo_ga import EloGeneticAlgorithm
+
+
+def _island_main(
+    conn,
+    engine: str,
+    workers: int,
+    server_ports: List[int] | None,
+    cache_samples: int,
+    screening_engine: str | None,
+    ga_kwargs: dict,
+):
+    """
+    Body of one island process. It builds its own engine and
+    EloGeneticAlgorithm, then serves the coordinator over `conn`:
+
+        ("run", first, count)  play generations first .. first + count - 1 and
+                               reply, per generation, with
+                               (total_battles_used, screening_battles_used,
+                                [(score, team), ...] best first)
+        ("migrate", teams)     replace the newest children with the teams
+                               the island doesn't already have
+        ("stop",)
+    """
+    if engine == "poke-env" and server_ports:
+        poke_env_engine.battle_simulator.attach_server_farm(server_ports)
+    battle_engine_func = get_engine(engine, workers=workers)
+    if cache_samples > 0:
+        battle_engine_func = CachedBattleEngine(battle_engine_func, engine, max_samples=cache_samples)
+
+    if screening_engine is not None:
+        screening_engine_func = get_engine(screening_engine, workers=workers)
+        if cache_samples > 0:
+            screening_engine_func = CachedBattleEngine(screening_engine_func, screening_engine, max_samples=cache_samples)
+        ga_kwargs = dict(ga_kwargs, screening_engine_func=screening_engine_func)
+
+    ga = EloGeneticAlgorithm(battle_engine_func=battle_engine_func, logging=False, **ga_kwargs)
+    ga.initialize_population()
+
+    while True:
+        command, *args = conn.recv()
+        if command == "run":
+            first, count = args
+            generations = []
+            for iteration in range(first, first + count):
+                scores = ga.run_generation(iteration)
+                generations.append(
+                    (ga.total_battles_used, ga.screening_battles_used, [(e.score, e.team) for e in scores])
+                )
+            conn.send(generations)
+        elif command == "migrate":
+            # Teams the island already has would take a second rating slot
+            seen = {ga.team_hash(team) for team in ga.population}
+            teams = [team for team in args[0] if ga.team_hash(team) not in seen]
+            if teams:
+                ga.population[-len(teams):] = teams
+        else:
+            break
+
+    for func in (battle_engine_func, ga.screening_engine_func):
+        close = getattr(func, "close", None)
+        if close is not None:
+            close()
+
+
+class IslandEloGeneticAlgorithm(PopulationOptimizer):
+    """
+    Island model of EloGeneticAlgorithm: `islands` independent populations,
+    each in its own process with its own RNG stream and battle engine
+    (`workers_per_island` battle workers). Every `migration_interval`
+    generations, each island's top `migrants` teams replace the newest
+    children of the next island in a ring; islands share nothing between
+    migrations.
+
+    population_size, survivors_count and num_matchups are per island, and
+    the other keyword arguments go to each island's EloGeneticAlgorithm.
+    With `screening_engine`, each island builds that engine and screens
+    its population with it (see EloPopulationOptimizer.screen_teams).
+    Logs hold every island's teams under one run id, with
+    total_battles_used and screening_battles_used summed over the islands.
+    """
+
+    def __init__(
+        self,
+        *,
+        learnsets_path: Path,
+        battle_format: str,
+        engine: str,
+        islands: int,
+        migration_interval: int = 5,
+        migrants: int = 2,
+        workers_per_island: int = 1,
+        cache_samples: int = 0,
+        screening_engine: str | None = None,
+        logging=False,
+        seed: int | None = None,
+        **ga_kwargs,
+    ):
+        super().__init__(
+            learnsets_path=learnsets_path,
+            battle_engine_func=None,  # each island builds its own
+            battle_format=battle_format,
+            logging=logging,
+            seed=seed,
+        )
+        assert islands >= 1, "islands must be at least 1"
+        assert migration_interval >= 1, "migration_interval must be at least 1"
+        assert 0 <= migrants <= ga_kwargs["population_size"] - ga_kwargs["survivors_count"], \
+            "migrants must fit in the children of a generation"
+        self.learnsets_path = learnsets_path
+        self.engine = engine
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.workers_per_island = workers_per_island
+        self.cache_samples = cache_samples
+        self.screening_engine = screening_engine
+        self.ga_kwargs = ga_kwargs
+
+        # One independent RNG stream per island, drawn from the run's seed
+        self.island_seeds = [self.rng.getrandbits(32) for _ in range(islands)]
+        self.processes = []
+        self.connections = []
+
+    # ---------------- islands ----------------
+
+    def start_islands(self):
+        ctx = multiprocessing.get_context("spawn")
+        farm = poke_env_engine.battle_simulator.SERVER_FARM
+        server_ports = farm.ports if farm is not None else None
+
+        for k, seed in enumerate(self.island_seeds):
+            ga_kwargs = dict(
+                self.ga_kwargs,
+                learnsets_path=self.learnsets_path,
+                battle_format=self.format,
+                seed=seed,
+            )
+            parent, child = ctx.Pipe()
+            # Not a daemon: an island may start its own battle workers
+            process = ctx.Process(
+                target=_island_main,
+                args=(
+                    child,
+                    self.engine,
+                    self.workers_per_island,
+                    server_ports,
+                    self.cache_samples,
+                    self.screening_engine,
+                    ga_kwargs,
+                ),
+                name=f"island-{k}",
+            )
+            process.start()
+            self.processes.append(process)
+            self.connections.append(parent)
+
+    def stop_islands(self):
+        for conn in self.connections:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self.processes, self.connections = [], []
+
+    def migrate(self, rankings: List[List[Tuple[float, Team]]]):
+        """Send each island's top teams to the next island in the ring."""
+        for k, ranking in enumerate(rankings):
+            teams = [team for _, team in ranking[:self.migrants]]
+            self.connections[(k + 1) % self.islands].send(("migrate", teams))
+
+    # ---------------- main loop ----------------
+
+    def optimize(self, generations: int):
+        self.start_time = time.time()
+        self.start_islands()
+
+        best_score = float("-inf")
+        best_team = None
+
+        try:
+            iteration = 1
+            while iteration <= generations:
+                count = min(self.migration_interval, generations - iteration + 1)
+                for conn in self.connections:
+                    conn.send(("run", iteration, count))
+                results = [conn.recv() for conn in self.connections]
+
+                for offset in range(count):
+                    print(f"Generation {iteration + offset}/{generations}")
+                    self.total_battles_used = sum(island[offset][0] for island in results)
+                    self.screening_battles_used = sum(island[offset][1] for island in results)
+
+                    generation_best = float("-inf")
+                    for island in results:
+                        for score, team in island[offset][2]:
+                            if score > best_score:
+                                best_score = score
+                                best_team = team
+                            generation_best = max(generation_best, score)
+                            self.log_entry(iteration + offset, team, score)
+                    print(f"Best score this generation: {generation_best}")
+
+                iteration += count
+                if iteration <= generations:
+                    self.migrate([island[-1][2] for island in results])
+        finally:
+            self.stop_islands()
+
+        self.save_logs()
+
+        return best_score, best_team
@@ -0,0 +1,239 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from fast_gen1_engine.battle_simulator import MOVES, BASE_SPEED, SPECIES_TYPES
+from optimization.base import Team
+from optimization.elo_ga import EloGeneticAlgorithm
+from optimization.ratings import RATING_BACKENDS
+from config import get_format, get_engine
+from utils import build_team_summary
+
+STATUS_MOVES = frozenset(mid for mid, move in MOVES.items() if not move.attacking)
+
+# Bin edges per behavior descriptor; a team falls in one bin of each
+DESCRIPTOR_BINS = {
+    "average_speed": [55, 65, 75, 85],  # mean base Speed of the six Pokémon
+    "status_moves": [5, 8, 11],  # moves that deal no damage, out of 24
+    "type_spread": [4, 6, 8],  # distinct types among the six Pokémon
+}
+
+Cell = Tuple[int, ...]
+
+
+def descriptors(team: Team) -> Tuple[float, int, int]:
+    pokemon_ids, moves_ids_per_pokemon = team
+    pokemon_ids = np.asarray(pokemon_ids, dtype=int)
+    return (
+        float(BASE_SPEED[pokemon_ids].mean()),
+        sum(mid in STATUS_MOVES for moves in moves_ids_per_pokemon for mid in moves),
+        len(set(SPECIES_TYPES[pokemon_ids].ravel().tolist())),
+    )
+
+
+def cell_of(team: Team) -> Cell:
+    return tuple(
+        int(np.digitize(value, edges, right=True))
+        for value, edges in zip(descriptors(team), DESCRIPTOR_BINS.values())
+    )
+
+
+class EloMapElites(EloGeneticAlgorithm):
+    """
+    MAP-Elites: an archive keeps the best-rated team found so far in every
+    cell of a grid of cheap behavior descriptors (DESCRIPTOR_BINS), so a run
+    yields strong teams of many archetypes rather than one.
+
+    Each generation battles a batch of population_size teams: up to
+    survivors_count elites drawn from the archive, which anchor the rating
+    scale, and children bred from random pairs of elites with the GA's
+    crossover and mutation. Ratings start over every batch, so they are
+    moved onto the archive's scale by the anchors' mean offset (cached
+    rating minus batch rating). An anchor's cached rating is averaged with
+    its shifted one, weighted by battles. A child takes its cell if the
+    cell is empty or its shifted rating beats the elite's; a batch without
+    anchors has no offset, so its children only fill empty cells.
+
+    With archive_path, the archive is loaded at the start and written after
+    every generation, so a campaign can be stopped and resumed across runs.
+    """
+
+    def __init__(self, *, archive_path: Path | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.archive_path = Path(archive_path) if archive_path is not None else None
+        self.archive: dict[Cell, dict] = {}
+        self.archive_battles = 0  # over every run of the archive
+        self.batch_anchors = 0
+        self.batch_start_battles = 0
+        self.battles_played: List[int] = []
+
+    # ---------------- archive ----------------
+
+    def load_archive(self):
+        if self.archive_path is None or not self.archive_path.exists():
+            return
+        with open(self.archive_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data["format"] != self.format or data["bins"] != DESCRIPTOR_BINS:
+            raise ValueError(
+                f"Archive {self.archive_path} was built for {data['format']} with bins {data['bins']}"
+            )
+        self.archive_battles = data["total_battles_used"]
+        self.archive = {
+            tuple(elite["cell"]): {
+                "team": (elite["team"][0], elite["team"][1]),
+                "score": elite["score"],
+                "battles": elite["battles"],
+            }
+            for elite in data["elites"]
+        }
+        print(f"[ARCHIVE] Loaded {len(self.archive)} elites from {self.archive_path}")
+
+    def save_archive(self):
+        if self.archive_path is None:
+            return
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "format": self.format,
+            "bins": DESCRIPTOR_BINS,
+            "total_battles_used": self.archive_battles,
+            "elites": [
+                {"cell": list(cell), **elite, "descriptors": list(descriptors(elite["team"]))}
+                for cell, elite in sorted(self.archive.items())
+            ],
+        }
+        # Write then rename, so an interrupted run never leaves half an archive
+        tmp = self.archive_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.archive_path)
+
+    def batch_offset(self, evaluations) -> float | None:
+        """
+        Mean of cached minus batch rating over the anchors that battled, which
+        maps this batch's ratings onto the archive's; None without anchors.
+        """
+        offsets = [
+            self.archive[cell_of(e.team)]["score"] - e.score
+            for e in evaluations
+            if e.meta["index"] < self.batch_anchors and self.battles_played[e.meta["index"]]
+        ]
+        return float(np.mean(offsets)) if offsets else None
+
+    def update_archive(self, evaluations):
+        offset = self.batch_offset(evaluations)
+        anchors = [e for e in evaluations if e.meta["index"] < self.batch_anchors]
+        # Best first, so without an offset the best child of a cell fills it
+        children = sorted(
+            (e for e in evaluations if e.meta["index"] >= self.batch_anchors),
+            key=lambda e: e.score,
+            reverse=True,
+        )
+
+        if offset is not None:
+            for e in anchors:
+                elite = self.archive[cell_of(e.team)]
+                battles = self.battles_played[e.meta["index"]]
+                total = elite["battles"] + battles
+                if battles:
+                    elite["score"] = (elite["score"] * elite["battles"] + (e.score + offset) * battles) / total
+                elite["battles"] = total
+
+        for e in children:
+            cell = cell_of(e.team)
+            elite = self.archive.get(cell)
+            battles = self.battles_played[e.meta["index"]]
+            if not battles:
+                continue
+            if elite is None:
+                score = e.score + (offset or 0.0)
+            elif offset is not None and e.score + offset > elite["score"]:
+                score = e.score + offset
+            else:
+                continue
+            self.archive[cell] = {"team": e.team, "score": score, "battles": battles}
+
+    # ---------------- batches ----------------
+
+    def next_batch(self) -> List[Team]:
+        elites = list(self.archive.values())
+        if len(elites) < 2:
+            self.batch_anchors = 0
+            return self.fill_unique([], self.population_size, self.sample_random_team)
+
+        anchors = self.rng.sample(elites, min(self.survivors_count, len(elites)))
+        self.batch_anchors = len(anchors)
+
+        def breed():
+            p1, p2 = self.rng.sample(elites, 2)
+            child = self.crossover(p1["team"], p2["team"])
+            return self.mutate(child, self.p_pokemon, self.p_move)
+
+        # Children that repeat any elite would only re-rate it
+        seen = {self.team_hash(elite["team"]) for elite in elites}
+        batch = [elite["team"] for elite in anchors]
+        while len(batch) < self.population_size:
+            batch.append(self.unique_team(breed, seen))
+        return batch
+
+    def initialize_population(self):
+        self.load_archive()
+        self.population = self.next_batch()
+
+    def evaluate_teams(self, population):
+        # Ratings are per batch; the archive keeps them across batches
+        self.ratings = RATING_BACKENDS[self.rating]()
+        self.battles_played = [0] * len(population)
+        self.batch_start_battles = self.total_battles_used
+        return super().evaluate_teams(population)
+
+    def update_ratings(self, pairs, results, screening=False, reference=None):
+        for i, j in pairs:
+            self.battles_played[i] += 1
+            self.battles_played[j] += 1
+        super().update_ratings(pairs, results, screening=screening, reference=reference)
+
+    def produce_next_generation(self, evaluations):
+        self.archive_battles += self.total_battles_used - self.batch_start_battles
+        self.update_archive(evaluations)
+        self.save_archive()
+
+        best = max(elite["score"] for elite in self.archive.values()) if self.archive else float("nan")
+        cells = int(np.prod([len(edges) + 1 for edges in DESCRIPTOR_BINS.values()]))
+        print(f"Archive: {len(self.archive)}/{cells} cells, best elite score {best}")
+
+        return self.next_batch()
+
+
+if __name__ == "__main__":
+    tier = "OU"  # Choose any one of: "Uber", "OU", "UU", "NU", "PU", "ZU", "LC"
+    learnsets_file = Path(f"data/learnsets_by_tier/learnsets_{tier.lower()}.json")
+    battle_engine_func = get_engine("poke-env")
+    battle_format = get_format(tier)
+
+    # choose hyper parameters
+    population_size = 10
+    survivors_count = 2
+    num_matchups = 25
+    generations = 5
+
+    optimizer = EloMapElites(learnsets_path=learnsets_file,
+                               battle_engine_func=battle_engine_func,
+                               battle_format=battle_format,
+                               population_size=population_size,
+                               survivors_count=survivors_count,
+                               num_matchups=num_matchups,
+                               p_pokemon_mutation_rate=0.1,
+                               move_mutation_rate=0.2,
+                               archive_path=Path("archives") / f"map_elites_{tier.lower()}.json",
+                               logging="test_experiment",
+                               seed=None)
+
+    best_score, best_team = optimizer.optimize(generations)
+
+    print("\nFinal Top Teams:")
+    print(f"Score: {best_score}")
+    print(build_team_summary(*best_team))
@@ -0,0 +1,163 @@
+from typing import Callable, List
+
+import numpy as np
+
+from battles.learnset_index import LearnsetIndex, TEAM_SIZE, MOVES_PER_POKEMON, gumbel_keys
+from optimization.base import Team, MAX_DUPLICATE_RESAMPLES, MAX_RANDOM_RESAMPLES
+
+
+class PopulationArray:
+    """
+    N teams as an (N, 6) array of species IDs and an (N, 6, 4) array of
+    move IDs. Teams are converted back to Team tuples only where they
+    leave the optimizer: battles and logs.
+    """
+
+    def __init__(self, species: np.ndarray, moves: np.ndarray):
+        if species.ndim != 2 or species.shape[1] != TEAM_SIZE:
+            raise ValueError(f"species must have shape (N, {TEAM_SIZE}), not {species.shape}")
+        if moves.shape != species.shape + (MOVES_PER_POKEMON,):
+            raise ValueError(f"moves must have shape (N, {TEAM_SIZE}, {MOVES_PER_POKEMON}), not {moves.shape}")
+        self.species = species
+        self.moves = moves
+
+    @classmethod
+    def from_teams(cls, teams: List[Team]) -> "PopulationArray":
+        species = np.array([pokemon_ids for pokemon_ids, _ in teams], dtype=np.int64).reshape(-1, TEAM_SIZE)
+        moves = np.array([moves_ids for _, moves_ids in teams], dtype=np.int64)
+        return cls(species, moves.reshape(-1, TEAM_SIZE, MOVES_PER_POKEMON))
+
+    def to_teams(self) -> List[Team]:
+        return list(zip(self.species.tolist(), self.moves.tolist()))
+
+    @classmethod
+    def empty(cls) -> "PopulationArray":
+        return cls(
+            np.empty((0, TEAM_SIZE), dtype=np.int64),
+            np.empty((0, TEAM_SIZE, MOVES_PER_POKEMON), dtype=np.int64),
+        )
+
+    @classmethod
+    def concat(cls, arrays: List["PopulationArray"]) -> "PopulationArray":
+        return cls(
+            np.concatenate([a.species for a in arrays]),
+            np.concatenate([a.moves for a in arrays]),
+        )
+
+    def take(self, indexes) -> "PopulationArray":
+        return PopulationArray(self.species[indexes], self.moves[indexes])
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def canonical(self, keep_lead: bool = True) -> "PopulationArray":
+        """Every team in the canonical form of battles.teams.canonical_team."""
+        moves = np.sort(self.moves, axis=-1)
+        start = 1 if keep_lead else 0
+        order = np.concatenate([
+            np.zeros((len(self), start), dtype=np.int64),
+            np.argsort(self.species[:, start:], axis=1, kind="stable") + start,
+        ], axis=1)
+        return PopulationArray(
+            np.take_along_axis(self.species, order, axis=1),
+            np.take_along_axis(moves, order[..., None], axis=1),
+        )
+
+
+def duplicates(population: PopulationArray, keep_lead: bool = True) -> np.ndarray:
+    """Indexes of the teams that are the same team as an earlier one."""
+    canonical = population.canonical(keep_lead)
+    rows = np.concatenate([canonical.species, canonical.moves.reshape(len(population), -1)], axis=1)
+    _, first = np.unique(rows, axis=0, return_index=True)
+    repeated = np.ones(len(population), dtype=bool)
+    repeated[first] = False
+    return np.flatnonzero(repeated)
+
+
+def repeated_species(population: PopulationArray) -> np.ndarray:
+    """Indexes of the teams with a species twice, which the Species Clause forbids."""
+    species = np.sort(population.species, axis=1)
+    return np.flatnonzero((species[:, 1:] == species[:, :-1]).any(axis=1))
+
+
+def replace_duplicates(
+    kept: PopulationArray,
+    new: PopulationArray,
+    make: Callable[[int], PopulationArray],
+    fallback: Callable[[int], PopulationArray],
+    keep_lead: bool = True,
+) -> PopulationArray:
+    """
+    Remake the teams of `new` that repeat a team of `kept` or an earlier
+    one of `new`, or a species, with make(count), like
+    PopulationOptimizer.fill_unique; with fallback(count) after
+    MAX_DUPLICATE_RESAMPLES rounds, raising RuntimeError after
+    MAX_RANDOM_RESAMPLES more.
+    """
+    attempts = 0
+    while True:
+        dup = duplicates(PopulationArray.concat([kept, new]), keep_lead) - len(kept)
+        dup = np.union1d(dup[dup >= 0], repeated_species(new))
+        if not len(dup):
+            return new
+        if attempts >= MAX_DUPLICATE_RESAMPLES + MAX_RANDOM_RESAMPLES:
+            raise RuntimeError(f"No new legal teams found for {len(dup)} of {len(new)} slots")
+        remade = (make if attempts < MAX_DUPLICATE_RESAMPLES else fallback)(len(dup))
+        new.species[dup], new.moves[dup] = remade.species, remade.moves
+        attempts += 1
+
+
+def random_population(
+    index: LearnsetIndex,
+    n: int,
+    rng: np.random.Generator,
+    species_weights: np.ndarray | None = None,
+    move_weights: np.ndarray | None = None,
+) -> PopulationArray:
+    """
+    n random teams of six distinct species, like sample_random_team.
+
+    species_weights (aligned with index.species) and move_weights (aligned
+    with index.move_ids) make species and moves more or less likely, as
+    in LearnsetIndex.random_moves; by default they are uniform.
+    """
+    keys = rng.random((n, len(index.species)))
+    if species_weights is not None:
+        keys = gumbel_keys(keys, species_weights)
+    species = index.species[np.argsort(keys, axis=1)[:, :TEAM_SIZE]]
+    return PopulationArray(species, index.random_moves(species, rng, move_weights))
+
+
+def crossover(parents_a: PopulationArray, parents_b: PopulationArray, rng: np.random.Generator) -> PopulationArray:
+    """Uniform crossover: each slot, with its moves, comes from either parent."""
+    from_a = rng.random(parents_a.species.shape) < 0.5
+    return PopulationArray(
+        np.where(from_a, parents_a.species, parents_b.species),
+        np.where(from_a[..., None], parents_a.moves, parents_b.moves),
+    )
+
+
+def mutate(
+    population: PopulationArray,
+    index: LearnsetIndex,
+    p_pokemon: float,
+    p_move: float,
+    rng: np.random.Generator,
+) -> PopulationArray:
+    """
+    Same mutation as EloGeneticAlgorithm.mutate, for every team at once:
+    each slot is replaced by a random species with random moves with
+    probability p_pokemon, then gets a new random moveset with
+    probability p_move.
+    """
+    species = population.species.copy()
+    moves = population.moves.copy()
+
+    new_pokemon = rng.random(species.shape) < p_pokemon
+    species[new_pokemon] = rng.choice(index.species, size=int(new_pokemon.sum()))
+    moves[new_pokemon] = index.random_moves(species[new_pokemon], rng)
+
+    new_moves = rng.random(species.shape) < p_move
+    moves[new_moves] = index.random_moves(species[new_moves], rng)
+
+    return PopulationArray(species, moves)
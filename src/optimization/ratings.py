@@ -0,0 +1,258 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from battles.outcome import is_error
+
+BASE_ELO = 1000.0
+K_FACTOR = 32
+ELO_DECAY = 0.2  # 0.0 = full memory, 1.0 = full reset
+
+GLICKO_INITIAL_RD = 350.0  # rating deviation of a new team, on the Elo scale
+GLICKO_MIN_RD = 30.0
+GLICKO_RD_GROWTH = 50.0  # added in quadrature to every RD between generations
+GLICKO_Q = math.log(10) / 400
+
+BT_PRIOR_GAMES = 2.0  # virtual draws against a BASE_ELO reference, per team
+BT_TOLERANCE = 1e-9
+BT_MAX_ITERATIONS = 1000
+
+
+def expected_score(ra: float, rb: float) -> float:
+    return 1 / (1 + 10 ** ((rb - ra) / 400))
+
+
+def battle_scores(result: int) -> Tuple[float, float]:
+    if result == 1:
+        return 1.0, 0.0
+    if result == 2:
+        return 0.0, 1.0
+    return 0.5, 0.5
+
+
+class EloRatings:
+    """
+    Incremental Elo. Ratings decay towards BASE_ELO between generations.
+    """
+
+    def __init__(self):
+        self.elo: List[float] | None = None
+
+    def start_generation(self, n: int):
+        if self.elo is None or len(self.elo) != n:
+            self.elo = [BASE_ELO] * n
+        else:
+            self.elo = [(1 - ELO_DECAY) * r + ELO_DECAY * BASE_ELO for r in self.elo]
+
+    def update(self, pairs: List[Tuple[int, int]], results: List[int], reference: int | None = None):
+        """
+        Apply the Elo updates for a batch of battles. Expected scores all use
+        the ratings from before the batch, so within a batch the order of the
+        battles does not matter.
+
+        A `reference` team is a fixed yardstick for the batch: its battles
+        rate its opponents only. A team playing many battles of one batch
+        would otherwise move by K_FACTOR per battle, all from one stale
+        expected score.
+        """
+        deltas = [0.0] * len(self.elo)
+        for (i, j), result in zip(pairs, results):
+            if is_error(result):
+                # A failed battle says nothing about either team
+                continue
+            ea = expected_score(self.elo[i], self.elo[j])
+            sa, sb = battle_scores(result)
+            deltas[i] += K_FACTOR * (sa - ea)
+            deltas[j] += K_FACTOR * (sb - (1 - ea))
+        if reference is not None:
+            deltas[reference] = 0.0
+        self.elo = [r + d for r, d in zip(self.elo, deltas)]
+
+    def scores(self) -> List[float]:
+        return list(self.elo)
+
+    def carry_over(self, indexes: List[int], n: int):
+        """Keep the ratings at indexes, first, and reset the other n - len(indexes)."""
+        self.elo = [self.elo[i] for i in indexes]
+        self.elo += [BASE_ELO] * (n - len(indexes))
+
+    def reset(self, index: int):
+        """Start the team at index over, for a new team in its slot."""
+        self.elo[index] = BASE_ELO
+
+
+class BradleyTerryRatings:
+    """
+    Bradley–Terry maximum-likelihood strengths over every battle of the
+    generation, so the order of results does not matter.
+
+    Every team also plays BT_PRIOR_GAMES virtual draws against a reference
+    team of strength 1 (BASE_ELO), which keeps the fit finite for unbeaten
+    or winless teams. Survivors additionally keep their previous results as
+    (1 - ELO_DECAY) times as many virtual games against the reference, won
+    at the rate their previous strength predicts.
+
+    Scores are on the Elo scale: BASE_ELO + 400 * log10(strength).
+    """
+
+    def __init__(self, prior_games: float = BT_PRIOR_GAMES):
+        self.prior_games = prior_games
+        self.n = 0
+        self.prior_weight: np.ndarray | None = None  # virtual games vs the reference
+        self.prior_wins: np.ndarray | None = None
+        self.pairs: List[Tuple[int, int]] = []
+        self.outcomes: List[float] = []  # score of the first team of each pair
+        self._strengths: np.ndarray | None = None
+
+    def _fresh_priors(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        weight = np.full(n, self.prior_games)
+        return weight, weight / 2
+
+    def start_generation(self, n: int):
+        if self.prior_weight is None or len(self.prior_weight) != n:
+            self.prior_weight, self.prior_wins = self._fresh_priors(n)
+        self.n = n
+        self.pairs, self.outcomes = [], []
+        self._strengths = None
+
+    def update(self, pairs: List[Tuple[int, int]], results: List[int], reference: int | None = None):
+        # The fit counts every battle once, however many a team plays in one
+        # batch, so a `reference` team is fitted like any other
+        for pair, result in zip(pairs, results):
+            if is_error(result):
+                continue
+            self.pairs.append(tuple(pair))
+            self.outcomes.append(battle_scores(result)[0])
+        self._strengths = None
+
+    def strengths(self) -> np.ndarray:
+        """Fit by minorization–maximization (Hunter, 2004)."""
+        if self._strengths is not None:
+            return self._strengths
+
+        n, ref = self.n, self.n  # the reference team is index n
+        pairs = np.asarray(self.pairs, dtype=int).reshape(-1, 2)
+        i = np.concatenate([pairs[:, 0], np.arange(n)])
+        j = np.concatenate([pairs[:, 1], np.full(n, ref)])
+        weight = np.concatenate([np.ones(len(pairs)), self.prior_weight])
+        score_i = np.concatenate([np.asarray(self.outcomes, dtype=float), self.prior_wins / self.prior_weight])
+
+        wins = (
+            np.bincount(i, weight * score_i, minlength=n + 1)
+            + np.bincount(j, weight * (1 - score_i), minlength=n + 1)
+        )[:n]
+        p = np.ones(n + 1)
+        for _ in range(BT_MAX_ITERATIONS):
+            inv = weight / (p[i] + p[j])
+            denom = (np.bincount(i, inv, minlength=n + 1) + np.bincount(j, inv, minlength=n + 1))[:n]
+            new = np.maximum(wins, 1e-12) / denom
+            converged = np.max(np.abs(new - p[:n]) / p[:n]) < BT_TOLERANCE
+            p[:n] = new
+            if converged:
+                break
+
+        self._strengths = p[:n]
+        return self._strengths
+
+    def scores(self) -> List[float]:
+        return (BASE_ELO + 400 * np.log10(self.strengths())).tolist()
+
+    def uncertainties(self) -> List[float]:
+        """Standard errors of the scores, from the Fisher information of the fit."""
+        n, p = self.n, np.append(self.strengths(), 1.0)
+        pairs = np.asarray(self.pairs, dtype=int).reshape(-1, 2)
+        i = np.concatenate([pairs[:, 0], np.arange(n)])
+        j = np.concatenate([pairs[:, 1], np.full(n, n)])
+        weight = np.concatenate([np.ones(len(pairs)), self.prior_weight])
+        info = weight * p[i] * p[j] / (p[i] + p[j]) ** 2
+        fisher = (np.bincount(i, info, minlength=n + 1) + np.bincount(j, info, minlength=n + 1))[:n]
+        return (400 / math.log(10) / np.sqrt(fisher)).tolist()
+
+    def carry_over(self, indexes: List[int], n: int):
+        strengths = self.strengths()
+        pairs = np.asarray(self.pairs, dtype=int).reshape(-1, 2)
+        games = np.bincount(pairs.ravel(), minlength=self.n) + self.prior_weight
+
+        weight, wins = self._fresh_priors(n)
+        for k, idx in enumerate(indexes):
+            kept = (1 - ELO_DECAY) * games[idx]
+            weight[k] += kept
+            wins[k] += kept * strengths[idx] / (strengths[idx] + 1)
+        self.prior_weight, self.prior_wins = weight, wins
+
+
+def glicko_g(rd):
+    return 1 / np.sqrt(1 + 3 * (GLICKO_Q * rd) ** 2 / math.pi ** 2)
+
+
+def glicko_expected(mu_a, mu_b, rd_b):
+    return 1 / (1 + 10 ** (-glicko_g(rd_b) * (mu_a - mu_b) / 400))
+
+
+class GlickoRatings:
+    """
+    Glicko ratings: a mean (mu) and rating deviation (RD) per team, both on
+    the Elo scale. Each batch of battles is one rating period. Between
+    generations, means decay towards BASE_ELO like Elo ratings and every RD
+    grows by GLICKO_RD_GROWTH, since the population around a team changed.
+    """
+
+    def __init__(self):
+        self.mu: np.ndarray | None = None
+        self.rd: np.ndarray | None = None
+
+    def start_generation(self, n: int):
+        if self.mu is None or len(self.mu) != n:
+            self.mu = np.full(n, BASE_ELO)
+            self.rd = np.full(n, GLICKO_INITIAL_RD)
+        else:
+            self.mu = (1 - ELO_DECAY) * self.mu + ELO_DECAY * BASE_ELO
+            self.rd = np.minimum(np.sqrt(self.rd ** 2 + GLICKO_RD_GROWTH ** 2), GLICKO_INITIAL_RD)
+
+    def update(self, pairs: List[Tuple[int, int]], results: List[int], reference: int | None = None):
+        """Rate one period of battles; a `reference` team keeps its mu and RD, as in EloRatings.update."""
+        played = [(pair, result) for pair, result in zip(pairs, results) if not is_error(result)]
+        if not played:
+            return
+        n = len(self.mu)
+        pairs = np.asarray([pair for pair, _ in played], dtype=int)
+        s = np.asarray([battle_scores(result)[0] for _, result in played])
+
+        # Every game counts once from each side
+        team = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        opp = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        score = np.concatenate([s, 1 - s])
+
+        g = glicko_g(self.rd[opp])
+        e = glicko_expected(self.mu[team], self.mu[opp], self.rd[opp])
+        info = GLICKO_Q ** 2 * np.bincount(team, g ** 2 * e * (1 - e), minlength=n)
+        gain = np.bincount(team, g * (score - e), minlength=n)
+
+        var = 1 / (1 / self.rd ** 2 + info)
+        mu = self.mu + GLICKO_Q * var * gain
+        rd = np.maximum(np.sqrt(var), GLICKO_MIN_RD)
+        if reference is not None:
+            mu[reference], rd[reference] = self.mu[reference], self.rd[reference]
+        self.mu, self.rd = mu, rd
+
+    def scores(self) -> List[float]:
+        return self.mu.tolist()
+
+    def uncertainties(self) -> List[float]:
+        return self.rd.tolist()
+
+    def carry_over(self, indexes: List[int], n: int):
+        self.mu = np.concatenate([self.mu[indexes], np.full(n - len(indexes), BASE_ELO)])
+        self.rd = np.concatenate([self.rd[indexes], np.full(n - len(indexes), GLICKO_INITIAL_RD)])
+
+    def reset(self, index: int):
+        self.mu[index] = BASE_ELO
+        self.rd[index] = GLICKO_INITIAL_RD
+
+
+RATING_BACKENDS = {
+    "elo": EloRatings,
+    "bradley-terry": BradleyTerryRatings,
+    "glicko": GlickoRatings,
+}
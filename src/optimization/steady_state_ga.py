@@ -0,0 +1,153 @@
+import queue
+import time
+from typing import Dict, Tuple
+
+from battles.outcome import BattleError, BattleResult
+from optimization.elo_ga import EloGeneticAlgorithm
+
+IN_FLIGHT_PER_WORKER = 2  # battles queued per worker, so none waits on the parent
+MIN_BATTLES_BEFORE_REPLACEMENT = 3  # a new team isn't replaced before it has played
+
+
+class SteadyStateEloGeneticAlgorithm(EloGeneticAlgorithm):
+    """
+    EloGeneticAlgorithm without a generation barrier.
+
+    Battles between random pairs of the population are kept in flight on
+    every worker of the engine (engines with a `submit` method, i.e. a
+    BattleExecutor; other engines play one battle at a time). Each result
+    updates the ratings as soon as it arrives, and every
+    num_matchups // (population_size - survivors_count) battles the
+    worst-rated team is replaced by a child of two of the survivors_count
+    best-rated teams, so an epoch of num_matchups battles turns over about
+    as many teams as a generation of EloGeneticAlgorithm.
+
+    Epochs take the place of generations for optimize, logging and rating
+    decay. Results are applied in the order battles complete, so with
+    several workers a run is not reproducible from its seed alone.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        assert self.survivors_count >= 2, "survivors_count must be at least 2 to breed children"
+        assert hasattr(self.ratings, "reset"), f"rating '{self.rating}' can't reset a single team"
+        self.replace_every = max(1, self.num_matchups // (self.population_size - self.survivors_count))
+
+        # A slot's birth changes whenever a new team takes it, so results of
+        # battles started by the team it replaced can be told apart.
+        self.births: list[int] = []
+        self.battles_played: list[int] = []
+        self.next_birth = 0
+
+    def initialize_population(self):
+        super().initialize_population()
+        n = self.population_size
+        self.births = list(range(n))
+        self.battles_played = [0] * n
+        self.next_birth = n
+        self.ratings.start_generation(n)
+
+    # ---------------- battles ----------------
+
+    def capacity(self) -> int:
+        if getattr(self.battle_engine_func, "submit", None) is None:
+            return 1
+        return getattr(self.battle_engine_func, "workers", 1) * IN_FLIGHT_PER_WORKER
+
+    def start_battle(self, ticket: int, done: queue.Queue) -> Tuple:
+        """Start a battle between a random pair; its (ticket, result) is put on `done`."""
+        i, j = self.rng.sample(range(self.population_size), 2)
+        job = (self.population[i], self.population[j], self.format)
+
+        submit = getattr(self.battle_engine_func, "submit", None)
+        if submit is None:
+            done.put((ticket, self.battle_engine_func(*job)))
+            handle = None
+        else:
+            handle = submit(job, callback=lambda result: done.put((ticket, result)))
+        return i, self.births[i], j, self.births[j], handle
+
+    def next_result(self, done: queue.Queue, in_flight: Dict[int, Tuple]) -> Tuple[int, int]:
+        while True:
+            try:
+                return done.get(timeout=1.0)
+            except queue.Empty:
+                # A worker that raised never calls back
+                for ticket, (*_, handle) in in_flight.items():
+                    if handle is not None and handle.ready() and not handle.successful():
+                        return ticket, BattleResult.failed(BattleError.ENGINE_ERROR)
+
+    # ---------------- breeding ----------------
+
+    def replace_worst(self):
+        """Breed a child of two top teams into the slot of the worst-rated one."""
+        scores = self.ratings.scores()
+        ranked = sorted(range(self.population_size), key=lambda i: scores[i], reverse=True)
+        parents, rest = ranked[:self.survivors_count], ranked[self.survivors_count:]
+        candidates = [i for i in rest if self.battles_played[i] >= MIN_BATTLES_BEFORE_REPLACEMENT] or rest
+        slot = candidates[-1]
+
+        def breed():
+            p1, p2 = self.rng.sample(parents, 2)
+            child = self.crossover(self.population[p1], self.population[p2])
+            return self.mutate(child, self.p_pokemon, self.p_move)
+
+        seen = {self.team_hash(team) for team in self.population}
+        self.population[slot] = self.unique_team(breed, seen)
+
+        self.ratings.reset(slot)
+        self.battles_played[slot] = 0
+        self.births[slot] = self.next_birth
+        self.next_birth += 1
+
+    # ---------------- main loop ----------------
+
+    def optimize(self, generations: int):
+        self.initialize_population()
+        self.start_time = time.time()
+
+        best_score = float("-inf")
+        best_team = None
+
+        budget = generations * self.num_matchups
+        capacity = self.capacity()
+        done = queue.Queue()
+        in_flight: Dict[int, Tuple] = {}
+        started = completed = 0
+
+        while completed < budget:
+            while started < budget and len(in_flight) < capacity:
+                in_flight[started] = self.start_battle(started, done)
+                started += 1
+
+            ticket, result = self.next_result(done, in_flight)
+            i, birth_i, j, birth_j, _ = in_flight.pop(ticket)
+            completed += 1
+            self.total_battles_used += 1
+
+            # Drop results for teams that were replaced while the battle ran
+            if self.births[i] == birth_i and self.births[j] == birth_j:
+                self.update_ratings([(i, j)], [result])
+                self.battles_played[i] += 1
+                self.battles_played[j] += 1
+
+            if completed % self.num_matchups == 0:
+                epoch = completed // self.num_matchups
+                scores = self.ratings.scores()
+                print(f"Epoch {epoch}/{generations}")
+                print(f"Best score this epoch: {max(scores)}")
+
+                for team, score in zip(self.population, scores):
+                    if score > best_score:
+                        best_score = score
+                        best_team = team
+                    self.log_entry(epoch, team, score)
+
+                self.ratings.start_generation(self.population_size)
+
+            if completed % self.replace_every == 0 and completed < budget:
+                self.replace_worst()
+
+        self.save_logs()
+
+        return best_score, best_team
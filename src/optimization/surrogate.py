@@ -0,0 +1,171 @@
+"""
+Learned win-probability model used to pre-screen GA offspring.
+
+The model is a logistic regression on the difference of two teams'
+features plus a low-rank, antisymmetric species x species interaction
+term (a factorization machine over which species face which). It is
+trained on every battle result of a run and is cheap enough to score
+thousands of candidate teams per generation.
+"""
+from typing import List
+
+import numpy as np
+
+from battles.outcome import is_error
+from battles.teams import Team, team_hash
+from fast_gen1_engine.battle_simulator import TYPE_CHART, SPECIES_TYPES, MOVE_POWER, MOVE_TYPE
+from optimization.ratings import battle_scores
+from utils import POKEDEX, MOVELIST
+
+SURROGATE_RANK = 4
+SURROGATE_L2 = 0.03
+SURROGATE_LEARNING_RATE = 0.05
+SURROGATE_EPOCHS = 200  # gradient steps per fit, warm-started from the last fit
+SURROGATE_MIN_BATTLES = 50  # below this the model's predictions aren't used
+
+N_SPECIES = max(POKEDEX) + 1
+N_MOVES = max(MOVELIST) + 1
+N_TYPES = TYPE_CHART.shape[0]
+
+
+class TeamFeatures:
+    """
+    Feature vectors for teams, memoized by team hash:
+
+    - species and moves, as counts
+    - offensive coverage: for each defending type, the best effectiveness
+      of the team's damaging moves, divided by 4
+    - defensive profile: how many of the team's Pokémon have each type,
+      divided by 6
+    """
+
+    def __init__(self):
+        self._vectors: dict[str, np.ndarray] = {}
+        self.size = N_SPECIES + N_MOVES + 2 * N_TYPES
+
+    def species_counts(self, team: Team) -> np.ndarray:
+        return np.bincount(np.asarray(team[0], dtype=int), minlength=N_SPECIES)[:N_SPECIES].astype(float)
+
+    def encode(self, team: Team) -> np.ndarray:
+        key = team_hash(team)
+        if key not in self._vectors:
+            pokemon_ids, moves_ids_per_pokemon = team
+            move_ids = np.array([mid for moves in moves_ids_per_pokemon for mid in moves], dtype=int)
+            types = SPECIES_TYPES[np.asarray(pokemon_ids, dtype=int)]
+
+            damaging = move_ids[MOVE_POWER[move_ids] > 0]
+            coverage = TYPE_CHART[MOVE_TYPE[damaging]].max(axis=0) if len(damaging) else np.zeros(N_TYPES)
+            # Count a single-typed Pokémon once
+            defensive = np.bincount(types[:, 0], minlength=N_TYPES) + np.bincount(
+                types[types[:, 1] != types[:, 0], 1], minlength=N_TYPES
+            )
+
+            self._vectors[key] = np.concatenate([
+                self.species_counts(team),
+                np.bincount(move_ids, minlength=N_MOVES)[:N_MOVES],
+                coverage / 4,
+                defensive / 6,
+            ])
+        return self._vectors[key]
+
+    def matrix(self, teams: List[Team]) -> np.ndarray:
+        return np.array([self.encode(team) for team in teams]).reshape(-1, self.size)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(z, -30, 30)))
+
+
+class SurrogateModel:
+    """
+    P(A beats B) = sigmoid(w . (x_A - x_B) + s_A^T (P Q^T - Q P^T) s_B)
+
+    x are TeamFeatures vectors and s species counts. Both terms change
+    sign when A and B swap, so P(A beats B) = 1 - P(B beats A). Draws are
+    fitted as half a win. Trained by full-batch Adam on the log loss with
+    L2 regularization.
+    """
+
+    def __init__(self, rank: int = SURROGATE_RANK, l2: float = SURROGATE_L2, seed: int | None = None):
+        self.features = TeamFeatures()
+        self.l2 = l2
+        rng = np.random.default_rng(seed)
+        self.params = {
+            "w": np.zeros(self.features.size),
+            "P": rng.normal(0, 0.01, (N_SPECIES, rank)),
+            "Q": rng.normal(0, 0.01, (N_SPECIES, rank)),
+        }
+        self._adam = {name: (np.zeros_like(p), np.zeros_like(p)) for name, p in self.params.items()}
+        self._steps = 0
+
+        self.x_a: List[np.ndarray] = []
+        self.x_b: List[np.ndarray] = []
+        self.s_a: List[np.ndarray] = []
+        self.s_b: List[np.ndarray] = []
+        self.targets: List[float] = []
+
+    @property
+    def battles(self) -> int:
+        return len(self.targets)
+
+    @property
+    def trained(self) -> bool:
+        return self.battles >= SURROGATE_MIN_BATTLES
+
+    def add(self, team_a: Team, team_b: Team, result: int):
+        if is_error(result):
+            return
+        self.x_a.append(self.features.encode(team_a))
+        self.x_b.append(self.features.encode(team_b))
+        self.s_a.append(self.features.species_counts(team_a))
+        self.s_b.append(self.features.species_counts(team_b))
+        self.targets.append(battle_scores(result)[0])
+
+    def _logits(self, x_a, x_b, s_a, s_b) -> np.ndarray:
+        P, Q = self.params["P"], self.params["Q"]
+        interaction = np.sum((s_a @ P) * (s_b @ Q), axis=-1) - np.sum((s_b @ P) * (s_a @ Q), axis=-1)
+        return (x_a - x_b) @ self.params["w"] + interaction
+
+    def fit(self, epochs: int = SURROGATE_EPOCHS, learning_rate: float = SURROGATE_LEARNING_RATE):
+        if not self.targets:
+            return
+        x_a, x_b = np.array(self.x_a), np.array(self.x_b)
+        s_a, s_b = np.array(self.s_a), np.array(self.s_b)
+        y = np.array(self.targets)
+        n = len(y)
+
+        for _ in range(epochs):
+            P, Q = self.params["P"], self.params["Q"]
+            g = (_sigmoid(self._logits(x_a, x_b, s_a, s_b)) - y) / n
+            grads = {
+                "w": (x_a - x_b).T @ g + self.l2 * self.params["w"],
+                "P": s_a.T @ (g[:, None] * (s_b @ Q)) - s_b.T @ (g[:, None] * (s_a @ Q)) + self.l2 * P,
+                "Q": s_b.T @ (g[:, None] * (s_a @ P)) - s_a.T @ (g[:, None] * (s_b @ P)) + self.l2 * Q,
+            }
+
+            self._steps += 1
+            for name, grad in grads.items():
+                m, v = self._adam[name]
+                m[:] = 0.9 * m + 0.1 * grad
+                v[:] = 0.999 * v + 0.001 * grad ** 2
+                m_hat = m / (1 - 0.9 ** self._steps)
+                v_hat = v / (1 - 0.999 ** self._steps)
+                self.params[name] -= learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+
+    def log_loss(self) -> float:
+        """Mean log loss on the training battles."""
+        if not self.targets:
+            return float("nan")
+        p = _sigmoid(self._logits(np.array(self.x_a), np.array(self.x_b), np.array(self.s_a), np.array(self.s_b)))
+        y = np.array(self.targets)
+        p = np.clip(p, 1e-12, 1 - 1e-12)
+        return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+    def win_probabilities(self, teams: List[Team], opponents: List[Team]) -> np.ndarray:
+        """(len(teams), len(opponents)) array of predicted P(team beats opponent)."""
+        x_a, x_b = self.features.matrix(teams), self.features.matrix(opponents)
+        s_a = np.array([self.features.species_counts(team) for team in teams]).reshape(-1, N_SPECIES)
+        s_b = np.array([self.features.species_counts(team) for team in opponents]).reshape(-1, N_SPECIES)
+        return _sigmoid(self._logits(
+            x_a[:, None, :], x_b[None, :, :], s_a[:, None, :], s_b[None, :, :]
+        ))
@@ -0,0 +1,82 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from optimization.elo_ga import EloGeneticAlgorithm
+from optimization.surrogate import SurrogateModel
+
+
+class SurrogateEloGeneticAlgorithm(EloGeneticAlgorithm):
+    """
+    EloGeneticAlgorithm whose children are pre-screened by a SurrogateModel
+    trained on every main-engine battle of the run. Screening battles are
+    rated but not added to the model, so it only learns one engine.
+
+    Each generation breeds candidates_per_child candidates per child slot
+    and keeps those with the highest predicted mean win probability
+    against the survivors. An explore_fraction of the slots goes to
+    candidates drawn at random from the rest, so the model keeps seeing
+    teams it would not have picked. Until the model has seen
+    SURROGATE_MIN_BATTLES battles, children are kept in breeding order as
+    in EloGeneticAlgorithm.
+    """
+
+    def __init__(
+        self,
+        *,
+        candidates_per_child: int = 10,
+        explore_fraction: float = 0.25,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        assert candidates_per_child >= 1, "candidates_per_child must be at least 1"
+        assert 0.0 <= explore_fraction <= 1.0, "explore_fraction must be between 0 and 1"
+        self.candidates_per_child = candidates_per_child
+        self.explore_fraction = explore_fraction
+        self.surrogate = SurrogateModel(seed=self.seed)
+
+    def update_ratings(
+        self,
+        pairs: List[Tuple[int, int]],
+        results: List[int],
+        screening: bool = False,
+        reference: int | None = None,
+    ):
+        if not screening:
+            for (i, j), result in zip(pairs, results):
+                self.surrogate.add(self.population[i], self.population[j], result)
+        super().update_ratings(pairs, results, screening=screening, reference=reference)
+
+    def produce_next_generation(self, evaluations):
+        evaluations = sorted(evaluations, key=lambda e: e.score, reverse=True)
+        survivors = evaluations[:self.survivors_count]
+        n_children = self.population_size - len(survivors)
+
+        def breed():
+            p1, p2 = self.rng.sample(survivors, 2)
+            child = self.crossover(p1.team, p2.team)
+            return self.mutate(child, self.p_pokemon, self.p_move)
+
+        seen = {self.team_hash(e.team) for e in survivors}
+        candidates = [self.unique_team(breed, seen) for _ in range(n_children * self.candidates_per_child)]
+
+        self.surrogate.fit()
+        if self.surrogate.trained:
+            predicted = self.surrogate.win_probabilities(candidates, [e.team for e in survivors]).mean(axis=1)
+            order = [int(i) for i in np.argsort(-predicted, kind="stable")]
+            print(
+                f"Surrogate: {self.surrogate.battles} battles, log loss {self.surrogate.log_loss():.3f}, "
+                f"best candidate {predicted[order[0]]:.3f}"
+            )
+        else:
+            order = list(range(len(candidates)))
+
+        n_explore = round(self.explore_fraction * n_children)
+        chosen = order[:n_children - n_explore]
+        chosen += self.rng.sample(order[n_children - n_explore:], n_explore)
+
+        new_population = [e.team for e in survivors] + [candidates[i] for i in chosen]
+
+        # Carry over Elo for survivors; children start from BASE_ELO
+        self.carry_over_ratings(survivors)
+        return new_population
@@ -24,6 +24,7 @@ class LogEntry:
     team: Team
     format: str
     raw: Dict[str, Any]
+    screening_battles_used: int = 0  # cheap-engine battles, not in total_battles_used
 
     @staticmethod
     def from_json(obj: Dict[str, Any]) -> "LogEntry":
@@ -46,6 +47,7 @@ class LogEntry:
             team=team,
             format=obj.get("format", "unknown"),
             raw=obj,
+            screening_battles_used=int(obj.get("screening_battles_used", 0)),
         )
 
 
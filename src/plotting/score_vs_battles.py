@@ -10,19 +10,23 @@ from plotting.models import RunLog
 def _per_run_curve(
     run: RunLog,
     mode: Literal["generation_best", "best_so_far"],
+    include_screening: bool = False,
 ):
     """
     Returns list of (generation, score, battles).
     """
+    def battles(e):
+        return e.total_battles_used + (e.screening_battles_used if include_screening else 0)
+
     if mode == "generation_best":
         return [
-            (e.generation, e.score, e.total_battles_used)
+            (e.generation, e.score, battles(e))
             for e in run.best_per_generation()
         ]
 
     elif mode == "best_so_far":
         return [
-            (e.generation, e.score, e.total_battles_used)
+            (e.generation, e.score, battles(e))
             for e in run.best_so_far_per_generation()
         ]
 
@@ -34,7 +38,13 @@ def plot_score_vs_battles(
     runs: list[RunLog],
     ax: Optional[plt.Axes] = None,
     mode: Literal["generation_best", "best_so_far", "both"] = "both",
+    include_screening: bool = False,
 ):
+    """
+    Score against battles used. Battles are those of the main engine
+    (total_battles_used); with include_screening, the cheap screening
+    battles of multi-fidelity runs are added to them.
+    """
     by_method = group_runs_by_method(runs)
 
     linestyles = ["-", "--", "-.", ":"]
@@ -71,7 +81,7 @@ def plot_score_vs_battles(
             battles_by_gen = defaultdict(list)
 
             for run in method_runs:
-                for gen, score, battles in _per_run_curve(run, m):
+                for gen, score, battles in _per_run_curve(run, m, include_screening):
                     scores_by_gen[gen].append(score)
                     battles_by_gen[gen].append(battles)
 
@@ -105,13 +115,15 @@ def plot_score_vs_battles(
             ax_.grid(True)
             ax_.legend()
 
+    xlabel = "Total battles used, including screening" if include_screening else "Total battles used"
+
     # Set xlabel only on bottom plot if multiple axes
     if len(axes) > 1:
         bottom_ax = list(axes.values())[-1]
-        bottom_ax.set_xlabel("Total battles used")
+        bottom_ax.set_xlabel(xlabel)
     else:
         only_ax = list(axes.values())[0]
-        only_ax.set_xlabel("Total battles used")
+        only_ax.set_xlabel(xlabel)
 
     if created_fig:
         plt.tight_layout()
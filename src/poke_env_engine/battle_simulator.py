@@ -1,53 +1,22 @@
 import asyncio
-import uuid
-import json
 import logging
-import gc
-from pathlib import Path
-import csv
-from io import StringIO
+import time
 
-from data_processing.get_unrestricted_learnsets import MOVE_LIST as MOVELIST_CSV
+from poke_env.concurrency import POKE_LOOP, handle_threaded_coroutines
 
-from poke_env.player import SimpleHeuristicsPlayer as PLAYER_CLASS
-from poke_env.ps_client.server_configuration import LocalhostServerConfiguration
+from battles.outcome import BattleError, BattleOutcome, BattleResult
+from battles.teams import compile_team
+from battles.validation import matchup_problems
+from utils import MOVELIST, POKEDEX
 
+from poke_env_engine.player_pool import get_pool
+from poke_env_engine.server_farm import ShowdownServerFarm
 
-POKEDEX_PATH = Path("data/pokemon_tiers.json")
 
-def load_pokedex_from_tiers(path=POKEDEX_PATH):
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    # Build dict: id -> name
-    pokedex = {entry["id"]: entry["name"] for entry in data}
-    return pokedex
+DEFAULT_CONCURRENCY = 16  # simultaneous battles for battle_many
 
-POKEDEX = load_pokedex_from_tiers()
-
-def normalize_name(name: str) -> str:
-    """
-    Normalize Pokémon move / species names to canonical forms.
-
-    Add new rules to NORMALIZATION_MAP as needed.
-    """
-    NORMALIZATION_MAP = {
-        "Vice Grip": "Vise Grip",
-        "Hi Jump Kick": "High Jump Kick",
-    }
-
-    return NORMALIZATION_MAP.get(name, name)
-
-def parse_movelist(csv_text):
-    movelist = {}
-    f = StringIO(csv_text.strip())
-    reader = csv.DictReader(f)
-    for row in reader:
-        move_id = int(row["id"])
-        move_name = row["move"]
-        movelist[move_id] = normalize_name(move_name)
-    return movelist
-
-MOVELIST = parse_movelist(MOVELIST_CSV)
+# Set by start_server_farm; None means the single server on localhost:8000
+SERVER_FARM: ShowdownServerFarm | None = None
 
 
 # ============================================================
@@ -57,6 +26,9 @@ MOVELIST = parse_movelist(MOVELIST_CSV)
 def build_team_text(pokemon_ids, moves_ids_per_pokemon):
     """Builds the team text with Ability: None and moves in correct format.
 
+    Battles ship the memoized packed form from battles.teams.compile_team;
+    this export format is kept for logs and anything meant for humans.
+
     Args:
         pokemon_ids: List of Pokémon IDs (ints)
         moves_ids_per_pokemon: List of list of move IDs per Pokémon
@@ -77,61 +49,155 @@ def build_team_text(pokemon_ids, moves_ids_per_pokemon):
     return "\n".join(lines)
 
 
-async def battle_async(team1: str, team2: str, format: str) -> int:
-    player1 = PLAYER_CLASS(
-        battle_format=format,
-        server_configuration=LocalhostServerConfiguration,
-        team=team1,
-        max_concurrent_battles=1,
-    )
-    player2 = PLAYER_CLASS(
-        battle_format=format,
-        server_configuration=LocalhostServerConfiguration,
-        team=team2,
-        max_concurrent_battles=1,
-    )
+def start_server_farm(n_servers: int, base_port: int = 8000) -> ShowdownServerFarm:
+    """Launch n_servers local Showdown servers and route all battles to them."""
+    global SERVER_FARM
+    farm = ShowdownServerFarm(n_servers, base_port=base_port)
+    farm.start()
+    SERVER_FARM = farm
+    return farm
+
+
+def attach_server_farm(ports: list[int]):
+    """Route this process's battles to a farm started elsewhere, e.g. in the
+    parent of a battle executor worker."""
+    global SERVER_FARM
+    SERVER_FARM = ShowdownServerFarm.attach(ports)
+
+
+def _reject_seed(seed: int | None):
+    # A challenge can't choose the server's PRNG seed
+    if seed is not None:
+        raise ValueError(
+            "The poke-env engine cannot play seeded battles; use the showdown-stdio engine"
+        )
+
+
+async def _pooled_battle(team1: str, team2: str, format: str) -> BattleOutcome:
+    start = time.perf_counter()
+    if SERVER_FARM is None:
+        outcome = await get_pool(format).battle(team1, team2)
+    else:
+        server = SERVER_FARM.acquire()
+        try:
+            pool = get_pool(format, server.configuration)
+            if pool.server_generation != server.generation:
+                # The server went down since these players logged in, so
+                # idle ones hold dead connections
+                await pool.close()
+                pool.server_generation = server.generation
+            outcome = await pool.battle(team1, team2)
+        finally:
+            SERVER_FARM.release(server)
+    outcome.duration_sec = time.perf_counter() - start
+    return outcome
+
+
+async def battle_async(team1: str, team2: str, format: str, seed: int | None = None) -> BattleResult:
+    """Run one battle on the persistent player pool. Teams are packed strings
+    (see battles.teams.compile_team).
+
+    The pooled players live on poke-env's background loop, so the battle is
+    scheduled there and awaited from the caller's loop.
+
+    The server's PRNG can't be seeded, so a seed raises ValueError.
+    """
+    _reject_seed(seed)
+    outcome = await handle_threaded_coroutines(_pooled_battle(team1, team2, format))
+    return outcome.result
 
 
-    player1.logger.setLevel(logging.ERROR)
-    player2.logger.setLevel(logging.ERROR)
+async def _pooled_battles(jobs, concurrency: int) -> list[BattleOutcome]:
+    semaphore = asyncio.Semaphore(concurrency)
 
-    player1._username = f"p_{uuid.uuid4().hex[:6]}"
-    player2._username = f"o_{uuid.uuid4().hex[:6]}"
+    async def run(team1, team2, format):
+        problems = matchup_problems(team1, team2, format)
+        if problems:
+            logging.error(f"Illegal team, battle skipped: {problems[0]}")
+            return BattleOutcome.failed(BattleError.INVALID_TEAM)
+        async with semaphore:
+            try:
+                team1_str = compile_team(team1).packed
+                team2_str = compile_team(team2).packed
+                return await _pooled_battle(team1_str, team2_str, format)
+            except Exception as e:
+                logging.error(f"Battle failed catastrophically: {e}")
+                return BattleOutcome.failed(BattleError.ENGINE_ERROR)
 
-    try:
-        await asyncio.wait_for(player1.battle_against(player2, n_battles=1), timeout=15)
-        winner = 1 if player1.n_won_battles > 0 else 2
-    except asyncio.TimeoutError:
-        logging.error("Battle timed out")
-        winner = 0
-    except Exception as e:
-        logging.error(f"Unexpected error during battle: {e}")
-        winner = 0
-    finally:
-        await player1.ps_client.stop_listening()
-        await player2.ps_client.stop_listening()
-        await asyncio.sleep(0.1)
-        gc.collect()
+    return await asyncio.gather(*(run(*job) for job in jobs))
 
-    return winner
 
+def battle_outcome(
+    team1: tuple[list[int], list[list[int]]],
+    team2: tuple[list[int], list[list[int]]],
+    format: str,
+    seed: int | None = None,
+) -> BattleOutcome:
+    """Run one battle synchronously and report winner, turns, remaining HP,
+    fainted counts, duration and error.
+
+    Teams are validated locally first, and server-side errors end the battle
+    as soon as they arrive, so neither waits for the battle to time out.
+    A seed raises ValueError, as in battle_async.
+    """
+    _reject_seed(seed)
+    problems = matchup_problems(team1, team2, format)
+    if problems:
+        logging.error(f"Illegal team, battle skipped: {problems[0]}")
+        return BattleOutcome.failed(BattleError.INVALID_TEAM)
+    try:
+        team1_str = compile_team(team1).packed
+        team2_str = compile_team(team2).packed
+        return asyncio.run_coroutine_threadsafe(
+            _pooled_battle(team1_str, team2_str, format), POKE_LOOP
+        ).result()
+    except Exception as e:
+        logging.error(f"battle_once failed catastrophically: {e}")
+        return BattleOutcome.failed(BattleError.ENGINE_ERROR)
 
 
 def battle_once(
     team1: tuple[list[int], list[list[int]]],
     team2: tuple[list[int], list[list[int]]],
     format: str,
-) -> int:
+    seed: int | None = None,
+) -> BattleResult:
     """Run one battle synchronously.
     Returns:
         1 if team1 wins
         2 if team2 wins
-        0 if draw OR ANY ERROR
+        0 if draw OR ANY ERROR; failed battles carry a BattleError in
+        `result.error` so they can be told apart from real draws
     """
-    try:
-        team1_str = build_team_text(*team1)
-        team2_str = build_team_text(*team2)
-        return asyncio.run(battle_async(team1_str, team2_str, format))
-    except Exception as e:
-        logging.error(f"battle_once failed catastrophically: {e}")
-        return 0
+    return battle_outcome(team1, team2, format, seed).result
+
+
+def battle_outcomes(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[BattleOutcome]:
+    """Run a batch of battles concurrently on a single event loop.
+
+    Args:
+        jobs: List of (team1, team2, format) tuples; (team1, team2, format,
+            seed) jobs raise ValueError, as in battle_async
+        concurrency: Maximum number of battles in flight at once
+
+    Returns:
+        One BattleOutcome per job, in input order.
+    """
+    if not jobs:
+        return []
+    for job in jobs:
+        _reject_seed((*job, None)[3])
+    return asyncio.run_coroutine_threadsafe(
+        _pooled_battles(jobs, concurrency), POKE_LOOP
+    ).result()
+
+
+def battle_many(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[BattleResult]:
+    """Like battle_outcomes, but with the same 1/2/0 results as battle_once."""
+    return [outcome.result for outcome in battle_outcomes(jobs, concurrency)]
@@ -0,0 +1,51 @@
+'use strict';
+// Long-lived battle simulator for stdio_simulator.SimulatorProcess.
+//
+// Speaks the protocol of `pokemon-showdown simulate-battle` on stdin and
+// stdout: chunks of output lines, each followed by a blank line. Unlike
+// simulate-battle, the process stays up when a battle ends; the next
+// `>start` line begins a new battle on a fresh BattleStream, so Node
+// start-up and Showdown's data load are paid once per process.
+//
+// Usage: node battle_stream.js <pokemon-showdown directory>
+
+const childProcess = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+const showdownDir = path.resolve(process.argv[2] || '.');
+
+function loadBattleStream() {
+	const module = path.join(showdownDir, 'dist', 'sim', 'battle-stream');
+	try {
+		return require(module).BattleStream;
+	} catch (e) {
+		// Not built yet; the pokemon-showdown launcher builds the same way
+		childProcess.execSync('node build', {cwd: showdownDir, stdio: 'ignore'});
+		return require(module).BattleStream;
+	}
+}
+
+const BattleStream = loadBattleStream();
+let current = null;
+
+function startBattle() {
+	if (current) current.writeEnd();
+	const stream = new BattleStream();
+	current = stream;
+	void (async () => {
+		for await (let chunk of stream) {
+			// A battle abandoned by a new >start stays quiet
+			if (current !== stream) continue;
+			if (!chunk.endsWith('\n')) chunk += '\n';
+			process.stdout.write(chunk + '\n');
+		}
+	})();
+}
+
+readline.createInterface({input: process.stdin, terminal: false}).on('line', line => {
+	if (line.startsWith('>start ')) startBattle();
+	if (current) void current.write(line);
+}).on('close', () => {
+	if (current) current.writeEnd();
+});
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import uuid
+
+from poke_env.concurrency import POKE_LOOP
+from poke_env.player import SimpleHeuristicsPlayer as PLAYER_CLASS
+from poke_env.ps_client import AccountConfiguration
+from poke_env.ps_client.server_configuration import (
+    LocalhostServerConfiguration,
+    ServerConfiguration,
+)
+from poke_env.teambuilder import Teambuilder
+
+from battles.outcome import BattleError, BattleOutcome, team_status
+
+
+BATTLE_TIMEOUT = 15  # seconds before a battle is abandoned as timed out
+
+
+def _new_username() -> str:
+    # Showdown usernames are capped at 18 characters and must be unique per
+    # server, including across worker processes.
+    return f"p_{uuid.uuid4().hex[:12]}"
+
+
+# Popups, lowercased, that mean no battle can start on this server
+_FATAL_POPUPS = ("server is restarting", "lockdown", "not a valid format", "format is not")
+
+
+def _protocol_error(message: str) -> BattleError | None:
+    """
+    Classify a raw server message that means the current battle will never
+    finish on its own, or return None for anything else.
+    """
+    lines = message.split("\n")
+    if lines[0].startswith(">battle"):
+        for line in lines[1:]:
+            if line.startswith("|bigerror|") or line.startswith("|noinit|"):
+                return BattleError.SERVER_ERROR
+        return None
+
+    if lines[0].startswith("|popup|"):
+        # e.g. "Your team was rejected for the following reasons: ..."
+        # Other popups, such as server notices, leave the battle running.
+        text = lines[0].lower()
+        if "team" in text and ("rejected" in text or "invalid" in text):
+            return BattleError.INVALID_TEAM
+        if "challenge" in text:
+            return BattleError.REJECTED
+        if any(fatal in text for fatal in _FATAL_POPUPS):
+            return BattleError.SERVER_ERROR
+        return None
+
+    if lines[0].startswith("|nametaken|"):
+        return BattleError.SERVER_ERROR
+
+    if lines[0].startswith("|pm|") and (
+        "rejected the challenge" in lines[0] or "cancelled the challenge" in lines[0]
+    ):
+        return BattleError.REJECTED
+
+    return None
+
+
+class PackedTeambuilder(Teambuilder):
+    """
+    Serves an already packed team as is. Passing a plain string to
+    update_team would make poke-env parse and re-pack it on every swap.
+    """
+
+    def __init__(self, packed: str):
+        self.packed = packed
+
+    def yield_team(self) -> str:
+        return self.packed
+
+
+class PlayerPool:
+    """
+    Long-lived pool of logged-in players for one (format, server) pair.
+
+    Players keep their websocket open between battles; only their team is
+    swapped before each challenge. A player involved in a battle that timed out
+    or raised is considered unhealthy and replaced by a fresh one.
+
+    Each player's connection is watched for protocol-level failures (popups
+    such as a rejected team, server errors, refused challenges, a closed
+    websocket), which end the battle at once instead of at the timeout.
+
+    All methods must run on poke-env's background loop (POKE_LOOP), which is
+    where the players' websockets live.
+    """
+
+    def __init__(
+        self,
+        battle_format: str,
+        server_configuration: ServerConfiguration = LocalhostServerConfiguration,
+        max_players: int | None = None,
+    ):
+        self.format = battle_format
+        self.server_configuration = server_configuration
+        self.max_players = max_players
+
+        self._idle: list = []
+        self._n_players = 0
+        self._available: asyncio.Condition | None = None  # created on POKE_LOOP
+
+        self._players: set = set()  # every player the pool owns, idle or not
+        self._failures: dict = {}  # player -> future resolved with a BattleError
+        self._disconnected: set = set()
+        self.server_generation = 0  # ShowdownServer.generation the players logged in to
+
+    def _make_player(self):
+        player = PLAYER_CLASS(
+            account_configuration=AccountConfiguration(_new_username(), None),
+            battle_format=self.format,
+            server_configuration=self.server_configuration,
+            max_concurrent_battles=1,
+        )
+        player.logger.setLevel(logging.ERROR)
+        self._players.add(player)
+        self._watch(player)
+        return player
+
+    def _watch(self, player):
+        client = player.ps_client
+        handle_message = client._handle_message
+
+        async def watched_handle_message(message: str):
+            error = _protocol_error(message)
+            if error is not None:
+                self._fail(player, error, message)
+            await handle_message(message)
+
+        # poke-env wires its own battle handler the same way
+        client._handle_message = watched_handle_message
+        client._listening_coroutine.add_done_callback(
+            lambda _: POKE_LOOP.call_soon_threadsafe(
+                self._fail, player, BattleError.DISCONNECT, "websocket closed"
+            )
+        )
+
+    def _fail(self, player, error: BattleError, message: str):
+        if player not in self._players:
+            return  # already dropped, e.g. its websocket closed on release
+        if error == BattleError.DISCONNECT:
+            self._disconnected.add(player)
+        failure = self._failures.get(player)
+        if failure is not None and not failure.done():
+            logging.error(f"Battle failed ({error.value}): {message.strip()}")
+            failure.set_result(error)
+
+    async def _acquire(self):
+        if self._available is None:
+            self._available = asyncio.Condition()
+
+        async with self._available:
+            while (
+                not self._idle
+                and self.max_players is not None
+                and self._n_players >= self.max_players
+            ):
+                await self._available.wait()
+
+            while self._idle:
+                player = self._idle.pop()
+                if player not in self._disconnected:
+                    return player
+                self._disconnected.discard(player)
+                self._players.discard(player)
+                self._n_players -= 1
+            self._n_players += 1
+
+        return self._make_player()
+
+    async def _release(self, player, healthy: bool):
+        if not healthy:
+            self._n_players -= 1
+            self._players.discard(player)
+            self._disconnected.discard(player)
+            try:
+                await player.ps_client.stop_listening()
+            except Exception as e:
+                logging.error(f"Failed to close player connection: {e}")
+
+        async with self._available:
+            if healthy:
+                self._idle.append(player)
+            self._available.notify()
+
+    async def battle(self, team1: str, team2: str) -> BattleOutcome:
+        """
+        Play one battle between two pooled players. Teams are given in
+        Showdown's packed format.
+
+        Returns the outcome as seen by each player's own side; failed
+        battles have winner 0 and the error set.
+        """
+        player1 = await self._acquire()
+        player2 = await self._acquire()
+        player1.update_team(PackedTeambuilder(team1))
+        player2.update_team(PackedTeambuilder(team2))
+
+        known_tags = set(player1.battles)
+        failure = asyncio.get_running_loop().create_future()
+        self._failures[player1] = self._failures[player2] = failure
+        battle = asyncio.ensure_future(player1.battle_against(player2, n_battles=1))
+        healthy = True
+        outcome = BattleOutcome()
+
+        try:
+            done, _ = await asyncio.wait(
+                {battle, failure},
+                timeout=BATTLE_TIMEOUT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if battle in done:
+                battle.result()
+                for tag in [t for t in player1.battles if t not in known_tags]:
+                    # Finished battles are never looked at again; don't let
+                    # long-lived players accumulate them.
+                    finished = player1.battles.pop(tag)
+                    other = player2.battles.pop(tag, None)
+                    hp1, fainted1 = team_status(finished.team.values())
+                    # player2 knows its own team; player1 only what it has seen
+                    hp2, fainted2 = team_status(
+                        other.team.values() if other is not None else finished.opponent_team.values()
+                    )
+                    outcome = BattleOutcome(
+                        winner=1 if finished.won else 2 if finished.lost else 0,
+                        turns=finished.turn,
+                        hp_fraction=(hp1, hp2),
+                        fainted=(fainted1, fainted2),
+                    )
+            elif failure in done:
+                outcome = BattleOutcome.failed(failure.result())
+                healthy = False
+            else:
+                logging.error("Battle timed out")
+                outcome = BattleOutcome.failed(BattleError.TIMEOUT)
+                healthy = False
+        except Exception as e:
+            logging.error(f"Unexpected error during battle: {e}")
+            outcome = BattleOutcome.failed(BattleError.ENGINE_ERROR)
+            healthy = False
+        finally:
+            if not battle.done():
+                battle.cancel()
+            self._failures.pop(player1, None)
+            self._failures.pop(player2, None)
+            await self._release(player1, healthy)
+            await self._release(player2, healthy)
+
+        return outcome
+
+    async def close(self):
+        """Log out every idle player; players in a battle are kept."""
+        while self._idle:
+            player = self._idle.pop()
+            self._n_players -= 1
+            self._players.discard(player)
+            self._disconnected.discard(player)
+            try:
+                await player.ps_client.stop_listening()
+            except Exception as e:
+                logging.error(f"Failed to close player connection: {e}")
+
+
+# One pool per (format, server); only ever touched from POKE_LOOP.
+_POOLS: dict[tuple[str, ServerConfiguration], PlayerPool] = {}
+
+
+def get_pool(
+    battle_format: str,
+    server_configuration: ServerConfiguration = LocalhostServerConfiguration,
+) -> PlayerPool:
+    key = (battle_format, server_configuration)
+    if key not in _POOLS:
+        _POOLS[key] = PlayerPool(battle_format, server_configuration)
+    return _POOLS[key]
+
+
+async def _close_pools():
+    for pool in list(_POOLS.values()):
+        await pool.close()
+    _POOLS.clear()
+
+
+def close_pools():
+    """Close every pooled connection. Safe to call more than once."""
+    asyncio.run_coroutine_threadsafe(_close_pools(), POKE_LOOP).result()
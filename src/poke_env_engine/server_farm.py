@@ -0,0 +1,213 @@
+import atexit
+import logging
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from poke_env.ps_client.server_configuration import (
+    LocalhostServerConfiguration,
+    ServerConfiguration,
+)
+
+
+SHOWDOWN_DIR = Path(__file__).resolve().parents[2] / "pokemon-showdown"
+
+STARTUP_TIMEOUT = 120  # seconds; the first start may have to build the server
+HEALTH_CHECK_INTERVAL = 10  # seconds between liveness checks of the farm
+
+
+def _port_open(port: int, timeout: float = 0.5) -> bool:
+    try:
+        with socket.create_connection(("localhost", port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ShowdownServer:
+    """
+    One local `pokemon-showdown` process listening on its own port.
+    """
+
+    def __init__(self, port: int, showdown_dir: Path = SHOWDOWN_DIR):
+        self.port = port
+        self.showdown_dir = showdown_dir
+        self.process: subprocess.Popen | None = None
+        self.outstanding = 0  # battles currently routed to this server
+        self.ready = False
+        self.generation = 0  # bumped whenever the server comes back after being down
+        self.configuration = ServerConfiguration(
+            f"ws://localhost:{port}/showdown/websocket",
+            LocalhostServerConfiguration.authentication_url,
+        )
+
+    def start(self, skip_build: bool = True):
+        args = ["node", "pokemon-showdown", "start", "--no-security"]
+        if skip_build:
+            args.append("--skip-build")
+        args.append(str(self.port))
+
+        self.ready = False
+        self.process = subprocess.Popen(
+            args,
+            cwd=self.showdown_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def wait_until_ready(self, timeout: float = STARTUP_TIMEOUT):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process is not None and self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Showdown server on port {self.port} exited with code {self.process.returncode}"
+                )
+            if _port_open(self.port):
+                self.ready = True
+                return
+            time.sleep(0.5)
+        raise RuntimeError(f"Showdown server on port {self.port} did not start within {timeout}s")
+
+    def is_alive(self) -> bool:
+        if self.process is None:
+            # Started by another process (see ShowdownServerFarm.attach)
+            return _port_open(self.port)
+        return self.process.poll() is None and _port_open(self.port)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        self.ready = False
+
+
+class ShowdownServerFarm:
+    """
+    Launches several local Showdown servers from the bundled submodule and
+    spreads battles across them by least outstanding work.
+
+    A farm started here is health-checked every `health_check_interval`
+    seconds on a background thread, whether or not this process routes any
+    battles (with battle executor workers, only the workers do); dead
+    servers are restarted and skipped until they accept connections again.
+    Attached farms (see attach) are checked at most as often when a battle
+    is routed, on a thread of its own rather than on the event loop, and
+    only skip servers that are down.
+    """
+
+    def __init__(
+        self,
+        n_servers: int,
+        base_port: int = 8000,
+        showdown_dir: Path = SHOWDOWN_DIR,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+    ):
+        if n_servers < 1:
+            raise ValueError("n_servers must be at least 1")
+        self.servers = [
+            ShowdownServer(base_port + i, showdown_dir) for i in range(n_servers)
+        ]
+        self.health_check_interval = health_check_interval
+        self._last_health_check = 0.0
+        self._health_check_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.managed = True
+
+    @classmethod
+    def attach(cls, ports: list[int], health_check_interval: float = HEALTH_CHECK_INTERVAL) -> "ShowdownServerFarm":
+        """
+        Route battles to servers started by another process, e.g. from a
+        battle executor worker. Attached servers are skipped while down but
+        never restarted from here.
+        """
+        farm = cls(len(ports), health_check_interval=health_check_interval)
+        farm.servers = [ShowdownServer(port) for port in ports]
+        for server in farm.servers:
+            server.ready = True
+        farm.managed = False
+        farm._last_health_check = time.time()
+        return farm
+
+    @property
+    def ports(self) -> list[int]:
+        return [server.port for server in self.servers]
+
+    def start(self):
+        if not self.servers[0].showdown_dir.exists():
+            raise FileNotFoundError(
+                f"pokemon-showdown not found at {self.servers[0].showdown_dir}; "
+                "run `git submodule update --init --recursive`"
+            )
+
+        # Only the first server builds; the rest reuse its build output.
+        first, *rest = self.servers
+        first.start(skip_build=False)
+        first.wait_until_ready()
+        for server in rest:
+            server.start()
+        for server in rest:
+            server.wait_until_ready()
+
+        self._last_health_check = time.time()
+        threading.Thread(target=self._monitor, name="farm-monitor", daemon=True).start()
+        atexit.register(self.stop)
+        print(f"[FARM] Started {len(self.servers)} Showdown servers on ports "
+              f"{self.servers[0].port}-{self.servers[-1].port}")
+
+    def health_check(self):
+        # Blocking: socket probes and, for managed farms, process restarts
+        if not self._health_check_lock.acquire(blocking=False):
+            return  # another check is already running
+        try:
+            for server in self.servers:
+                if server.ready and not server.is_alive():
+                    if self.managed:
+                        logging.error(f"Showdown server on port {server.port} died; restarting")
+                        server.stop()
+                        server.start()
+                    else:
+                        server.ready = False
+                elif not server.ready and (server.process is not None or not self.managed) and _port_open(server.port):
+                    server.ready = True
+                    server.generation += 1
+            self._last_health_check = time.time()
+        finally:
+            self._health_check_lock.release()
+
+    def _monitor(self):
+        while not self._stopped.wait(self.health_check_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                logging.error(f"Showdown farm health check failed: {e}")
+
+    def acquire(self) -> ShowdownServer:
+        """Pick the ready server with the fewest battles in flight."""
+        if not self.managed and time.time() - self._last_health_check > self.health_check_interval:
+            # Don't start another check until this one is due again
+            self._last_health_check = time.time()
+            threading.Thread(target=self.health_check, name="farm-health-check", daemon=True).start()
+
+        ready = [s for s in self.servers if s.ready]
+        if not ready:
+            raise RuntimeError("No Showdown server in the farm is ready")
+
+        server = min(ready, key=lambda s: s.outstanding)
+        server.outstanding += 1
+        return server
+
+    def release(self, server: ShowdownServer):
+        server.outstanding -= 1
+
+    def stop(self):
+        if not self.managed:
+            return
+        self._stopped.set()
+        for server in self.servers:
+            server.stop()
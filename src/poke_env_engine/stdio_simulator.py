@@ -0,0 +1,422 @@
+import json
+import logging
+import os
+import queue
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from poke_env.battle import Battle
+from poke_env.data import GenData
+from poke_env.player import SimpleHeuristicsPlayer as PLAYER_CLASS
+from poke_env.ps_client import AccountConfiguration
+
+from battles.outcome import BattleError, BattleOutcome, BattleResult, team_status
+from battles.teams import compile_team
+from battles.validation import matchup_problems
+from poke_env_engine.server_farm import SHOWDOWN_DIR
+
+
+SIMULATOR_TIMEOUT = 15  # seconds of simulator silence before a battle is abandoned
+ACQUIRE_TIMEOUT = 60  # seconds to wait for a warm simulator before a battle is abandoned
+RESPAWN_DELAY = 5  # seconds before retrying a simulator that failed to start
+MAX_TURNS = 1000  # battles still running after this many turns are called a tie
+MAX_BATTLES_PER_PROCESS = 500  # simulators are restarted after this many battles
+DEFAULT_POOL_SIZE = os.cpu_count() or 1
+
+BATTLE_STREAM_SCRIPT = Path(__file__).resolve().with_name("battle_stream.js")
+
+LOGGER = logging.getLogger("stdio_simulator")
+LOGGER.setLevel(logging.ERROR)
+
+
+# ============================================================
+# Simulator processes
+# ============================================================
+
+class SimulatorProcess:
+    """
+    One long-lived Node child process running battle_stream.js, which
+    speaks the `pokemon-showdown simulate-battle` protocol but plays battle
+    after battle, so Showdown is loaded once per process.
+
+    Output is read on a background thread so that a silent simulator can be
+    detected with a timeout instead of blocking forever.
+    """
+
+    def __init__(self, showdown_dir=SHOWDOWN_DIR):
+        self.battles = 0
+        self.process = subprocess.Popen(
+            ["node", str(BATTLE_STREAM_SCRIPT), str(showdown_dir)],
+            cwd=showdown_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self.lines: queue.Queue = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.lines.put(line.rstrip("\n"))
+        self.lines.put(None)  # EOF
+
+    def send(self, line: str):
+        self.process.stdin.write(line + "\n")
+        self.process.stdin.flush()
+
+    def read_chunk(self, timeout: float = SIMULATOR_TIMEOUT) -> list[str]:
+        """
+        Read one output chunk: a type line ("update", "sideupdate" or "end")
+        followed by its body, terminated by a blank line.
+
+        Raises queue.Empty on timeout and EOFError if the simulator exited.
+        """
+        chunk = []
+        while True:
+            line = self.lines.get(timeout=timeout)
+            if line is None:
+                raise EOFError("Simulator process exited")
+            if line == "":
+                if chunk:
+                    return chunk
+                continue
+            chunk.append(line)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        if self.process.poll() is None:
+            self.process.terminate()
+
+
+class SimulatorPool:
+    """
+    Pool of long-lived simulator processes, each playing one battle at a
+    time.
+
+    A process goes back to the pool after every battle that ended cleanly.
+    One that failed, or has played MAX_BATTLES_PER_PROCESS battles, is
+    replaced. A replacement that fails to start is retried in the
+    background, so the pool never shrinks.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.size = size
+        self._warm: queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._warm.put(SimulatorProcess())
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT) -> SimulatorProcess:
+        """Raises queue.Empty if no simulator is free within `timeout` seconds."""
+        return self._warm.get(timeout=timeout)
+
+    def release(self, process: SimulatorProcess):
+        process.battles += 1
+        if process.battles >= MAX_BATTLES_PER_PROCESS:
+            self.replace(process)
+        else:
+            self._warm.put(process)
+
+    def replace(self, process: SimulatorProcess):
+        process.close()
+        self._spawn()
+
+    def _spawn(self):
+        try:
+            self._warm.put(SimulatorProcess())
+        except Exception as e:
+            logging.error(f"Failed to start a simulator, retrying in {RESPAWN_DELAY}s: {e}")
+            retry = threading.Timer(RESPAWN_DELAY, self._spawn)
+            retry.daemon = True
+            retry.start()
+
+    def close(self):
+        while not self._warm.empty():
+            self._warm.get().close()
+
+
+_POOL: SimulatorPool | None = None
+_POOL_LOCK = threading.Lock()
+_POOL_SIZE = DEFAULT_POOL_SIZE
+
+
+def set_pool_size(size: int):
+    """Size of this process's simulator pool; call before the first battle.
+    Battle executor workers use it to share the cores between them."""
+    global _POOL_SIZE
+    _POOL_SIZE = max(1, size)
+
+
+def get_pool() -> SimulatorPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SimulatorPool(_POOL_SIZE)
+        return _POOL
+
+
+# ============================================================
+# Driving both sides
+# ============================================================
+
+_POLICY = None
+_POLICY_LOCK = threading.Lock()
+
+
+def _get_policy():
+    # The heuristics only look at the battle object, so one offline player
+    # can choose for both sides of every battle.
+    global _POLICY
+    if _POLICY is None:
+        _POLICY = PLAYER_CLASS(
+            account_configuration=AccountConfiguration("stdio_policy", None),
+            start_listening=False,
+        )
+        _POLICY.logger.setLevel(logging.ERROR)
+    return _POLICY
+
+
+def _choose_move(battle: Battle, rng: random.Random | None):
+    # The heuristics break some ties with the global random module. A
+    # seeded side lends it its own stream for the call, so the side's
+    # choices replay exactly whatever other battles run meanwhile.
+    with _POLICY_LOCK:
+        if rng is None:
+            return _get_policy().choose_move(battle)
+        state = random.getstate()
+        random.setstate(rng.getstate())
+        try:
+            return _get_policy().choose_move(battle)
+        finally:
+            rng.setstate(random.getstate())
+            random.setstate(state)
+
+
+def showdown_seed(seed: int) -> list[int]:
+    """Showdown's PRNG seed, four 16-bit numbers, for an integer seed."""
+    return [(seed >> shift) & 0xFFFF for shift in (48, 32, 16, 0)]
+
+
+def _side_view(lines: list[str], side_id: str) -> list[str]:
+    """Resolve |split| blocks to what side_id is allowed to see."""
+    view = []
+    it = iter(lines)
+    for line in it:
+        if line.startswith("|split|"):
+            secret = next(it, "")
+            public = next(it, "")
+            view.append(secret if line[len("|split|"):] == side_id else public)
+        else:
+            view.append(line)
+    return view
+
+
+class _SimulatedSide:
+    def __init__(self, side_id: str, battle_format: str, seed: int | None = None):
+        self.id = side_id
+        self.rng = random.Random(f"{seed}:{side_id}") if seed is not None else None
+        self.battle = Battle(
+            battle_tag=f"battle-{battle_format}-stdio",
+            username=side_id,
+            logger=LOGGER,
+            gen=GenData.from_format(battle_format).gen,
+        )
+        self.pending_request = None
+
+    def observe(self, lines: list[str]):
+        for line in lines:
+            split_message = line.split("|")
+            if len(split_message) < 2 or split_message[1] in ("win", "tie"):
+                continue
+            try:
+                self.battle.parse_message(split_message)
+            except Exception as e:
+                LOGGER.debug(f"Ignoring unparsed message {line!r}: {e}")
+
+    def choose(self) -> str | None:
+        request, self.pending_request = self.pending_request, None
+        if request is None or request.get("wait"):
+            return None
+        if request.get("teamPreview"):
+            return f">{self.id} default"
+
+        self.battle.parse_request(request)
+        message = _choose_move(self.battle, self.rng).message
+        message = message.replace("/choose ", "", 1) or "default"
+        return f">{self.id} {message}"
+
+
+def _outcome(sides: dict, winner: int) -> BattleOutcome:
+    # Each side tracks its own team from its requests and the battle log
+    hp1, fainted1 = team_status(sides["p1"].battle.team.values())
+    hp2, fainted2 = team_status(sides["p2"].battle.team.values())
+    return BattleOutcome(
+        winner=winner,
+        turns=sides["p1"].battle.turn,
+        hp_fraction=(hp1, hp2),
+        fainted=(fainted1, fainted2),
+    )
+
+
+def _run_battle(
+    process: SimulatorProcess, team1: str, team2: str, format: str, seed: int | None = None
+) -> BattleOutcome:
+    start = {"formatid": format}
+    if seed is not None:
+        start["seed"] = showdown_seed(seed)
+    process.send(f">start {json.dumps(start)}")
+    process.send(f">player p1 {json.dumps({'name': 'p1', 'team': team1})}")
+    process.send(f">player p2 {json.dumps({'name': 'p2', 'team': team2})}")
+
+    sides = {"p1": _SimulatedSide("p1", format, seed), "p2": _SimulatedSide("p2", format, seed)}
+    forced_tie = False
+    outcome = None
+
+    # The battle is decided by a |win| or |tie| update, but the process is
+    # only free for the next one after the "end" chunk that follows it
+    while True:
+        kind, *body = process.read_chunk()
+
+        if kind == "sideupdate":
+            side = sides[body[0]]
+            for line in body[1:]:
+                if line.startswith("|request|"):
+                    side.pending_request = json.loads(line[len("|request|"):])
+                elif line.startswith("|error|"):
+                    # Invalid or unavailable choice: let the simulator pick.
+                    if "[Invalid choice] There's nothing to choose" not in line:
+                        side.pending_request = None
+                        process.send(f">{side.id} default")
+
+        elif kind == "update":
+            for side in sides.values():
+                side.observe(_side_view(body, side.id))
+
+            for line in body:
+                if line.startswith("|win|"):
+                    outcome = _outcome(sides, 1 if line[len("|win|"):] == "p1" else 2)
+                if line == "|tie" or line.startswith("|tie|"):
+                    outcome = _outcome(sides, 0)
+            if outcome is not None:
+                continue
+
+            if sides["p1"].battle.turn > MAX_TURNS and not forced_tie:
+                process.send(">forcetie")
+                forced_tie = True
+                continue
+
+            # Requests arrive before the log of the turn that produced them,
+            # so choices are made once that log has been observed.
+            for side in sides.values():
+                choice = side.choose()
+                if choice:
+                    process.send(choice)
+
+        elif kind == "end":
+            if outcome is not None:
+                return outcome
+            winner = json.loads(body[0]).get("winner") if body else None
+            return _outcome(sides, 1 if winner == "p1" else 2 if winner == "p2" else 0)
+
+
+def simulate(team1: str, team2: str, format: str, seed: int | None = None) -> BattleOutcome:
+    """Play one battle between two packed teams on a pooled simulator process.
+
+    With a seed, the simulator's PRNG and both sides' tie-breaks are
+    seeded, so the same teams, sides and seed always give the same battle.
+    """
+    start = time.perf_counter()
+    try:
+        pool = get_pool()
+        process = pool.acquire()
+        try:
+            outcome = _run_battle(process, team1, team2, format, seed)
+        except BaseException:
+            # Mid-battle, so the process can't start another one
+            pool.replace(process)
+            raise
+        pool.release(process)
+    except queue.Empty:
+        logging.error("Simulator timed out")
+        outcome = BattleOutcome.failed(BattleError.TIMEOUT)
+    except EOFError as e:
+        logging.error(f"battle_once lost the simulator: {e}")
+        outcome = BattleOutcome.failed(BattleError.DISCONNECT)
+    except Exception as e:
+        logging.error(f"battle_once failed catastrophically: {e}")
+        outcome = BattleOutcome.failed(BattleError.ENGINE_ERROR)
+
+    outcome.duration_sec = time.perf_counter() - start
+    return outcome
+
+
+def battle_outcome(
+    team1: tuple[list[int], list[list[int]]],
+    team2: tuple[list[int], list[list[int]]],
+    format: str,
+    seed: int | None = None,
+) -> BattleOutcome:
+    """Run one battle on a local simulator process, without the websocket
+    server, and report winner, turns, remaining HP, fainted counts, duration
+    and error. A seed makes the battle reproducible (see simulate).
+    """
+    problems = matchup_problems(team1, team2, format)
+    if problems:
+        logging.error(f"Illegal team, battle skipped: {problems[0]}")
+        return BattleOutcome.failed(BattleError.INVALID_TEAM)
+
+    try:
+        team1_str = compile_team(team1).packed
+        team2_str = compile_team(team2).packed
+    except Exception as e:
+        logging.error(f"battle_once failed catastrophically: {e}")
+        return BattleOutcome.failed(BattleError.ENGINE_ERROR)
+    return simulate(team1_str, team2_str, format, seed)
+
+
+def battle_once(
+    team1: tuple[list[int], list[list[int]]],
+    team2: tuple[list[int], list[list[int]]],
+    format: str,
+    seed: int | None = None,
+) -> BattleResult:
+    """Run one battle on a local simulator process, without the websocket server.
+    Returns:
+        1 if team1 wins
+        2 if team2 wins
+        0 if draw OR ANY ERROR, with the error on the result
+    """
+    return battle_outcome(team1, team2, format, seed).result
+
+
+def battle_outcomes(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int | None = None,
+) -> list[BattleOutcome]:
+    """Run a batch of battles concurrently, one battle per simulator process at a time.
+    A job may carry a seed as a fourth element.
+
+    Returns:
+        One BattleOutcome per job, in input order.
+    """
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=concurrency or get_pool().size) as executor:
+        return list(executor.map(lambda job: battle_outcome(*job), jobs))
+
+
+def battle_many(
+    jobs: list[tuple[tuple[list[int], list[list[int]]], tuple[list[int], list[list[int]]], str]],
+    concurrency: int | None = None,
+) -> list[BattleResult]:
+    """Like battle_outcomes, but with the same 1/2/0 results as battle_once."""
+    return [outcome.result for outcome in battle_outcomes(jobs, concurrency)]
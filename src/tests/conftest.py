@@ -0,0 +1,30 @@
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# The code is run from src/ with top-level imports and data paths relative
+# to it, so the tests are too, wherever pytest is started from
+SRC = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SRC))
+os.chdir(SRC)
+
+from battles.learnset_index import LearnsetIndex  # noqa: E402
+
+OU_LEARNSETS = Path("data/learnsets_by_tier/learnsets_ou.json")
+
+
+@pytest.fixture(scope="session")
+def ou_index() -> LearnsetIndex:
+    with open(OU_LEARNSETS, encoding="utf-8") as f:
+        return LearnsetIndex(json.load(f))
+
+
+@pytest.fixture
+def ou_teams(ou_index):
+    """Ten random legal OU teams, the same every run."""
+    rng = random.Random(0)
+    return [ou_index.sample_team(rng) for _ in range(10)]
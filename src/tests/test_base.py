@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from battles.validation import is_legal
+from config import get_engine, get_format
+from optimization.elo_ga import EloGeneticAlgorithm
+
+
+@pytest.fixture
+def ga():
+    return EloGeneticAlgorithm(
+        learnsets_path=Path("data/learnsets_by_tier/learnsets_ou.json"),
+        battle_engine_func=get_engine("fast-gen1"),
+        battle_format=get_format("OU"),
+        population_size=6,
+        survivors_count=2,
+        num_matchups=10,
+        p_pokemon_mutation_rate=0.1,
+        move_mutation_rate=0.1,
+        seed=0,
+    )
+
+
+def test_unique_team_resamples_repeats_and_illegal_teams(ga, ou_teams):
+    species, moves = ou_teams[1]
+    twice = ([species[0]] + species[:5], [moves[0]] + moves[:5])
+    offered = iter([ou_teams[0], twice, ou_teams[2]])
+    seen = {ga.team_hash(ou_teams[0])}
+
+    assert ga.unique_team(lambda: next(offered), seen) == ou_teams[2]
+    assert seen == {ga.team_hash(ou_teams[0]), ga.team_hash(ou_teams[2])}
+
+
+def test_unique_team_falls_back_to_random_teams(ga, ou_teams):
+    seen = {ga.team_hash(ou_teams[0])}
+    team = ga.unique_team(lambda: ou_teams[0], seen)
+    assert team != ou_teams[0] and is_legal(team, ga.format)
+
+
+def test_unique_team_gives_up_when_no_team_is_left(ga, ou_teams, monkeypatch):
+    monkeypatch.setattr(ga, "sample_random_team", lambda: ou_teams[0])
+    with pytest.raises(RuntimeError, match="No new legal team"):
+        ga.unique_team(lambda: ou_teams[0], {ga.team_hash(ou_teams[0])})
+
+
+def test_fill_unique(ga, ou_teams):
+    population = ga.fill_unique(ou_teams[:2], 6, lambda: ou_teams[0])
+    assert population[:2] == ou_teams[:2]
+    assert len({ga.team_hash(team) for team in population}) == 6
@@ -0,0 +1,141 @@
+import pytest
+
+from battles.cache import BattleCache, CachedBattleEngine, pair_key
+from battles.outcome import BattleError, BattleResult
+from battles.teams import compile_team
+
+FORMAT = "gen1ou"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = BattleCache(tmp_path / "battles.sqlite")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def teams(ou_teams):
+    a, b = ou_teams[:2]
+    # Order the pair by hash, so `a` is the canonical first team
+    return (a, b) if compile_team(a).hash < compile_team(b).hash else (b, a)
+
+
+class Recorder:
+    """Battle function returning queued results and counting its calls."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, *job):
+        self.calls.append(job)
+        return self.results.pop(0)
+
+
+class Winner(Recorder):
+    """Battle function in which `team` always wins, from either side."""
+
+    def __init__(self, team):
+        super().__init__()
+        self.team = team
+
+    def __call__(self, *job):
+        self.calls.append(job)
+        return 1 if job[0] == self.team else 2
+
+
+def test_pair_key_is_shared_by_both_orders(teams):
+    a, b = teams
+    key_ab, swapped_ab = pair_key(a, b, FORMAT, "fast-gen1")
+    key_ba, swapped_ba = pair_key(b, a, FORMAT, "fast-gen1")
+    assert key_ab == key_ba
+    assert (swapped_ab, swapped_ba) == (False, True)
+
+
+def test_pair_key_depends_on_format_engine_and_seed(teams):
+    a, b = teams
+    key = pair_key(a, b, FORMAT, "fast-gen1")[0]
+    assert pair_key(a, b, "gen1uu", "fast-gen1")[0] != key
+    assert pair_key(a, b, FORMAT, "showdown-stdio")[0] != key
+    assert pair_key(a, b, FORMAT, "fast-gen1", seed=1)[0] != key
+
+
+def test_seeded_pair_keys_keep_their_order(teams):
+    a, b = teams
+    key_ab, swapped_ab = pair_key(a, b, FORMAT, "fast-gen1", seed=7)
+    key_ba, swapped_ba = pair_key(b, a, FORMAT, "fast-gen1", seed=7)
+    assert key_ab != key_ba
+    assert not swapped_ab and not swapped_ba
+
+
+def test_results_are_flipped_for_the_swapped_order(cache, teams):
+    a, b = teams
+    cache.add(b, a, FORMAT, "fast-gen1", [1, 1, 2, 0])
+    assert cache.results(b, a, FORMAT, "fast-gen1") == [1, 1, 2, 0]
+    assert cache.results(a, b, FORMAT, "fast-gen1") == [2, 2, 1, 0]
+    assert cache.tallies(a, b, FORMAT, "fast-gen1") == (1, 2, 1)
+
+
+def test_results_persist(tmp_path, teams):
+    a, b = teams
+    cache = BattleCache(tmp_path / "battles.sqlite")
+    cache.add(a, b, FORMAT, "fast-gen1", [1, 2])
+    cache.add(a, b, FORMAT, "fast-gen1", [0])
+    cache.close()
+
+    reopened = BattleCache(tmp_path / "battles.sqlite")
+    assert reopened.results(a, b, FORMAT, "fast-gen1") == [1, 2, 0]
+    reopened.close()
+
+
+def test_sample_only_simulates_missing_results_and_never_stores_failures(cache, teams):
+    a, b = teams
+    failed = BattleResult.failed(BattleError.ENGINE_ERROR)
+    battle = Recorder(1, failed)
+    cache.add(a, b, FORMAT, "fast-gen1", [2])
+
+    assert cache.sample(a, b, FORMAT, "fast-gen1", 3, battle) == [2, 1, failed]
+    assert len(battle.calls) == 2
+    assert cache.results(a, b, FORMAT, "fast-gen1") == [2, 1]
+
+
+def test_cached_engine_cycles_through_samples(cache, teams):
+    a, b = teams
+    battle = Recorder(1, 2)
+    engine = CachedBattleEngine(battle, "fast-gen1", cache=cache, max_samples=2)
+
+    assert [engine(a, b, FORMAT) for _ in range(4)] == [1, 2, 1, 2]
+    assert len(battle.calls) == 2
+    # The swapped matchup shares the samples, seen from the other side:
+    # this is the fifth call, so the first sample, which a won
+    assert engine(b, a, FORMAT) == 2
+
+
+def test_cached_engine_plays_a_seeded_battle_once(cache, teams):
+    a, b = teams
+    battle = Recorder(2, 1)
+    engine = CachedBattleEngine(battle, "fast-gen1", cache=cache, max_samples=5)
+
+    assert [engine(a, b, FORMAT, 3) for _ in range(3)] == [2, 2, 2]
+    assert battle.calls == [(a, b, FORMAT, 3)]
+    assert engine(b, a, FORMAT, 3) == 1
+
+
+def test_cached_engine_map_matches_single_calls(tmp_path, teams):
+    a, b = teams
+    jobs = [(a, b, FORMAT), (b, a, FORMAT), (a, b, FORMAT, 4), (a, b, FORMAT)]
+
+    single_cache = BattleCache(tmp_path / "single.sqlite")
+    single = CachedBattleEngine(Winner(b), "fast-gen1", cache=single_cache, max_samples=2)
+    expected = [single(*job) for job in jobs]
+
+    batch_cache = BattleCache(tmp_path / "batch.sqlite")
+    battle = Winner(b)
+    batch = CachedBattleEngine(battle, "fast-gen1", cache=batch_cache, max_samples=2)
+    assert batch.map(jobs) == expected == [2, 1, 2, 2]
+    # Two samples of the unseeded matchup and one seeded battle
+    assert len(battle.calls) == 3
+
+    single_cache.close()
+    batch_cache.close()
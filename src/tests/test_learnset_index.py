@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+
+from battles.learnset_index import gumbel_keys
+
+
+def test_sample_team_is_legal(ou_index):
+    rng = random.Random(0)
+    for _ in range(20):
+        species, moves = ou_index.sample_team(rng)
+        assert len(set(species)) == 6
+        for pid, slot_moves in zip(species, moves):
+            assert len(set(slot_moves)) == 4
+            assert all(ou_index.can_learn(pid, mid) for mid in slot_moves)
+
+
+def test_lookups(ou_index):
+    pid = int(ou_index.species[0])
+    assert ou_index.knows(pid) and not ou_index.knows(-1) and not ou_index.knows(10_000)
+    assert all(ou_index.can_learn(pid, mid) for mid in ou_index.moves(pid))
+    assert not ou_index.can_learn(pid, 10_000)
+
+    moves = np.array([[list(ou_index.moves(pid)[:2]) + [10_000]]])
+    positions = ou_index.move_positions(np.array([[pid]]), moves)
+    assert ou_index.move_ids[positions[0, 0, :2]].tolist() == list(ou_index.moves(pid)[:2])
+    assert positions[0, 0, 2] == -1
+
+
+def test_random_moves_are_distinct_and_learnable(ou_index):
+    rng = np.random.default_rng(3)
+    species = rng.choice(ou_index.species, size=(20, 6))
+    moves = ou_index.random_moves(species, rng)
+    assert moves.shape == (20, 6, 4)
+    assert ou_index.legal[species[..., None], moves].all()
+    ordered = np.sort(moves, axis=-1)
+    assert (ordered[..., 1:] != ordered[..., :-1]).all()
+
+
+def test_gumbel_keys_sample_in_proportion_to_weights():
+    rng = np.random.default_rng(0)
+    weights = np.array([1.0, 2.0, 3.0, 4.0])
+    first = np.argmin(gumbel_keys(rng.random((100_000, len(weights))), weights), axis=1)
+    frequencies = np.bincount(first, minlength=len(weights)) / len(first)
+    np.testing.assert_allclose(frequencies, weights / weights.sum(), atol=0.01)
+
+
+def test_gumbel_keys_never_pick_zero_weights():
+    rng = np.random.default_rng(1)
+    weights = np.array([0.0, 1.0, 0.0, 1.0, 1.0])
+    top3 = np.argsort(gumbel_keys(rng.random((1000, len(weights))), weights), axis=1)[:, :3]
+    assert set(np.unique(top3)) == {1, 3, 4}
+
+
+def test_uniform_weights_keep_the_order_of_the_keys():
+    uniform = np.random.default_rng(2).random((5, 8))
+    keys = gumbel_keys(uniform, np.ones(8))
+    np.testing.assert_array_equal(np.argsort(keys, axis=1), np.argsort(-uniform, axis=1))
+
+
+def test_weighted_random_moves_avoid_zero_weights(ou_index):
+    rng = np.random.default_rng(4)
+    pid = int(ou_index.species[0])
+    row = ou_index.species_rows[pid]
+    start, end = ou_index.offsets[row], ou_index.offsets[row + 1]
+    weights = np.ones(len(ou_index.move_ids))
+    weights[start + 4:end] = 0.0
+
+    moves = ou_index.random_moves(np.full(50, pid), rng, weights)
+    assert (np.sort(moves, axis=-1) == np.sort(ou_index.move_ids[start:start + 4])).all()
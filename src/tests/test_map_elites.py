@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from config import get_engine, get_format
+from optimization.base import Evaluation
+from optimization.map_elites import DESCRIPTOR_BINS, EloMapElites, cell_of, descriptors
+
+OU_LEARNSETS = Path("data/learnsets_by_tier/learnsets_ou.json")
+
+
+def map_elites(archive_path, seed=0, **kwargs):
+    return EloMapElites(
+        learnsets_path=OU_LEARNSETS,
+        battle_engine_func=get_engine("fast-gen1"),
+        battle_format=get_format("OU"),
+        population_size=8,
+        survivors_count=3,
+        num_matchups=16,
+        p_pokemon_mutation_rate=0.3,
+        move_mutation_rate=0.2,
+        archive_path=archive_path,
+        seed=seed,
+        **kwargs,
+    )
+
+
+def test_cells_bin_the_descriptors(ou_teams):
+    for team in ou_teams:
+        cell = cell_of(team)
+        assert len(cell) == len(DESCRIPTOR_BINS)
+        for index, value, edges in zip(cell, descriptors(team), DESCRIPTOR_BINS.values()):
+            assert 0 <= index <= len(edges)
+            assert index == len(edges) or value <= edges[index]
+            assert index == 0 or value > edges[index - 1]
+
+
+def test_archive_round_trip(tmp_path):
+    path = tmp_path / "archive.json"
+    first = map_elites(path)
+    first.optimize(2)
+    assert path.exists() and not path.with_suffix(".tmp").exists()
+
+    resumed = map_elites(path, seed=1)
+    resumed.load_archive()
+    assert resumed.archive == first.archive
+    assert resumed.archive_battles == first.archive_battles == first.total_battles_used
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["format"] == "gen1ou"
+    assert all(
+        elite["descriptors"] == list(descriptors(elite["team"])) and tuple(elite["cell"]) == cell_of(elite["team"])
+        for elite in saved["elites"]
+    )
+
+
+def test_archive_for_another_format_is_rejected(tmp_path):
+    path = tmp_path / "archive.json"
+    map_elites(path).optimize(1)
+    other = EloMapElites(
+        learnsets_path=OU_LEARNSETS,
+        battle_engine_func=get_engine("fast-gen1"),
+        battle_format=get_format("UU"),
+        population_size=8,
+        survivors_count=3,
+        num_matchups=16,
+        p_pokemon_mutation_rate=0.3,
+        move_mutation_rate=0.2,
+        archive_path=path,
+    )
+    with pytest.raises(ValueError):
+        other.load_archive()
+
+
+@pytest.fixture
+def batch(monkeypatch, ou_teams):
+    """An archive of two elites, and a batch of one of them and a child in
+    the other's cell."""
+    optimizer = map_elites(None)
+    anchor, elite, child = ou_teams[:3]
+    cells = {id(anchor): (0, 0, 0), id(elite): (1, 1, 1), id(child): (1, 1, 1)}
+    monkeypatch.setattr("optimization.map_elites.cell_of", lambda team: cells[id(team)])
+    optimizer.archive = {
+        (0, 0, 0): {"team": anchor, "score": 1200.0, "battles": 10},
+        (1, 1, 1): {"team": elite, "score": 1100.0, "battles": 10},
+    }
+    optimizer.batch_anchors = 1
+    optimizer.battles_played = [10, 10]
+    return optimizer, anchor, child
+
+
+def test_children_are_compared_on_the_archive_scale(batch):
+    optimizer, anchor, child = batch
+    # This batch rates the anchor 150 below its archived rating, so the
+    # child's 1060 is 1210 on the archive's scale and beats the elite
+    optimizer.update_archive([Evaluation(1050.0, anchor, {"index": 0}), Evaluation(1060.0, child, {"index": 1})])
+
+    assert optimizer.archive[(1, 1, 1)] == {"team": child, "score": pytest.approx(1210.0), "battles": 10}
+    # The anchor's rating averages its archived one with its shifted new one
+    assert optimizer.archive[(0, 0, 0)]["score"] == pytest.approx(1200.0)
+    assert optimizer.archive[(0, 0, 0)]["battles"] == 20
+
+
+def test_child_beating_weak_batch_mates_keeps_out(batch):
+    optimizer, anchor, child = batch
+    # The child out-rates the elite's archived 1100 only on this batch's scale
+    optimizer.update_archive([Evaluation(1250.0, anchor, {"index": 0}), Evaluation(1120.0, child, {"index": 1})])
+    assert optimizer.archive[(1, 1, 1)]["score"] == 1100.0
+
+
+def test_without_anchors_children_only_fill_empty_cells(batch):
+    optimizer, anchor, child = batch
+    optimizer.batch_anchors = 0
+    del optimizer.archive[(0, 0, 0)]
+    optimizer.update_archive([Evaluation(1300.0, anchor, {"index": 0}), Evaluation(1500.0, child, {"index": 1})])
+    assert optimizer.archive[(0, 0, 0)]["team"] is anchor
+    assert optimizer.archive[(1, 1, 1)]["score"] == 1100.0
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from battles.teams import canonical_team
+from optimization.population_array import (
+    PopulationArray,
+    crossover,
+    duplicates,
+    mutate,
+    random_population,
+    repeated_species,
+    replace_duplicates,
+)
+
+
+def test_round_trip(ou_teams):
+    assert PopulationArray.from_teams(ou_teams).to_teams() == [tuple(team) for team in ou_teams]
+
+
+def test_random_population_is_legal(ou_index):
+    population = random_population(ou_index, 50, np.random.default_rng(4))
+    species = np.sort(population.species, axis=1)
+    assert (species[:, 1:] != species[:, :-1]).all()
+    assert np.isin(population.species, ou_index.species).all()
+    assert ou_index.legal[population.species[..., None], population.moves].all()
+    moves = np.sort(population.moves, axis=-1)
+    assert (moves[..., 1:] != moves[..., :-1]).all()
+
+
+def test_crossover_takes_each_slot_from_a_parent(ou_teams):
+    a = PopulationArray.from_teams(ou_teams[:5])
+    b = PopulationArray.from_teams(ou_teams[5:])
+    child = crossover(a, b, np.random.default_rng(5))
+    from_a = child.species == a.species
+    assert (from_a | (child.species == b.species)).all()
+    assert (child.moves == np.where(from_a[..., None], a.moves, b.moves)).all()
+
+
+def test_mutate_keeps_moves_learnable(ou_index, ou_teams):
+    population = PopulationArray.from_teams(ou_teams)
+    mutated = mutate(population, ou_index, 0.5, 0.5, np.random.default_rng(6))
+    assert ou_index.legal[mutated.species[..., None], mutated.moves].all()
+    assert mutate(population, ou_index, 0.0, 0.0, np.random.default_rng(6)).to_teams() == population.to_teams()
+
+
+def test_replace_duplicates_gives_up_when_no_team_is_left(ou_teams):
+    kept = PopulationArray.from_teams(ou_teams[:1])
+
+    def same(count):
+        return kept.take(np.zeros(count, dtype=int))
+
+    with pytest.raises(RuntimeError, match="No new legal teams"):
+        replace_duplicates(kept, same(2), same, same)
+
+
+def shuffled(team, rng, keep_lead=True):
+    """The same team with its moves and bench (or every slot) reordered."""
+    start = 1 if keep_lead else 0
+    order = list(range(start)) + [int(k) + start for k in rng.permutation(len(team[0]) - start)]
+    return (
+        [team[0][k] for k in order],
+        [list(rng.permutation(team[1][k]).tolist()) for k in order],
+    )
+
+
+@pytest.mark.parametrize("keep_lead", [True, False])
+def test_canonical_matches_canonical_team(ou_teams, keep_lead):
+    rng = np.random.default_rng(0)
+    teams = ou_teams + [shuffled(team, rng) for team in ou_teams]
+    canonical = PopulationArray.from_teams(teams).canonical(keep_lead).to_teams()
+    assert canonical == [canonical_team(team, keep_lead) for team in teams]
+
+
+def test_duplicates_finds_later_copies(ou_teams):
+    rng = np.random.default_rng(1)
+    teams = ou_teams[:3] + [shuffled(ou_teams[1], rng), ou_teams[0], shuffled(ou_teams[2], rng, keep_lead=False)]
+    population = PopulationArray.from_teams(teams)
+    assert duplicates(population).tolist() == [3, 4]
+    assert duplicates(population, keep_lead=False).tolist() == [3, 4, 5]
+
+
+def test_repeated_species(ou_teams):
+    species, moves = ou_teams[0]
+    twice = ([species[0]] + species[:5], [moves[0]] + moves[:5])
+    population = PopulationArray.from_teams([ou_teams[1], twice, ou_teams[2]])
+    assert repeated_species(population).tolist() == [1]
+
+
+def test_replace_duplicates_remakes_repeats_and_species_clause_breaks(ou_index, ou_teams):
+    rng = np.random.default_rng(2)
+    kept = PopulationArray.from_teams(ou_teams[:4])
+    species, moves = ou_teams[5]
+    new = PopulationArray.from_teams([
+        ou_teams[4],
+        shuffled(ou_teams[0], rng),  # repeats a kept team
+        ou_teams[4],  # repeats an earlier new team
+        ([species[0]] + species[:5], [moves[0]] + moves[:5]),  # same species twice
+    ])
+    fresh = new.take([0]).species.copy()
+
+    def make(count):
+        return random_population(ou_index, count, rng)
+
+    result = replace_duplicates(kept, new, make, make)
+    assert result.species[0].tolist() == fresh[0].tolist()
+    assert not len(duplicates(PopulationArray.concat([kept, result])))
+    assert not len(repeated_species(result))
+
+
+def test_replace_duplicates_falls_back(ou_index, ou_teams):
+    rng = np.random.default_rng(3)
+    kept = PopulationArray.from_teams(ou_teams[:1])
+    new = PopulationArray.from_teams(ou_teams[:1])
+    stuck = PopulationArray.from_teams(ou_teams[:1])
+
+    def make(count):
+        # Never gets anywhere: always the kept team again
+        return stuck.take(np.zeros(count, dtype=int))
+
+    def fallback(count):
+        return random_population(ou_index, count, rng)
+
+    result = replace_duplicates(kept, new, make, fallback)
+    assert not len(duplicates(PopulationArray.concat([kept, result])))
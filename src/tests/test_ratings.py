@@ -0,0 +1,233 @@
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from battles.outcome import BattleError, BattleResult
+from config import get_format
+from optimization.elo_ga import EloGeneticAlgorithm
+from optimization.ratings import (
+    BASE_ELO,
+    ELO_DECAY,
+    GLICKO_INITIAL_RD,
+    K_FACTOR,
+    BradleyTerryRatings,
+    EloRatings,
+    GlickoRatings,
+    battle_scores,
+    expected_score,
+)
+
+
+FAILED = BattleResult.failed(BattleError.ENGINE_ERROR)
+
+
+def test_expected_score():
+    assert expected_score(1000, 1000) == 0.5
+    assert expected_score(1400, 1000) == pytest.approx(10 / 11)
+    assert expected_score(1000, 1400) + expected_score(1400, 1000) == pytest.approx(1)
+
+
+def test_battle_scores():
+    assert battle_scores(1) == (1.0, 0.0)
+    assert battle_scores(2) == (0.0, 1.0)
+    assert battle_scores(0) == (0.5, 0.5)
+
+
+# ---------------- Elo ----------------
+
+def test_elo_win_between_equals():
+    ratings = EloRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)], [1])
+    assert ratings.scores() == [BASE_ELO + K_FACTOR / 2, BASE_ELO - K_FACTOR / 2]
+
+
+def test_elo_batch_order_does_not_matter():
+    pairs, results = [(0, 1), (1, 2), (2, 0), (0, 1)], [1, 2, 0, 2]
+    forward, backward = EloRatings(), EloRatings()
+    forward.start_generation(3)
+    backward.start_generation(3)
+    forward.update(pairs, results)
+    backward.update(pairs[::-1], results[::-1])
+    assert forward.scores() == pytest.approx(backward.scores())
+    assert sum(forward.scores()) == pytest.approx(3 * BASE_ELO)
+
+
+def test_elo_ignores_failed_battles():
+    ratings = EloRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)], [FAILED])
+    assert ratings.scores() == [BASE_ELO, BASE_ELO]
+
+
+def test_elo_reference_rates_its_opponents_only():
+    ratings = EloRatings()
+    ratings.start_generation(3)
+    ratings.update([(0, 1), (2, 0), (0, 2)], [2, 1, 2], reference=0)
+    assert ratings.scores() == [BASE_ELO, BASE_ELO + K_FACTOR / 2, BASE_ELO + K_FACTOR]
+
+
+def test_elo_decay_and_carry_over():
+    ratings = EloRatings()
+    ratings.start_generation(3)
+    ratings.update([(0, 1)], [1])
+    ratings.carry_over([1, 0], 3)
+    assert ratings.scores() == [BASE_ELO - K_FACTOR / 2, BASE_ELO + K_FACTOR / 2, BASE_ELO]
+
+    ratings.start_generation(3)
+    assert ratings.scores()[1] == pytest.approx(BASE_ELO + (1 - ELO_DECAY) * K_FACTOR / 2)
+
+
+# ---------------- Bradley–Terry ----------------
+
+def test_bradley_terry_is_a_maximum_likelihood_fit():
+    # At the fit, every team's expected wins (prior games included) equal
+    # its actual wins
+    ratings = BradleyTerryRatings()
+    ratings.start_generation(3)
+    pairs, results = [(0, 1), (0, 1), (1, 0), (1, 2), (2, 0)], [1, 1, 1, 2, 0]
+    ratings.update(pairs, results)
+    p = ratings.strengths()
+
+    for team in range(3):
+        wins = ratings.prior_wins[team]
+        expected = ratings.prior_weight[team] * p[team] / (p[team] + 1)
+        for (i, j), result in zip(pairs, results):
+            if team in (i, j):
+                other = j if team == i else i
+                wins += battle_scores(result)[0 if team == i else 1]
+                expected += p[team] / (p[team] + p[other])
+        assert expected == pytest.approx(wins, rel=1e-6)
+
+
+def test_bradley_terry_scores_are_on_the_elo_scale():
+    ratings = BradleyTerryRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)] * 3, [1, 1, 2])
+    p = ratings.strengths()
+    assert ratings.scores() == pytest.approx((BASE_ELO + 400 * np.log10(p)).tolist())
+    assert ratings.scores()[0] > BASE_ELO > ratings.scores()[1]
+
+
+def test_bradley_terry_symmetric_results_give_equal_scores():
+    ratings = BradleyTerryRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1), (1, 0)], [1, 1])
+    assert ratings.scores() == pytest.approx([BASE_ELO, BASE_ELO])
+
+
+def test_bradley_terry_order_does_not_matter_and_ignores_failures():
+    pairs, results = [(0, 1), (1, 2), (2, 0), (0, 2)], [1, 2, 0, 1]
+    forward, backward = BradleyTerryRatings(), BradleyTerryRatings()
+    forward.start_generation(3)
+    backward.start_generation(3)
+    forward.update(pairs, results)
+    backward.update(pairs[::-1] + [(0, 1)], results[::-1] + [FAILED])
+    assert forward.scores() == pytest.approx(backward.scores())
+
+
+def test_bradley_terry_unbeaten_team_stays_finite():
+    ratings = BradleyTerryRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)] * 10, [1] * 10)
+    assert all(math.isfinite(s) for s in ratings.scores())
+
+
+def test_bradley_terry_carry_over_keeps_survivor_ahead():
+    ratings = BradleyTerryRatings()
+    ratings.start_generation(3)
+    ratings.update([(0, 1)] * 4, [1] * 4)
+    ratings.carry_over([0], 3)
+    ratings.start_generation(3)
+    scores = ratings.scores()
+    assert scores[0] > BASE_ELO
+    assert scores[1] == pytest.approx(BASE_ELO)
+    assert scores[2] == pytest.approx(BASE_ELO)
+
+
+# ---------------- Glicko ----------------
+
+def test_glicko_matches_glickmans_example():
+    # Glickman, "The Glicko system", worked example: 1500 (RD 200) beats
+    # 1400 (RD 30) and loses to 1550 (RD 100) and 1700 (RD 300)
+    ratings = GlickoRatings()
+    ratings.start_generation(4)
+    ratings.mu = np.array([1500.0, 1400.0, 1550.0, 1700.0])
+    ratings.rd = np.array([200.0, 30.0, 100.0, 300.0])
+    ratings.update([(0, 1), (0, 2), (0, 3)], [1, 2, 2])
+    assert ratings.scores()[0] == pytest.approx(1464.1, abs=0.1)
+    assert ratings.uncertainties()[0] == pytest.approx(151.4, abs=0.1)
+
+
+def test_glicko_symmetry_and_shrinking_uncertainty():
+    ratings = GlickoRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)], [1])
+    mu, rd = ratings.scores(), ratings.uncertainties()
+    assert mu[0] - BASE_ELO == pytest.approx(BASE_ELO - mu[1])
+    assert rd[0] == pytest.approx(rd[1])
+    assert rd[0] < GLICKO_INITIAL_RD
+
+
+def test_glicko_ignores_failed_battles():
+    ratings = GlickoRatings()
+    ratings.start_generation(2)
+    ratings.update([(0, 1)], [FAILED])
+    assert ratings.scores() == [BASE_ELO, BASE_ELO]
+    assert ratings.uncertainties() == [GLICKO_INITIAL_RD, GLICKO_INITIAL_RD]
+
+
+def test_glicko_reference_keeps_its_rating():
+    ratings = GlickoRatings()
+    ratings.start_generation(3)
+    ratings.update([(1, 0), (0, 2)], [1, 2], reference=0)
+    assert ratings.scores()[0] == BASE_ELO
+    assert ratings.uncertainties()[0] == GLICKO_INITIAL_RD
+    assert ratings.scores()[1] == pytest.approx(ratings.scores()[2])
+    assert ratings.scores()[1] > BASE_ELO
+
+
+def test_glicko_carry_over_and_reset():
+    ratings = GlickoRatings()
+    ratings.start_generation(3)
+    ratings.update([(0, 1)], [1])
+    winner = ratings.scores()[0]
+    ratings.carry_over([0], 3)
+    assert ratings.scores() == [winner, BASE_ELO, BASE_ELO]
+
+    ratings.start_generation(3)
+    assert ratings.scores()[0] == pytest.approx((1 - ELO_DECAY) * winner + ELO_DECAY * BASE_ELO)
+    ratings.reset(0)
+    assert ratings.scores()[0] == BASE_ELO
+    assert ratings.uncertainties()[0] == GLICKO_INITIAL_RD
+
+
+# ---------------- paired evaluation ----------------
+
+def test_paired_round_leaves_the_opponent_unrated(ou_teams):
+    teams = ou_teams[:6]
+
+    def stronger_wins(team1, team2, battle_format, seed):
+        # Earlier teams in `teams` beat later ones, from either side
+        return 1 if teams.index(team1) < teams.index(team2) else 2
+
+    optimizer = EloGeneticAlgorithm(
+        learnsets_path=Path("data/learnsets_by_tier/learnsets_ou.json"),
+        battle_engine_func=stronger_wins,
+        battle_format=get_format("OU"),
+        population_size=6,
+        survivors_count=2,
+        num_matchups=10,
+        evaluation_mode="paired",
+        p_pokemon_mutation_rate=0.3,
+        move_mutation_rate=0.2,
+        seed=0,
+    )
+    scores = [e.score for e in optimizer.evaluate_teams(teams)]
+    assert optimizer.total_battles_used == 10
+    # One round: the opponent stays put, and every other team won or lost
+    # both of its battles against it
+    assert scores.count(BASE_ELO) == 1
+    assert all(abs(score - BASE_ELO) in (0, K_FACTOR) for score in scores)
@@ -0,0 +1,42 @@
+from battles.teams import canonical_team, compile_team, team_hash
+
+TEAM = (
+    [6, 143, 65],
+    [[53, 19, 14, 89], [34, 156, 89, 63], [94, 86, 105, 115]],
+)
+
+
+def test_packed_team():
+    assert compile_team(TEAM).packed == "]".join([
+        "Charizard|||none|flamethrower,fly,swordsdance,earthquake|||||||",
+        "Snorlax|||none|bodyslam,rest,earthquake,hyperbeam|||||||",
+        "Alakazam|||none|psychic,thunderwave,recover,reflect|||||||",
+    ])
+
+
+def test_compile_team_is_memoized_on_content():
+    same = ([6, 143, 65], [list(moves) for moves in TEAM[1]])
+    assert compile_team(same) is compile_team(TEAM)
+
+
+def test_canonical_team_sorts_moves_and_bench():
+    assert canonical_team(TEAM) == (
+        [6, 65, 143],
+        [[14, 19, 53, 89], [86, 94, 105, 115], [34, 63, 89, 156]],
+    )
+
+
+def test_canonical_team_keeps_lead_unless_asked():
+    bench_first = ([143, 6, 65], [TEAM[1][1], TEAM[1][0], TEAM[1][2]])
+    assert canonical_team(bench_first)[0] == [143, 6, 65]
+    assert canonical_team(bench_first, keep_lead=False) == canonical_team(TEAM, keep_lead=False)
+
+
+def test_team_hash_ignores_move_and_bench_order():
+    shuffled = ([6, 65, 143], [[89, 14, 19, 53], TEAM[1][2], TEAM[1][1][::-1]])
+    assert team_hash(shuffled) == team_hash(TEAM)
+    assert compile_team(shuffled).hash == compile_team(TEAM).hash
+
+    new_lead = ([65, 6, 143], [TEAM[1][2], TEAM[1][0], TEAM[1][1]])
+    assert team_hash(new_lead) != team_hash(TEAM)
+    assert team_hash(new_lead, keep_lead=False) == team_hash(TEAM, keep_lead=False)
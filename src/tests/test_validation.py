@@ -0,0 +1,102 @@
+import json
+import random
+
+import pytest
+
+from battles.learnset_index import LearnsetIndex
+from battles.validation import is_legal, matchup_problems, validate_team
+from evaluation.gen1ou.parseteams import parse_teams
+
+CHARIZARD, ARBOK, MEWTWO = 6, 24, 150
+FLY, WRAP = 19, 35
+
+FLYING_CHARIZARD = (CHARIZARD, [FLY, 53, 14, 89])  # Fly, Flamethrower, Swords Dance, Earthquake
+WRAPPING_ARBOK = (ARBOK, [WRAP, 34, 89, 63])  # Wrap, Body Slam, Earthquake, Hyper Beam
+
+
+def with_slot(team, slot):
+    """The team with its first slot replaced."""
+    species, moves = team
+    return [slot[0]] + species[1:], [slot[1]] + moves[1:]
+
+
+@pytest.fixture(scope="module")
+def team():
+    # A random UU team, legal in every tier from UU up, without the species
+    # the tests swap in
+    with open("data/learnsets_by_tier/learnsets_uu.json", encoding="utf-8") as f:
+        index = LearnsetIndex(json.load(f))
+    rng = random.Random(0)
+    while True:
+        team = index.sample_team(rng)
+        if not {CHARIZARD, ARBOK, MEWTWO} & set(team[0]):
+            return team
+
+
+def test_random_tier_teams_are_legal(ou_teams):
+    assert all(is_legal(team, "gen1ou") for team in ou_teams)
+
+
+def test_ou_allows_moves_banned_only_in_other_tiers(team):
+    # The OU learnsets file leaves out every Uber ban, but gen1ou allows them
+    assert validate_team(with_slot(team, FLYING_CHARIZARD), "gen1ou") == ()
+    assert validate_team(with_slot(team, WRAPPING_ARBOK), "gen1ou") == ()
+
+
+def test_tier_move_bans(team):
+    assert validate_team(with_slot(team, FLYING_CHARIZARD), "gen1ubers") == (
+        "Charizard can't learn Fly in Uber",
+    )
+    assert validate_team(with_slot(team, WRAPPING_ARBOK), "gen1uu") == ("Arbok can't learn Wrap in UU",)
+
+
+def test_species_outside_the_tier(team):
+    mewtwo = with_slot(team, (MEWTWO, [94, 105, 86, 115]))
+    assert is_legal(mewtwo, "gen1ubers")
+    assert validate_team(mewtwo, "gen1ou") == (f"species {MEWTWO} is not legal in OU",)
+
+
+def test_species_clause(team):
+    species, moves = team
+    twice = ([species[1]] + species[1:], [moves[1]] + moves[1:])
+    assert validate_team(twice, "gen1ou") == ("duplicate species (Species Clause)",)
+
+
+def test_team_legal_in_higher_tiers(team):
+    for format in ("gen1uu", "gen1ou", "gen1ubers"):
+        assert validate_team(team, format) == ()
+
+
+def test_move_problems(team):
+    assert validate_team(with_slot(team, (CHARIZARD, [FLY, 53, 14, 145])), "gen1ou") == (
+        "Charizard can't learn Bubble in OU",
+    )
+    assert validate_team(with_slot(team, (CHARIZARD, [FLY, FLY, 53, 14])), "gen1ou") == (
+        "Charizard has duplicate moves",
+    )
+    assert validate_team(with_slot(team, (CHARIZARD, [])), "gen1ou") == ("Charizard has 0 moves",)
+
+
+def test_malformed_and_unknown_formats(team):
+    assert validate_team((team[0], team[1][:5]), "gen1ou") == (
+        "number of movesets does not match number of Pokémon",
+    )
+    assert validate_team(([CHARIZARD] * 2, [[FLY]] * 2), "gen9randombattle") == ()
+    assert validate_team((None, None), "gen1ou")[0].startswith("malformed team")
+
+
+def test_matchup_problems_name_the_side(team, ou_teams):
+    broken = (team[0], team[1][:5])
+    assert matchup_problems(ou_teams[0], broken, "gen1ou") == [
+        "team2: number of movesets does not match number of Pokémon",
+    ]
+    assert matchup_problems(ou_teams[0], ou_teams[1], "gen1ou") == []
+
+
+def test_evaluation_teams_regenerate_and_validate():
+    with open("evaluation/gen1ou/parsed_teams.json", encoding="utf-8") as f:
+        saved = json.load(f)
+    with open("evaluation/gen1ou/teams.txt", encoding="utf-8") as f:
+        parsed = parse_teams(f.read())
+    assert [list(map(list, team)) for team in parsed] == saved
+    assert all(is_legal(team, "gen1ou") for team in parsed)
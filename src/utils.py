@@ -21,6 +21,8 @@ def normalize_name(name: str) -> str:
     NORMALIZATION_MAP = {
         "Vice Grip": "Vise Grip",
         "Hi Jump Kick": "High Jump Kick",
+        "Selfdestruct": "Self-Destruct",
+        "Softboiled": "Soft-Boiled",
     }
 
     return NORMALIZATION_MAP.get(name, name)